@@ -0,0 +1,475 @@
+"""Benchmark headless untuk dashboard okupansi hotel (main.py).
+
+Membuat data booking sintetis berbentuk HOTEL_OKUPANSI_FIX.csv (10 ribu s.d. 50 juta baris), lalu memutar
+ulang skenario filter & metrik terhadap main.py lewat streamlit.testing (AppTest), tanpa browser. Setiap
+langkah skenario adalah satu rerun penuh: loader, filter, agregasi, dan pembuatan grafik. Yang dilaporkan:
+latensi per langkah (p50/p95/maks), throughput (baris dataset per detik), RSS & puncak RSS proses, serta
+durasi per tahap dari instrumentasi eda_core.py (logger 'eda.perf').
+
+Contoh:
+    python benchmark.py --rows 1M --repeats 5 --output hasil_baseline.json
+    python benchmark.py --rows 1M --repeats 5 --compare hasil_baseline.json
+    python benchmark.py --rows 50M --generate-only
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Windows: tanpa puncak RSS (ru_maxrss)
+    resource = None
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+# Nama file yang dibaca eda_core.py (DATA_PATH, relatif terhadap direktori kerja)
+DATA_FILE = 'HOTEL_OKUPANSI_FIX.csv'
+# Cache turunan yang dibangun eda_core.py di samping CSV; dihapus untuk run --cold
+DERIVED_CACHES = (
+    'HOTEL_OKUPANSI_FIX.feather', 'HOTEL_OKUPANSI_FIX_partitioned', 'HOTEL_OKUPANSI_FIX.catalog.json',
+    'HOTEL_OKUPANSI_FIX.results.sqlite', 'HOTEL_OKUPANSI_FIX.results.sqlite-wal', 'HOTEL_OKUPANSI_FIX.results.sqlite-shm',
+)
+
+# ====================================================================
+# GENERATOR DATA SINTETIS
+# ====================================================================
+GENERATOR_START = '2015-07-01'
+GENERATOR_END = '2017-08-31'
+GENERATOR_CHUNK_ROWS = 1_000_000
+
+HOTELS = np.array(['City Hotel', 'Resort Hotel'])
+HOTEL_SHARE = [0.66, 0.34]
+SEASON_BY_MONTH = np.array([
+    'Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+    'Summer', 'Summer', 'Autumn', 'Autumn', 'Autumn', 'Winter',
+])
+SEASON_BASE_OCCUPANCY = {'Winter': 48.0, 'Spring': 62.0, 'Summer': 75.0, 'Autumn': 58.0}
+# Hari libur tetap (bulan, tanggal) -> nama; hari event dipilih acak per tahun dari EVENT_NAMES
+HOLIDAYS = {
+    (1, 1): "New Year's Day",
+    (4, 25): 'Liberation Day',
+    (5, 1): 'Labour Day',
+    (6, 10): 'Portugal Day',
+    (8, 15): 'Assumption Day',
+    (10, 5): 'Republic Day',
+    (11, 1): "All Saints' Day",
+    (12, 1): 'Restoration of Independence',
+    (12, 8): 'Immaculate Conception',
+    (12, 25): 'Christmas Day',
+}
+EVENT_NAMES = np.array(['Jazz Fest', 'Expo', 'Marathon', 'Concert', 'Film Festival', 'Food Festival'])
+EVENT_DAYS_PER_YEAR = 30
+HOLIDAY_UPLIFT = 8.0
+EVENT_UPLIFT = 6.0
+CANCELLATION_RATE = 0.37
+
+
+def parse_rows(text):
+    """'20000', '10k', '1.5M' -> jumlah baris."""
+    text = str(text).strip().lower().replace('_', '')
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def build_calendar(seed):
+    """Kalender harian: flag libur/event dan nama (kosong bila hari biasa), deterministik per seed."""
+    days = pd.date_range(GENERATOR_START, GENERATOR_END, freq='D')
+    rng = np.random.default_rng([seed, 0])
+
+    holiday_names = np.array([HOLIDAYS.get((day.month, day.day), '') for day in days], dtype=object)
+    is_holiday = holiday_names != ''
+
+    is_event_day = np.zeros(len(days), dtype=bool)
+    event_names = np.full(len(days), '', dtype=object)
+    for year in np.unique(days.year):
+        in_year = np.flatnonzero(days.year == year)
+        picked = rng.choice(in_year, size=min(EVENT_DAYS_PER_YEAR, len(in_year)), replace=False)
+        is_event_day[picked] = True
+        event_names[picked] = rng.choice(EVENT_NAMES, size=len(picked))
+
+    names = np.where(is_holiday & is_event_day, holiday_names + ' / ' + event_names,
+                     np.where(is_holiday, holiday_names, event_names))
+    return pd.DataFrame({
+        'arrival_date': days,
+        'is_holiday': is_holiday.astype('int8'),
+        'is_event_day': is_event_day.astype('int8'),
+        'Name': names,
+    })
+
+
+def generate_bookings(n_rows, seed=0, chunk_index=0, calendar=None):
+    """Satu potongan booking sintetis dengan kolom & domain nilai yang sama dengan HOTEL_OKUPANSI_FIX.csv."""
+    calendar = build_calendar(seed) if calendar is None else calendar
+    rng = np.random.default_rng([seed, chunk_index + 1])
+
+    day = rng.integers(0, len(calendar), size=n_rows)
+    arrival = calendar['arrival_date'].to_numpy()[day]
+    months = pd.DatetimeIndex(arrival).month.to_numpy()
+    seasons = SEASON_BY_MONTH[months - 1]
+    hotel_index = rng.choice(len(HOTELS), size=n_rows, p=HOTEL_SHARE)
+    is_holiday = calendar['is_holiday'].to_numpy()[day]
+    is_event_day = calendar['is_event_day'].to_numpy()[day]
+
+    base = pd.Series(seasons).map(SEASON_BASE_OCCUPANCY).to_numpy()
+    occupancy = (
+        base
+        + HOLIDAY_UPLIFT * is_holiday
+        + EVENT_UPLIFT * is_event_day
+        + np.where(hotel_index == 1, 4.0, 0.0)
+        + rng.normal(0.0, 12.0, size=n_rows)
+    ).clip(0, 100).round(2)
+    adr = (60.0 + 1.4 * occupancy + rng.normal(0.0, 25.0, size=n_rows)).clip(20, 400).round(2)
+
+    return pd.DataFrame({
+        'hotel': HOTELS[hotel_index],
+        'arrival_date': pd.DatetimeIndex(arrival).strftime('%Y-%m-%d'),
+        'year': pd.DatetimeIndex(arrival).year,
+        'month': months,
+        'season': seasons,
+        'is_holiday': is_holiday,
+        'is_event_day': is_event_day,
+        'is_canceled': (rng.random(n_rows) < CANCELLATION_RATE).astype('int8'),
+        'Name': calendar['Name'].to_numpy()[day],
+        'occupancy_per_hari': occupancy,
+        'adr': adr,
+        'total_tamu': rng.integers(1, 5, size=n_rows),
+    })
+
+
+def write_synthetic_csv(path, n_rows, seed=0, chunk_rows=GENERATOR_CHUNK_ROWS):
+    """Menulis CSV per potongan agar memori generator tetap kecil walau puluhan juta baris."""
+    calendar = build_calendar(seed)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='') as output:
+        for chunk_index, start in enumerate(range(0, n_rows, chunk_rows)):
+            chunk = generate_bookings(min(chunk_rows, n_rows - start), seed, chunk_index, calendar)
+            chunk.to_csv(output, index=False, header=(chunk_index == 0))
+    os.replace(tmp_path, path)
+
+
+def prepare_workdir(workdir, n_rows, seed, cold):
+    """Membuat (atau memakai ulang) CSV sintetis di `workdir`; kembalikan detik yang dipakai generator."""
+    os.makedirs(workdir, exist_ok=True)
+    marker_path = os.path.join(workdir, 'benchmark_data.json')
+    marker = {'rows': n_rows, 'seed': seed}
+    csv_path = os.path.join(workdir, DATA_FILE)
+
+    if os.path.exists(csv_path) and os.path.exists(marker_path):
+        with open(marker_path) as marker_file:
+            if json.load(marker_file) == marker:
+                if cold:
+                    remove_derived_caches(workdir)
+                return 0.0
+
+    remove_derived_caches(workdir)
+    start = time.perf_counter()
+    write_synthetic_csv(csv_path, n_rows, seed)
+    with open(marker_path, 'w') as marker_file:
+        json.dump(marker, marker_file)
+    return time.perf_counter() - start
+
+
+def remove_derived_caches(workdir):
+    for name in DERIVED_CACHES:
+        path = os.path.join(workdir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+# ====================================================================
+# SKENARIO: URUTAN PERUBAHAN FILTER / METRIK / TAB
+# ====================================================================
+# Kunci langkah -> (jenis widget sidebar, label); 'tab' mengubah tab aktif (session_state['active_tab'])
+WIDGETS = {
+    'hotel': ('selectbox', 'Pilih Hotel'),
+    'years': ('multiselect', 'Pilih Tahun'),
+    'date_range': ('date_input', 'Pilih Rentang'),
+    'months': ('multiselect', 'Pilih Bulan'),
+    'seasons': ('multiselect', 'Pilih Musim'),
+    'only_holidays': ('checkbox', '🎉 Hanya Hari Libur'),
+    'only_events': ('checkbox', '🎪 Hanya Hari Event'),
+    'exclude_canceled': ('checkbox', '✅ Exclude Cancellations'),
+    'metric': ('radio', 'Metrik Okupansi'),
+    'exact_median': ('checkbox', '🔍 Median Eksak (audit)'),
+}
+
+# (label, perubahan); nilai None = kembali ke nilai awal widget
+DEFAULT_SCENARIO = [
+    ('awal (semua data)', {}),
+    ('metrik Median', {'metric': 'Median'}),
+    ('median eksak', {'exact_median': True}),
+    ('metrik Total', {'metric': 'Total'}),
+    ('hotel City Hotel', {'hotel': 'City Hotel'}),
+    ('rentang 2016', {'date_range': ['2016-01-01', '2016-12-31']}),
+    ('musim Summer', {'seasons': ['Summer']}),
+    ('hanya hari libur', {'only_holidays': True}),
+    ('tab Comparison', {'tab': '📊 Comparison'}),
+    ('tab Calendar View', {'tab': '🗓️ Calendar View'}),
+    ('tab Detailed Data', {'tab': '📋 Detailed Data'}),
+    ('tab Event List', {'tab': '🎪 Event List'}),
+    ('reset filter', {
+        'hotel': None, 'date_range': None, 'seasons': None, 'only_holidays': None,
+        'metric': 'Rata-rata', 'tab': '📈 Trend Analysis',
+    }),
+]
+
+
+def load_scenario(path):
+    """Skenario dari file JSON: [[label, {kunci: nilai}], ...] dengan kunci WIDGETS atau 'tab'."""
+    with open(path) as scenario_file:
+        return [(label, changes) for label, changes in json.load(scenario_file)]
+
+
+def find_widget(at, key):
+    kind, label = WIDGETS[key]
+    for widget in getattr(at.sidebar, kind):
+        if widget.label == label:
+            return widget
+    raise ValueError(f"Widget '{label}' tidak ada di sidebar pada langkah ini")
+
+
+def apply_step(at, changes, initial_values):
+    for key, value in changes.items():
+        if key == 'tab':
+            at.session_state['active_tab'] = value
+            continue
+        widget = find_widget(at, key)
+        if value is None:
+            value = initial_values[key]
+        elif key == 'date_range':
+            value = tuple(date.fromisoformat(day) for day in value)
+        widget.set_value(value)
+
+
+# ====================================================================
+# HARNESS: MEMUTAR SKENARIO & MENGUKUR
+# ====================================================================
+class PerfLogCapture(logging.Handler):
+    """Menampung baris JSON run dari logger 'eda.perf' eda_core.py (sekaligus membungkam output stderr-nya)."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.runs = []
+
+    def emit(self, record):
+        self.runs.append(json.loads(record.getMessage()))
+
+
+def process_rss_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KiB di Linux, byte di macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def to_megabytes(nbytes):
+    return None if nbytes is None else round(nbytes / 1024 ** 2, 1)
+
+
+def clear_streamlit_caches():
+    import streamlit as st
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_scenario(scenario, timeout):
+    """Satu sesi baru: jalankan setiap langkah sebagai satu rerun dan catat latensi, RSS, serta tahapnya."""
+    from streamlit.testing.v1 import AppTest
+
+    # Log run mati secara default; eda_core.py membaca flag ini saat diimpor run pertama (proses yang sama)
+    os.environ['EDA_PERF_LOG_RUNS'] = '1'
+    capture = PerfLogCapture()
+    perf_logger = logging.getLogger('eda.perf')
+    perf_logger.addHandler(capture)
+    perf_logger.setLevel(logging.INFO)
+    perf_logger.propagate = False
+
+    at = AppTest.from_file(MAIN_SCRIPT, default_timeout=timeout)
+    initial_values = None
+    results = []
+    try:
+        for label, changes in scenario:
+            if initial_values is not None:
+                apply_step(at, changes, initial_values)
+            first_run = len(capture.runs)
+            start = time.perf_counter()
+            at.run()
+            latency = time.perf_counter() - start
+
+            if at.exception:
+                raise RuntimeError(f"Langkah '{label}' gagal: {at.exception[0].value}")
+            if initial_values is None:
+                initial_values = {key: find_widget(at, key).value for key in WIDGETS if key != 'exact_median'}
+
+            stages = {}
+            for run in capture.runs[first_run:]:
+                for stage in run['stages']:
+                    stages[stage['name']] = stages.get(stage['name'], 0.0) + stage['seconds']
+            results.append({
+                'label': label,
+                'seconds': latency,
+                'errors': [element.value for element in at.error],
+                'stages': stages,
+                'rss': process_rss_bytes(),
+            })
+    finally:
+        perf_logger.removeHandler(capture)
+    return results
+
+
+def summarize(label, samples, n_rows):
+    latencies = np.array([sample['seconds'] for sample in samples]) * 1000
+    stage_names = sorted({name for sample in samples for name in sample['stages']})
+    p50 = float(np.quantile(latencies, 0.5))
+    return {
+        'label': label,
+        'latency_ms': [round(value, 2) for value in latencies],
+        'p50_ms': round(p50, 2),
+        'p95_ms': round(float(np.quantile(latencies, 0.95)), 2),
+        'max_ms': round(float(latencies.max()), 2),
+        'rows_per_s': round(n_rows / (p50 / 1000)) if p50 > 0 else None,
+        'rss_mb': to_megabytes(max(sample['rss'] or 0 for sample in samples)),
+        'stages_p50_ms': {
+            name: round(float(np.median([sample['stages'].get(name, 0.0) for sample in samples])) * 1000, 2)
+            for name in stage_names
+        },
+        'errors': sorted({error for sample in samples for error in sample['errors']}),
+    }
+
+
+def run_benchmark(args):
+    n_rows = parse_rows(args.rows)
+    workdir = os.path.abspath(args.workdir or os.path.join(tempfile.gettempdir(), f'eda-bench-{n_rows}-{args.seed}'))
+    generate_seconds = prepare_workdir(workdir, n_rows, args.seed, args.cold)
+    if args.generate_only:
+        print(f"Data sintetis: {os.path.join(workdir, DATA_FILE)} ({n_rows:,} baris, {generate_seconds:.1f} s)")
+        return None
+
+    scenario = load_scenario(args.scenario) if args.scenario else DEFAULT_SCENARIO
+    os.chdir(workdir)
+
+    started_at = datetime.now().isoformat(timespec='seconds')
+    start = time.perf_counter()
+    repeats = []
+    for repeat in range(args.repeats):
+        if args.cold:
+            # Tiap ulangan dimulai dari nol: cache Streamlit kosong dan cache di disk dibangun ulang
+            clear_streamlit_caches()
+            if repeat > 0:
+                remove_derived_caches(workdir)
+        repeats.append(run_scenario(scenario, args.timeout))
+        print(f"  ulangan {repeat + 1}/{args.repeats}: {sum(step['seconds'] for step in repeats[-1]):.2f} s", file=sys.stderr)
+    total_seconds = time.perf_counter() - start
+
+    import streamlit
+    return {
+        'meta': {
+            'started_at': started_at,
+            'rows': n_rows,
+            'seed': args.seed,
+            'repeats': args.repeats,
+            'cold': args.cold,
+            'scenario': args.scenario or 'default',
+            'workdir': workdir,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'streamlit': streamlit.__version__,
+            'pandas': pd.__version__,
+        },
+        'generate_seconds': round(generate_seconds, 2),
+        'total_seconds': round(total_seconds, 2),
+        'reruns_per_s': round(len(scenario) * args.repeats / total_seconds, 2),
+        'peak_rss_mb': to_megabytes(peak_rss_bytes()),
+        'steps': [
+            summarize(label, [steps[i] for steps in repeats], n_rows)
+            for i, (label, _) in enumerate(scenario)
+        ],
+    }
+
+
+# ====================================================================
+# LAPORAN & PERBANDINGAN ANTAR-RUN
+# ====================================================================
+def print_report(result, baseline=None):
+    meta = result['meta']
+    print(f"\nBenchmark {meta['rows']:,} baris, {meta['repeats']} ulangan ({'cold' if meta['cold'] else 'warm'}), "
+          f"total {result['total_seconds']:.2f} s, {result['reruns_per_s']} rerun/s, "
+          f"puncak RSS {result['peak_rss_mb']} MB")
+    baseline_steps = {step['label']: step for step in baseline['steps']} if baseline else {}
+
+    header = f"{'langkah':<22} {'p50 ms':>10} {'p95 ms':>10} {'maks ms':>10} {'baris/s':>14} {'RSS MB':>8}"
+    if baseline:
+        header += f" {'p50 dasar':>10} {'delta':>8}"
+    print(header)
+    print('-' * len(header))
+    for step in result['steps']:
+        line = (f"{step['label'][:22]:<22} {step['p50_ms']:>10,.1f} {step['p95_ms']:>10,.1f} {step['max_ms']:>10,.1f} "
+                f"{step['rows_per_s'] or 0:>14,} {step['rss_mb'] or 0:>8,.1f}")
+        base_step = baseline_steps.get(step['label'])
+        if base_step:
+            delta = (step['p50_ms'] / base_step['p50_ms'] - 1) * 100 if base_step['p50_ms'] else 0.0
+            line += f" {base_step['p50_ms']:>10,.1f} {delta:>+7.1f}%"
+        print(line)
+        slowest = sorted(step['stages_p50_ms'].items(), key=lambda item: item[1], reverse=True)[:3]
+        if slowest:
+            print(' ' * 4 + ', '.join(f"{name} {ms:,.1f} ms" for name, ms in slowest))
+        for error in step['errors']:
+            print(f"    ! {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='100k', help="jumlah baris sintetis, mis. 10k, 1M, 50M (default 100k)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3, help="jumlah sesi yang memutar skenario (default 3)")
+    parser.add_argument('--scenario', help="file JSON skenario [[label, {perubahan}], ...]")
+    parser.add_argument('--cold', action='store_true',
+                        help="kosongkan cache Streamlit & cache di disk (Feather, partisi, katalog, hasil) sebelum tiap ulangan")
+    parser.add_argument('--workdir', help="direktori data sintetis (default: direktori temp per rows/seed)")
+    parser.add_argument('--timeout', type=float, default=600, help="batas detik per rerun")
+    parser.add_argument('--output', help="simpan hasil sebagai JSON")
+    parser.add_argument('--compare', help="hasil JSON sebelumnya sebagai pembanding")
+    parser.add_argument('--generate-only', action='store_true', help="hanya buat data sintetis")
+    args = parser.parse_args(argv)
+    # Harness pindah ke direktori data sintetis; path dari pengguna dibuat absolut lebih dulu
+    for name in ('scenario', 'output', 'compare'):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    result = run_benchmark(args)
+    if result is None:
+        return 0
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(result, baseline)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent=2)
+    return 1 if any(step['errors'] for step in result['steps']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
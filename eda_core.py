@@ -0,0 +1,2709 @@
+"""Lapisan data dashboard main.py: pemuatan & cache data, indeks filter, cube, cache hasil, dan backend query.
+
+Dipisah dari script Streamlit agar bisa diimpor biasa (test, benchmark): script dijalankan
+ulang tiap rerun, modul ini hanya sekali per proses.
+"""
+import streamlit as st
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import os
+import io
+import gzip
+import tempfile
+import shutil
+import sys
+import time
+import importlib
+import importlib.util
+import json
+import hashlib
+import secrets
+import sqlite3
+import logging
+import threading
+import functools
+import contextlib
+import contextvars
+from collections import OrderedDict, deque
+from pandas.api.types import union_categoricals
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: tanpa kunci file antarproses
+    fcntl = None
+
+# ====================================================================
+# IMPOR LAZY: MODUL BERAT BARU DIMUAT SAAT SEKSI YANG MEMBUTUHKANNYA BERJALAN
+# ====================================================================
+# Plotly hanya untuk grafik, pyarrow.dataset/compute untuk dataset berpartisi & DuckDB,
+# duckdb hanya untuk QUERY_BACKEND = 'duckdb'; pandas & numpy dipakai tiap rerun, jadi tetap langsung
+LAZY_IMPORTS = True
+
+
+class LazyModule:
+    """Pengganti modul yang baru di-import saat atributnya pertama kali dipakai (aman lintas thread)."""
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name) if LAZY_IMPORTS else importlib.import_module(name)
+
+
+ds = lazy_import('pyarrow.dataset')
+pc = lazy_import('pyarrow.compute')
+
+# Opsional: hanya dibutuhkan untuk QUERY_BACKEND = 'duckdb'
+duckdb = lazy_import('duckdb') if importlib.util.find_spec('duckdb') is not None else None
+
+# ====================================================================
+# INSTRUMENTASI PERFORMA: DURASI, BARIS MASUK/KELUAR, DAN DELTA MEMORI PER TAHAP
+# ====================================================================
+PERF_INSTRUMENTATION = True
+# Jumlah run terakhir yang disimpan (dasar p50/p95 di panel & export Prometheus)
+PERF_HISTORY_RUNS = 200
+# Panel admin di sidebar hanya muncul dengan ?admin=<token> yang cocok; tanpa token, panel mati
+PERF_ADMIN_TOKEN = os.environ.get('EDA_PERF_ADMIN_TOKEN')
+# Jumlah rerun terakhir yang ditampilkan di panel admin
+PERF_PANEL_RUNS = 20
+# Satu baris JSON per run ke logger 'eda.perf' (stderr) untuk dikumpulkan log pipeline; mati kecuali
+# EDA_PERF_LOG_RUNS=1, karena tiap rerun tiap sesi menulis satu baris
+PERF_LOG_RUNS = os.environ.get('EDA_PERF_LOG_RUNS') == '1'
+# File teks Prometheus (textfile collector node_exporter), ditulis ulang tiap run; boleh memuat {pid}
+PERF_PROMETHEUS_TEXTFILE = os.environ.get('EDA_PERF_PROMETHEUS_TEXTFILE')
+PERF_QUANTILES = (0.5, 0.95)
+
+perf_logger = logging.getLogger('eda.perf')
+
+# Run yang sedang berjalan di thread/konteks ini; disalin ke thread seksi (lihat SectionScheduler)
+_current_perf_run = contextvars.ContextVar('perf_run', default=None)
+
+
+def process_rss_bytes():
+    """RSS proses saat ini dari /proc (Linux); None bila tidak tersedia."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _row_count(value):
+    """Jumlah baris hasil sebuah tahap (DataFrame/Series/array); None untuk objek lain."""
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)) else None
+
+
+class PerfRun:
+    """Satu rerun (atau satu export) beserta tahap-tahapnya."""
+    
+    def __init__(self, kind):
+        self.kind = kind
+        self.started_at = time.time()
+        self.seconds = None
+        self.stages = []
+        self._start = time.perf_counter()
+    
+    def finish(self):
+        self.seconds = time.perf_counter() - self._start
+    
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='milliseconds'),
+            'seconds': round(self.seconds, 6),
+            'pid': os.getpid(),
+            'stages': list(self.stages),
+        }
+
+
+class PerfRecorder:
+    """Riwayat run per proses (thread-safe), plus export log JSON dan teks Prometheus."""
+    
+    def __init__(self, history=PERF_HISTORY_RUNS):
+        self._runs = deque(maxlen=history)
+        self._lock = threading.Lock()
+        # Counter kumulatif (tidak terpotong riwayat) untuk _sum/_count Prometheus
+        self._totals = {}
+    
+    def record(self, run):
+        with self._lock:
+            self._runs.append(run)
+            for key, seconds in [(('run', run.kind), run.seconds)] + [
+                (('stage', stage['name']), stage['seconds']) for stage in run.stages
+            ]:
+                total, count = self._totals.get(key, (0.0, 0))
+                self._totals[key] = (total + seconds, count + 1)
+        if PERF_LOG_RUNS:
+            perf_logger.info(json.dumps(run.as_dict(), default=str))
+        if PERF_PROMETHEUS_TEXTFILE:
+            self.write_prometheus_textfile(PERF_PROMETHEUS_TEXTFILE.format(pid=os.getpid()))
+    
+    def recent(self, kind=None):
+        with self._lock:
+            return [run for run in self._runs if kind is None or run.kind == kind]
+    
+    def stage_table(self):
+        """p50/p95 durasi (ms), jumlah panggilan, rata-rata baris & delta memori per tahap di riwayat."""
+        records = [stage for run in self.recent() for stage in run.stages]
+        if not records:
+            return pd.DataFrame()
+        stages = pd.DataFrame(records)
+        stages['ms'] = stages['seconds'] * 1000
+        table = stages.groupby('name').agg(
+            calls=('ms', 'size'),
+            p50_ms=('ms', 'median'),
+            p95_ms=('ms', lambda ms: ms.quantile(0.95)),
+            rows_in=('rows_in', 'mean'),
+            rows_out=('rows_out', 'mean'),
+            rss_delta_mb=('rss_delta', lambda delta: delta.mean() / 1024 ** 2),
+        )
+        return table.sort_values('p95_ms', ascending=False).round(2)
+    
+    def prometheus_text(self):
+        """Summary Prometheus: kuantil dari riwayat, _sum/_count kumulatif sejak proses mulai."""
+        with self._lock:
+            runs = list(self._runs)
+            totals = dict(self._totals)
+        samples = {}
+        for run in runs:
+            samples.setdefault(('run', run.kind), []).append(run.seconds)
+            for stage in run.stages:
+                samples.setdefault(('stage', stage['name']), []).append(stage['seconds'])
+        
+        lines = []
+        for metric, group, label, help_text in (
+            ('eda_run_seconds', 'run', 'kind', 'Durasi rerun dashboard / export'),
+            ('eda_stage_seconds', 'stage', 'stage', 'Durasi tahap di dalam rerun'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} summary']
+            for (key_group, name), (total, count) in sorted(totals.items()):
+                if key_group != group:
+                    continue
+                values = samples.get((group, name))
+                name = name.replace('\\', '\\\\').replace('"', '\\"')
+                for q in PERF_QUANTILES if values else ():
+                    lines.append(f'{metric}{{{label}="{name}",quantile="{q}"}} {np.quantile(values, q):.6f}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {total:.6f}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {count}')
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus_textfile(self, path):
+        # Ditulis ke file sementara lalu di-rename agar collector tidak membaca file setengah jadi
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as textfile:
+            textfile.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+    
+    def json_lines(self):
+        return ''.join(json.dumps(run.as_dict(), default=str) + '\n' for run in self.recent())
+
+
+@st.cache_resource
+def get_perf_recorder():
+    if PERF_LOG_RUNS and not perf_logger.handlers:
+        perf_logger.addHandler(logging.StreamHandler())
+        perf_logger.setLevel(logging.INFO)
+        perf_logger.propagate = False
+    return PerfRecorder()
+
+
+def begin_perf_run(kind):
+    """Mulai mencatat run di konteks saat ini; kembalikan token untuk finish_perf_run."""
+    if not PERF_INSTRUMENTATION:
+        return None
+    return _current_perf_run.set(PerfRun(kind))
+
+
+def finish_perf_run(token, recorder):
+    if token is None:
+        return
+    run = _current_perf_run.get()
+    _current_perf_run.reset(token)
+    run.finish()
+    recorder.record(run)
+
+
+@contextlib.contextmanager
+def perf_stage(name, rows_in=None):
+    """Mengukur satu tahap; isi stage['rows_out'] di dalam blok bila jumlah baris keluaran diketahui.
+    
+    Di luar run (mis. thread prefetch) atau saat instrumentasi mati, blok dijalankan tanpa pencatatan.
+    """
+    stage = {'name': name, 'rows_in': rows_in, 'rows_out': None}
+    run = _current_perf_run.get()
+    if run is None:
+        yield stage
+        return
+    rss_before = process_rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield stage
+    finally:
+        stage['seconds'] = time.perf_counter() - start
+        rss_after = process_rss_bytes()
+        stage['rss_delta'] = None if rss_before is None or rss_after is None else rss_after - rss_before
+        stage['thread'] = threading.current_thread().name
+        run.stages.append(stage)
+
+
+def timed_stage(name):
+    """Dekorator perf_stage; jumlah baris keluaran diambil dari nilai balik bila berupa tabel/array."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with perf_stage(name) as stage:
+                result = func(*args, **kwargs)
+                stage['rows_out'] = _row_count(result)
+                return result
+        return wrapper
+    return decorator
+
+
+# ====================================================================
+# CACHE KOLOMNAR (FEATHER) UNTUK MEMPERCEPAT COLD START
+# ====================================================================
+DATA_PATH = 'HOTEL_OKUPANSI_FIX.csv'
+COLUMNAR_CACHE_PATH = os.path.splitext(DATA_PATH)[0] + '.feather'
+# Versi format file kolumnar (Feather & dataset berpartisi), disimpan di metadata skema Arrow-nya.
+# Naikkan bila hasil clean_booking_data berubah (tipe kolom, kolom turunan): file versi lain dibangun ulang dari CSV
+COLUMNAR_FORMAT = 1
+COLUMNAR_FORMAT_KEY = b'eda_columnar_format'
+
+# Kolom teks berulang disimpan sebagai kategori, flag 0/1 sebagai int8
+CATEGORY_COLUMNS = ['hotel', 'season', 'Name', 'month']
+FLAG_COLUMNS = ['is_holiday', 'is_event_day', 'is_canceled']
+# Kolom turunan tanggal yang ditambahkan clean_booking_data; hanya untuk agregasi, tidak ikut tampil/di-export
+DERIVED_COLUMNS = ['arrival_date_day_of_month', 'day_of_week']
+
+
+def clean_booking_data(df):
+    """Parsing tanggal, membersihkan kolom Name, dan menetapkan tipe kolom yang hemat memori."""
+    df['arrival_date'] = pd.to_datetime(df['arrival_date'])
+    
+    # Pastikan kolom event_name ada, kalau tidak buat default
+    if 'Name' in df.columns:
+        # Satu kali lintasan: NaN/kosong/spasi saja -> 'No Event'
+        names = df['Name'].fillna('').astype(str).str.strip()
+        df['Name'] = names.where(names != '', 'No Event')
+    else:
+        df['Name'] = 'No Event'
+    
+    for col in FLAG_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna(0).astype('int8')
+    
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    # Kolom turunan tanggal dihitung sekali di sini, bukan di tiap filter/rerun (lihat DERIVED_DATE_KEYS)
+    df['arrival_date_day_of_month'] = df['arrival_date'].dt.day.astype('int8')
+    df['day_of_week'] = df['arrival_date'].dt.day_name().astype('category')
+    
+    return downcast_numeric_columns(df)
+
+
+def downcast_numeric_columns(df):
+    """Integer ke tipe terkecil yang masih memuat semua nilainya, float lain ke float32 bila tanpa kehilangan nilai.
+    
+    Ukuran yang diagregasi (CUBE_MEASURES) tetap float64 agar median eksak & total tidak bergeser.
+    Tipe ringkas ini hanya untuk internal; original_dtypes mengembalikannya untuk tampilan & export.
+    """
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes('float').columns:
+        if col not in CUBE_MEASURES:
+            values = df[col].to_numpy()
+            compact = values.astype('float32')
+            # Mis. 0.1 tidak tepat di float32: kolom seperti itu dibiarkan float64
+            if np.array_equal(compact.astype(values.dtype), values, equal_nan=True):
+                df[col] = compact
+    return df
+
+
+def original_dtypes(frame):
+    """Baris booking untuk tampilan & export: tanpa DERIVED_COLUMNS, integer/float kembali ke int64/float64 seperti CSV.
+    
+    Flag int8 dan kolom kategori dibiarkan (nilainya sama persis).
+    """
+    frame = frame.drop(columns=[col for col in DERIVED_COLUMNS if col in frame.columns])
+    restore = {}
+    for col, dtype in frame.dtypes.items():
+        if col in FLAG_COLUMNS:
+            continue
+        if pd.api.types.is_integer_dtype(dtype) and dtype != np.int64:
+            restore[col] = frame[col].astype('int64')
+        elif dtype == np.float32:
+            # downcast_numeric_columns hanya membuat float32 yang kembali tepat ke nilai float64 asalnya
+            restore[col] = frame[col].astype('float64')
+    return frame.assign(**restore) if restore else frame
+
+
+def get_data_version():
+    """Versi data berdasarkan waktu modifikasi CSV sumber.
+    
+    Tanpa CSV: direktori dataset berpartisi (mode berpartisi membacanya langsung), atau cache Feather.
+    """
+    if os.path.exists(DATA_PATH):
+        return get_file_version(DATA_PATH)
+    if PARTITIONED_LAYOUT and os.path.isdir(PARTITIONED_DATASET_PATH):
+        return get_directory_version(PARTITIONED_DATASET_PATH)
+    if os.path.exists(COLUMNAR_CACHE_PATH):
+        return get_file_version(COLUMNAR_CACHE_PATH)
+    raise FileNotFoundError(DATA_PATH)
+
+
+def get_file_version(path):
+    stat = os.stat(path)
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def data_version_path(data_version):
+    """File atau direktori data yang diwakili `data_version` (lihat get_data_version)."""
+    for path in (DATA_PATH, PARTITIONED_DATASET_PATH, COLUMNAR_CACHE_PATH):
+        if data_version.startswith(path + ':'):
+            return path
+    raise ValueError(data_version)
+
+
+def columnar_table(df):
+    """Tabel Arrow dari frame bersih, dengan COLUMNAR_FORMAT di metadata skemanya."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.replace_schema_metadata({**table.schema.metadata, COLUMNAR_FORMAT_KEY: str(COLUMNAR_FORMAT).encode()})
+
+
+def has_columnar_format(schema):
+    return (schema.metadata or {}).get(COLUMNAR_FORMAT_KEY) == str(COLUMNAR_FORMAT).encode()
+
+
+def is_columnar_cache_fresh():
+    """Cache dianggap valid jika ada, tidak lebih tua dari CSV sumber, dan formatnya COLUMNAR_FORMAT.
+    
+    Tanpa CSV, cache yang ada selalu dipakai: tidak ada sumber untuk membangunnya ulang.
+    """
+    if not os.path.exists(COLUMNAR_CACHE_PATH):
+        return False
+    if not os.path.exists(DATA_PATH):
+        return True
+    if os.path.getmtime(COLUMNAR_CACHE_PATH) < os.path.getmtime(DATA_PATH):
+        return False
+    # Hanya skema (footer file) yang dibaca, bukan datanya
+    try:
+        with pa.memory_map(COLUMNAR_CACHE_PATH) as source:
+            return has_columnar_format(pa.ipc.open_file(source).schema)
+    except (OSError, pa.ArrowException):
+        return False
+
+
+@contextlib.contextmanager
+def file_lock(lock_path):
+    """Kunci eksklusif antarproses (fcntl.flock); tanpa fcntl atau di direktori read-only jadi no-op."""
+    try:
+        lock_file = open(lock_path, 'a')
+    except OSError:
+        lock_file = None
+    if fcntl is None or lock_file is None:
+        yield
+        return
+    
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_columnar_cache():
+    """Membangun cache Feather bila basi; dengan banyak proses dashboard hanya satu yang mem-parse CSV.
+    
+    Mengembalikan frame hasil build hanya bila cache tidak bisa ditulis (direktori read-only), selain itu None.
+    """
+    if is_columnar_cache_fresh():
+        return None
+    with file_lock(COLUMNAR_CACHE_PATH + '.lock'):
+        # Proses lain mungkin sudah selesai membangunnya selama kita menunggu kunci
+        if is_columnar_cache_fresh():
+            return None
+        df = build_columnar_cache()
+    return None if is_columnar_cache_fresh() else df
+
+
+def build_columnar_cache():
+    """Membaca CSV sekali, membersihkannya, lalu menyimpan hasilnya sebagai Feather di samping CSV."""
+    df = clean_booking_data(pd.read_csv(DATA_PATH))
+    
+    # Tulis ke file sementara lalu rename agar proses lain tidak membaca file setengah jadi
+    tmp_path = f"{COLUMNAR_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(columnar_table(df), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, COLUMNAR_CACHE_PATH)
+    except OSError:
+        # Direktori read-only: tetap jalan tanpa cache di disk
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+
+# Load data: tanpa st.cache_data, karena itu menyalin frame untuk tiap pemanggil.
+# Satu-satunya pemegang hasilnya adalah BookingStore (cache_resource), jadi data hanya ada sekali per proses.
+@timed_stage('load_data')
+def load_data(data_version):
+    # PASTIKAN PATH FILE ANDA SUDAH BENAR DI SINI (lihat DATA_PATH)
+    # data_version ikut menjadi key cache, jadi CSV yang berubah memicu rebuild
+    df = ensure_columnar_cache()
+    if df is not None:
+        return df
+    
+    # Feather tanpa kompresi bisa di-memory-map; dengan split_blocks kolom numerik tanpa null
+    # menjadi view ke halaman file itu (page cache OS), bukan salinan di heap proses. Semua proses
+    # dashboard yang me-map file yang sama berbagi halaman fisik yang sama.
+    table = feather.read_table(COLUMNAR_CACHE_PATH, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+# ====================================================================
+# DATASET TERPARTISI (HOTEL/TAHUN/BULAN) DENGAN PREDICATE PUSHDOWN
+# ====================================================================
+# Aktifkan bila data disimpan sebagai Parquet berpartisi hive: hotel=.../year=.../month=.../*.parquet
+# Bila CSV sumber ada, dataset ini dibangun ulang darinya setiap kali CSV lebih baru
+PARTITIONED_LAYOUT = False
+PARTITIONED_DATASET_PATH = os.path.splitext(DATA_PATH)[0] + '_partitioned'
+PARTITION_COLUMNS = ['hotel', 'year', 'month']
+
+# Kolom yang dipakai grafik & ringkasan; kolom lain hanya dibaca untuk tab detail (browser data/export)
+DASHBOARD_COLUMNS = [
+    'hotel', 'arrival_date', 'year', 'month', 'season', 'Name',
+    'is_holiday', 'is_event_day', 'is_canceled', 'occupancy_per_hari', 'adr', 'total_tamu'
+]
+
+# Jumlah irisan (kombinasi pilihan partisi) yang disimpan di memori sekaligus
+PARTITION_SLICE_CACHE_ENTRIES = 8
+
+
+def get_directory_version(path):
+    """Versi direktori dataset dari jumlah, ukuran, dan mtime terbaru semua file di dalamnya."""
+    n_files, total_size, latest = 0, 0, 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            n_files += 1
+            total_size += stat.st_size
+            latest = max(latest, stat.st_mtime_ns)
+    return f"{path}:{latest}:{n_files}:{total_size}"
+
+
+def is_partitioned_dataset_fresh():
+    """Dataset berpartisi valid jika ada, tidak lebih tua dari CSV sumber, dan formatnya COLUMNAR_FORMAT."""
+    if not os.path.isdir(PARTITIONED_DATASET_PATH):
+        return False
+    if not os.path.exists(DATA_PATH):
+        return True
+    if os.path.getmtime(PARTITIONED_DATASET_PATH) < os.path.getmtime(DATA_PATH):
+        return False
+    # Semua file ditulis sekaligus oleh build_partitioned_dataset, jadi skema satu file sudah mewakili
+    for root, _, files in os.walk(PARTITIONED_DATASET_PATH):
+        for name in files:
+            if name.endswith('.parquet'):
+                try:
+                    return has_columnar_format(pq.read_schema(os.path.join(root, name)))
+                except (OSError, pa.ArrowException):
+                    return False
+    return False
+
+
+def build_partitioned_dataset():
+    """Menulis CSV yang sudah dibersihkan sebagai Parquet berpartisi hotel/year/month."""
+    df = clean_booking_data(pd.read_csv(DATA_PATH))
+    # Nilai partisi ditulis di nama direktori, jadi simpan sebagai tipe biasa, bukan kategori
+    df = df.astype({'hotel': str, 'year': 'int64', 'month': 'int64'})
+    
+    # Tulis ke direktori sementara lalu tukar agar pembaca tidak melihat dataset setengah jadi
+    tmp_path = f"{PARTITIONED_DATASET_PATH}.{os.getpid()}.tmp"
+    old_path = f"{PARTITIONED_DATASET_PATH}.{os.getpid()}.old"
+    try:
+        ds.write_dataset(
+            columnar_table(df), tmp_path,
+            format='parquet', partitioning=PARTITION_COLUMNS, partitioning_flavor='hive',
+            existing_data_behavior='delete_matching'
+        )
+        if os.path.isdir(PARTITIONED_DATASET_PATH):
+            os.replace(PARTITIONED_DATASET_PATH, old_path)
+        os.replace(tmp_path, PARTITIONED_DATASET_PATH)
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+@st.cache_resource(max_entries=1)
+def open_partitioned_dataset(data_version):
+    # Discovery file partisi cukup sekali per versi data
+    if not is_partitioned_dataset_fresh():
+        with file_lock(PARTITIONED_DATASET_PATH + '.lock'):
+            if not is_partitioned_dataset_fresh():
+                build_partitioned_dataset()
+    return ds.dataset(PARTITIONED_DATASET_PATH, format='parquet', partitioning='hive')
+
+
+def dataset_column_order(dataset):
+    """Urutan kolom asli dari metadata pandas di file; kolom partisi hive dibaca paling akhir."""
+    names = dataset.schema.names
+    order = [c['name'] for c in (dataset.schema.pandas_metadata or {}).get('columns', [])]
+    return [c for c in order if c in names] + [c for c in names if c not in order]
+
+
+def restore_partition_types(df, column_order):
+    """Menyamakan tipe & urutan kolom partisi (dibaca sebagai string/int32, paling akhir) dengan hasil load_data."""
+    df = df[[c for c in column_order if c in df.columns] + [c for c in df.columns if c not in column_order]]
+    if 'year' in df.columns:
+        df['year'] = pd.to_numeric(df['year'], downcast='integer')
+    if 'month' in df.columns:
+        df['month'] = df['month'].astype('int64')
+    for col in ['hotel', 'month']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+@st.cache_data
+def load_partition_options(data_version):
+    """Nilai pilihan sidebar dari katalog; bila belum ada, hanya kolom filter dataset berpartisi yang dibaca."""
+    catalog = read_catalog(data_version)
+    if catalog is not None:
+        return catalog['options']
+    
+    dataset = open_partitioned_dataset(data_version)
+    table = dataset.to_table(columns=['hotel', 'year', 'month', 'season', 'arrival_date'])
+    dates = pc.min_max(table['arrival_date'])
+    options = {
+        'hotel': pc.unique(table['hotel']).to_pylist(),
+        'year': [int(v) for v in pc.unique(table['year']).to_pylist()],
+        'month': [int(v) for v in pc.unique(table['month']).to_pylist()],
+        'season': pc.unique(table['season'].combine_chunks().dictionary_decode()).to_pylist(),
+        'min_date': pd.Timestamp(dates['min'].as_py()),
+        'max_date': pd.Timestamp(dates['max'].as_py()),
+        'n_rows': table.num_rows,
+    }
+    # Zone map hanya berlaku untuk urutan baris file utama; di sini cukup pilihan & rentang
+    write_catalog({'data_version': data_version, 'options': options, 'zone_maps': None})
+    return options
+
+
+def partition_filter_expression(partition_signature):
+    """Ekspresi pyarrow dari (hotel, tahun, rentang tanggal, bulan) ternormalisasi; None = tanpa filter."""
+    hotel, years, date_range, months = partition_signature
+    conditions = []
+    if hotel != 'Semua Hotel':
+        conditions.append(pc.field('hotel') == hotel)
+    if years is not None:
+        conditions.append(pc.field('year').isin([int(y) for y in years]))
+    if months is not None:
+        conditions.append(pc.field('month').isin([int(m) for m in months]))
+    if date_range is not None:
+        start, end = (pd.Timestamp(d).to_pydatetime() for d in date_range)
+        conditions.append((pc.field('arrival_date') >= start) & (pc.field('arrival_date') <= end))
+    return functools.reduce(lambda a, b: a & b, conditions) if conditions else None
+
+
+@st.cache_resource(max_entries=PARTITION_SLICE_CACHE_ENTRIES)
+def load_partition_slice(data_version, partition_signature, columns):
+    """Membaca hanya partisi & kolom yang cocok dengan pilihan sidebar, lalu menyiapkan indeks & cube-nya.
+    
+    Hasilnya berbentuk sama dengan snapshot BookingStore. `columns` None berarti semua kolom.
+    """
+    dataset = open_partitioned_dataset(data_version)
+    if columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=partition_filter_expression(partition_signature))
+    df = restore_partition_types(table.to_pandas(split_blocks=True), dataset_column_order(dataset))
+    
+    cube, sketch, topk = build_daily_cube(df)
+    return {
+        'df': df,
+        'filter_index': build_filter_index(df),
+        'cube': cube,
+        'cube_index': build_filter_index(cube),
+        'sketch': sketch,
+        'topk': topk,
+        'event_days': build_event_days(cube),
+        'sample': SampleBackend(lambda: build_stratified_sample(df)),
+        # Agregat dengan filter lengkap di irisan sama dengan di dataset penuh
+        'result_version': dataset_fingerprint(data_version),
+    }
+
+
+# ====================================================================
+# INDEKS FILTER (BITMAP) AGAR FILTER SIDEBAR TIDAK MENYALIN DATAFRAME
+# ====================================================================
+BITMAP_COLUMNS = ['hotel', 'year', 'month', 'season'] + FLAG_COLUMNS
+
+# Zone map: ringkasan per blok baris berurutan agar blok yang pasti tidak cocok dilewati.
+# Harus kelipatan 8 supaya batas blok jatuh tepat di batas byte bitmap packbits.
+ZONE_MAP_CHUNK_ROWS = 8192
+
+
+def build_filter_index(df, zone_maps=None):
+    """Membangun bitmap (packbits) per nilai kolom filter dan urutan posisi baris berdasarkan arrival_date.
+    
+    `zone_maps` dari katalog tersimpan dipakai apa adanya; tanpa itu zone map dihitung dari bitmap.
+    """
+    index = {'n_rows': len(df), 'bitmaps': {}}
+    
+    for col in BITMAP_COLUMNS:
+        codes, uniques = pd.factorize(df[col])
+        index['bitmaps'][col] = {
+            value: np.packbits(codes == code) for code, value in enumerate(uniques)
+        }
+    
+    # Posisi baris terurut menurut tanggal -> rentang tanggal cukup dua kali searchsorted
+    dates = df['arrival_date'].to_numpy()
+    date_order = np.argsort(dates, kind='stable')
+    index['date_order'] = date_order
+    index['sorted_dates'] = dates[date_order]
+    index['zone_maps'] = build_zone_maps(index) if zone_maps is None else zone_maps
+    
+    return index
+
+
+def build_zone_maps(index, chunk_rows=ZONE_MAP_CHUNK_ROWS):
+    """Per blok `chunk_rows` baris: min/max arrival_date dan nilai kolom bitmap yang muncul di blok itu."""
+    n_rows = index['n_rows']
+    byte_starts = np.arange(0, (n_rows + 7) // 8, chunk_rows // 8)
+    row_starts = np.arange(0, n_rows, chunk_rows)
+    
+    # Kembalikan tanggal ke urutan baris asli agar tiap blok bisa di-reduce sebagai irisan berurutan
+    dates = np.empty_like(index['sorted_dates'])
+    dates[index['date_order']] = index['sorted_dates']
+    return {
+        'chunk_rows': chunk_rows,
+        'date_min': np.minimum.reduceat(dates, row_starts),
+        'date_max': np.maximum.reduceat(dates, row_starts),
+        'present': {
+            col: {value: np.maximum.reduceat(bits, byte_starts) > 0 for value, bits in bitmaps.items()}
+            for col, bitmaps in index['bitmaps'].items()
+        },
+    }
+
+
+def filter_conditions(filters):
+    """Pilihan sidebar sebagai daftar (kolom bitmap, nilai yang diterima) plus batas tanggal (atau None)."""
+    conditions = []
+    if filters['hotel'] != 'Semua Hotel':
+        conditions.append(('hotel', [filters['hotel']]))
+    if filters['years']:
+        conditions.append(('year', filters['years']))
+    if filters['months']:
+        conditions.append(('month', filters['months']))
+    if filters['seasons']:
+        conditions.append(('season', filters['seasons']))
+    if filters['only_holidays']:
+        conditions.append(('is_holiday', [1]))
+    if filters['only_events']:
+        conditions.append(('is_event_day', [1]))
+    if filters['exclude_canceled']:
+        conditions.append(('is_canceled', [0]))
+    
+    date_bounds = None
+    if len(filters['date_range']) == 2:
+        date_bounds = tuple(np.datetime64(pd.to_datetime(d)) for d in filters['date_range'])
+    return conditions, date_bounds
+
+
+def zone_map_chunks(zone_maps, conditions, date_bounds):
+    """Bool per blok: False bila zone map membuktikan tidak ada baris blok itu yang lolos filter."""
+    keep = np.ones(len(zone_maps['date_min']), dtype=bool)
+    for col, values in conditions:
+        present = zone_maps['present'][col]
+        hits = [present[v] for v in values if v in present]
+        keep &= np.logical_or.reduce(hits) if hits else False
+    if date_bounds is not None:
+        keep &= (zone_maps['date_max'] >= date_bounds[0]) & (zone_maps['date_min'] <= date_bounds[1])
+    return keep
+
+
+def _chunk_runs(keep, chunk_rows, n_rows):
+    """Rentang baris [start, stop) dari blok-blok berurutan yang lolos zone map."""
+    edges = np.flatnonzero(np.diff(np.concatenate([[False], keep, [False]]).astype(np.int8)))
+    return [(int(start) * chunk_rows, min(int(stop) * chunk_rows, n_rows)) for start, stop in zip(edges[::2], edges[1::2])]
+
+
+def _union_bitmaps(index, col, values, byte_slice=slice(None)):
+    """OR dari bitmap semua nilai terpilih pada satu kolom (hanya byte di `byte_slice`)."""
+    bitmaps = index['bitmaps'][col]
+    selected = [bitmaps[v][byte_slice] for v in values if v in bitmaps]
+    if not selected:
+        return np.zeros((index['n_rows'] + 7) // 8, dtype=np.uint8)[byte_slice]
+    return np.bitwise_or.reduce(selected)
+
+
+def resolve_filter_mask(index, filters):
+    """Menggabungkan semua pilihan sidebar menjadi satu mask boolean tanpa DataFrame perantara.
+    
+    Blok yang disingkirkan zone map tidak disentuh sama sekali; mask-nya tetap False.
+    """
+    n_rows = index['n_rows']
+    conditions, date_bounds = filter_conditions(filters)
+    
+    date_bits = None
+    if date_bounds is not None:
+        sorted_dates = index['sorted_dates']
+        lo = sorted_dates.searchsorted(date_bounds[0], side='left')
+        hi = sorted_dates.searchsorted(date_bounds[1], side='right')
+        if lo > 0 or hi < n_rows:
+            date_mask = np.zeros(n_rows, dtype=bool)
+            date_mask[index['date_order'][lo:hi]] = True
+            date_bits = np.packbits(date_mask)
+    
+    if not conditions and date_bits is None:
+        return np.ones(n_rows, dtype=bool)
+    
+    zone_maps = index['zone_maps']
+    keep = zone_map_chunks(zone_maps, conditions, date_bounds)
+    mask = np.zeros(n_rows, dtype=bool)
+    for start, stop in _chunk_runs(keep, zone_maps['chunk_rows'], n_rows):
+        byte_slice = slice(start // 8, (stop + 7) // 8)
+        parts = [_union_bitmaps(index, col, values, byte_slice) for col, values in conditions]
+        if date_bits is not None:
+            parts.append(date_bits[byte_slice])
+        combined = np.bitwise_and.reduce(parts) if len(parts) > 1 else parts[0]
+        mask[start:stop] = np.unpackbits(combined, count=stop - start).view(bool)
+    return mask
+
+
+def extend_filter_index(index, delta):
+    """Menambahkan baris delta (posisi setelah baris lama) ke indeks filter tanpa membangun ulang dari nol."""
+    delta_index = build_filter_index(delta)
+    n_old, n_new = index['n_rows'], delta_index['n_rows']
+    
+    bitmaps = {}
+    for col in BITMAP_COLUMNS:
+        old, new = index['bitmaps'][col], delta_index['bitmaps'][col]
+        bitmaps[col] = {}
+        for value in list(old) + [v for v in new if v not in old]:
+            old_bits = np.unpackbits(old[value], count=n_old) if value in old else np.zeros(n_old, dtype=np.uint8)
+            new_bits = np.unpackbits(new[value], count=n_new) if value in new else np.zeros(n_new, dtype=np.uint8)
+            bitmaps[col][value] = np.packbits(np.concatenate([old_bits, new_bits]))
+    
+    # Sisipkan posisi baru ke urutan tanggal yang sudah ada (tetap terurut)
+    insert_at = index['sorted_dates'].searchsorted(delta_index['sorted_dates'], side='right')
+    extended = {
+        'n_rows': n_old + n_new,
+        'bitmaps': bitmaps,
+        'date_order': np.insert(index['date_order'], insert_at, delta_index['date_order'] + n_old),
+        'sorted_dates': np.insert(index['sorted_dates'], insert_at, delta_index['sorted_dates']),
+    }
+    extended['zone_maps'] = build_zone_maps(extended)
+    return extended
+
+
+# ====================================================================
+# KATALOG DATASET: PILIHAN SIDEBAR, RENTANG & ZONE MAP TANPA MEMINDAI KOLOM
+# ====================================================================
+# Katalog dataset utama disimpan di samping data agar proses lain, restart, dan backend
+# DuckDB/berpartisi tidak perlu memindai kolom hanya untuk mengisi pilihan sidebar
+CATALOG_PATH = os.path.splitext(DATA_PATH)[0] + '.catalog.json'
+CATALOG_FORMAT = 1
+CATALOG_OPTION_COLUMNS = ['hotel', 'year', 'month', 'season']
+
+
+def dataset_options_from_index(filter_index):
+    """Nilai pilihan sidebar (dan jumlah baris total) langsung dari indeks filter dataset penuh."""
+    bitmaps = filter_index['bitmaps']
+    sorted_dates = filter_index['sorted_dates']
+    return {
+        'hotel': list(bitmaps['hotel']),
+        'year': list(bitmaps['year']),
+        'month': list(bitmaps['month']),
+        'season': list(bitmaps['season']),
+        'min_date': pd.Timestamp(sorted_dates[0]),
+        'max_date': pd.Timestamp(sorted_dates[-1]),
+        'n_rows': filter_index['n_rows'],
+    }
+
+
+def build_catalog(filter_index, data_version):
+    """Katalog dari indeks filter: nilai distinct, rentang tanggal, jumlah baris, dan zone map."""
+    return {
+        'data_version': data_version,
+        'options': dataset_options_from_index(filter_index),
+        'zone_maps': filter_index['zone_maps'],
+    }
+
+
+def catalog_zone_maps(catalog, n_rows):
+    """Zone map katalog bila cocok dengan frame yang dimuat (jumlah baris & ukuran blok), selain itu None."""
+    if catalog is None or catalog['zone_maps'] is None:
+        return None
+    zone_maps = catalog['zone_maps']
+    if catalog['options']['n_rows'] != n_rows or zone_maps['chunk_rows'] != ZONE_MAP_CHUNK_ROWS:
+        return None
+    return zone_maps
+
+
+def _chunk_flags_to_text(flags):
+    return (flags.astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+
+
+def _chunk_flags_from_text(text):
+    return np.frombuffer(text.encode('ascii'), dtype=np.uint8) == ord('1')
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def write_catalog(catalog):
+    """Menyimpan katalog sebagai JSON (tulis ke file sementara lalu rename); direktori read-only dilewati."""
+    options = catalog['options']
+    payload = {
+        'format': CATALOG_FORMAT,
+        'data_version': catalog['data_version'],
+        'n_rows': int(options['n_rows']),
+        'columns': {col: [_json_value(v) for v in options[col]] for col in CATALOG_OPTION_COLUMNS},
+        'arrival_date': {'min': options['min_date'].isoformat(), 'max': options['max_date'].isoformat()},
+        'zone_maps': None,
+    }
+    zone_maps = catalog['zone_maps']
+    if zone_maps is not None:
+        payload['zone_maps'] = {
+            'chunk_rows': zone_maps['chunk_rows'],
+            'date_min': np.datetime_as_string(zone_maps['date_min'], unit='s').tolist(),
+            'date_max': np.datetime_as_string(zone_maps['date_max'], unit='s').tolist(),
+            # Per kolom: [nilai, "0110..."] = blok mana saja yang memuat nilai itu
+            'present': {
+                col: [[_json_value(value), _chunk_flags_to_text(flags)] for value, flags in present.items()]
+                for col, present in zone_maps['present'].items()
+            },
+        }
+    
+    tmp_path = f"{CATALOG_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, CATALOG_PATH)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_catalog(data_version):
+    """Katalog tersimpan bila masih untuk versi data ini, selain itu None."""
+    try:
+        with open(CATALOG_PATH) as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get('format') != CATALOG_FORMAT or payload.get('data_version') != data_version:
+        return None
+    
+    options = {col: payload['columns'][col] for col in CATALOG_OPTION_COLUMNS}
+    options.update({
+        'min_date': pd.Timestamp(payload['arrival_date']['min']),
+        'max_date': pd.Timestamp(payload['arrival_date']['max']),
+        'n_rows': payload['n_rows'],
+    })
+    zone_maps = payload['zone_maps']
+    if zone_maps is not None:
+        zone_maps = {
+            'chunk_rows': zone_maps['chunk_rows'],
+            'date_min': np.array(zone_maps['date_min'], dtype='datetime64[ns]'),
+            'date_max': np.array(zone_maps['date_max'], dtype='datetime64[ns]'),
+            'present': {
+                col: {value: _chunk_flags_from_text(text) for value, text in present}
+                for col, present in zone_maps['present'].items()
+            },
+        }
+    return {'data_version': data_version, 'options': options, 'zone_maps': zone_maps}
+
+
+# ====================================================================
+# CUBE HARIAN: AGREGAT SIAP ROLL-UP AGAR GRAFIK TIDAK MEMINDAI BARIS BOOKING
+# ====================================================================
+CUBE_KEYS = ['hotel', 'arrival_date', 'is_canceled', 'is_holiday', 'is_event_day', 'Name']
+# Kolom yang ditentukan oleh tanggal: ikut disimpan agar filter & grouping tetap bisa dilakukan di cube
+CUBE_DATE_ATTRS = ['year', 'month', 'season']
+CUBE_MEASURES = ['occupancy_per_hari', 'adr', 'total_tamu']
+# Mean dan Total bisa di-roll-up dari (jumlah, cacah); median memakai sketch kuantil per baris cube
+CUBE_AGG_FUNCS = ('mean', 'sum')
+# Galat absolut maksimum median dari sketch (poin persen okupansi); lebar bin = 2 x galat
+MEDIAN_SKETCH_ERROR = 0.25
+# Tabel Top K tab detail: top-k booking disimpan per baris cube, jadi K bisa dipilih sampai batas ini
+TOPK_MAX_K = 50
+TOPK_FLAGS = ['is_holiday', 'is_event_day']
+TOPK_MEASURE = 'occupancy_per_hari'
+
+
+def build_daily_cube(df):
+    """Mengagregasi baris booking menjadi cube (hotel, tanggal, flag, Name) berisi jumlah & cacah tiap ukuran.
+    
+    Sekaligus mengembalikan sketch kuantil dan top-k per baris cube, keduanya terhubung lewat `cube_row`.
+    """
+    named_aggs = {'n_bookings': ('occupancy_per_hari', 'size')}
+    for measure in CUBE_MEASURES:
+        named_aggs[f'{measure}_sum'] = (measure, 'sum')
+        named_aggs[f'{measure}_count'] = (measure, 'count')
+    
+    grouped = df.groupby(CUBE_KEYS + CUBE_DATE_ATTRS, observed=True, sort=False)
+    cube = grouped.agg(**named_aggs).reset_index()
+    cube['arrival_date_day_of_month'] = cube['arrival_date'].dt.day
+    cube['day_of_week'] = cube['arrival_date'].dt.day_name()
+    
+    # Baris dengan key kosong (NaN) tidak masuk cube; ngroup() memberinya -1
+    cube_rows = grouped.ngroup().to_numpy()
+    sketch = build_quantile_sketch(cube_rows, df['occupancy_per_hari'].to_numpy())
+    return cube, sketch, build_topk(df, cube_rows)
+
+
+def build_quantile_sketch(cube_rows, values, error=MEDIAN_SKETCH_ERROR):
+    """Sketch kuantil mergeable: histogram lebar tetap per baris cube dalam format panjang (cube_row, bin, n).
+    
+    Menggabungkan sketch cukup dengan menjumlahkan n per bin, sehingga median grup mana pun
+    bisa dihitung dari sketch baris cube-nya dengan galat maksimum `error`.
+    """
+    valid = ~np.isnan(values) & (cube_rows >= 0)
+    bins = np.floor(values[valid] / (2 * error)).astype('int32')
+    sketch = pd.DataFrame({'cube_row': cube_rows[valid].astype('int32'), 'bin': bins})
+    return sketch.groupby(['cube_row', 'bin']).size().rename('n').astype('int32').reset_index()
+
+
+def build_topk(df, cube_rows, k=TOPK_MAX_K):
+    """Top-k booking hari libur/event per baris cube dalam format panjang (cube_row, row, ukuran detail).
+    
+    Mergeable: top-k dari gabungan baris cube mana pun selalu ada di gabungan top-k masing-masing,
+    jadi tabel Top K untuk filter apa pun cukup memilih baris cube yang lolos filter.
+    `row` = posisi baris di frame booking, dipakai sebagai indeks tabel dan pemecah nilai seri.
+    """
+    flagged = np.logical_or.reduce([df[flag].to_numpy() == 1 for flag in TOPK_FLAGS])
+    values = df[TOPK_MEASURE].to_numpy()
+    # cube_row -1 (key kosong) akan mengindeks baris cube terakhir lewat indeks negatif; dibuang
+    rows = np.flatnonzero(flagged & ~np.isnan(values) & (cube_rows >= 0))
+    
+    topk = pd.DataFrame({'cube_row': cube_rows[rows].astype('int32'), 'row': rows})
+    for col in CUBE_MEASURES:
+        topk[col] = df[col].to_numpy()[rows]
+    # Sort stabil menjaga urutan posisi untuk nilai seri (sama dengan nlargest keep='first')
+    topk = topk.sort_values(TOPK_MEASURE, ascending=False, kind='stable')
+    return topk[topk.groupby('cube_row').cumcount().to_numpy() < k].reset_index(drop=True)
+
+
+def topk_rows(cube, cube_mask, topk, flag, n):
+    """Top-n booking dengan `flag` = 1 dari baris cube yang lolos filter, tanpa menyentuh baris booking."""
+    in_filter = cube_mask & (cube[flag].to_numpy() == 1)
+    candidates = topk[in_filter[topk['cube_row'].to_numpy()]]
+    top = candidates.sort_values([TOPK_MEASURE, 'row'], ascending=[False, True]).head(n)
+    
+    # Kunci (tanggal, hotel, Name) diambil dari baris cube-nya
+    keys = cube.iloc[top['cube_row'].to_numpy()]
+    frame = pd.DataFrame({col: keys[col].array for col in ['arrival_date', 'hotel', 'Name']}, index=top['row'].to_numpy())
+    for col in CUBE_MEASURES:
+        frame[col] = top[col].to_numpy()
+    return frame[DETAIL_COLUMNS]
+
+
+def sketch_median(cube, sketch, keys, error=MEDIAN_SKETCH_ERROR):
+    """Median per `keys` dari gabungan sketch baris cube (rata-rata dua bin tengah seperti median pandas)."""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    merged = sketch.join(cube[keys], on='cube_row', how='inner')
+    counts = merged.groupby(keys + ['bin'], observed=True)['n'].sum().reset_index()
+    
+    group = counts.groupby(keys, observed=True, sort=False)['n']
+    counts['cum'] = group.cumsum()
+    counts['total'] = group.transform('sum')
+    
+    bin_centers = []
+    for rank in ((counts['total'] - 1) // 2, counts['total'] // 2):
+        reached = counts[counts['cum'] > rank]
+        bin_centers.append(reached.groupby(keys, observed=True)['bin'].first())
+    
+    result = ((bin_centers[0] + bin_centers[1]) / 2 + 0.5) * (2 * error)
+    if len(keys) == 1:
+        result.index.name = keys[0]
+    return result
+
+
+def histogram_median(bin_counts, error=MEDIAN_SKETCH_ERROR):
+    """Median dari satu histogram sketch hasil merge (Series n per bin, indeks bin terurut)."""
+    bins = bin_counts.index.to_numpy()
+    cum = np.cumsum(bin_counts.to_numpy())
+    total = cum[-1]
+    lo = bins[np.searchsorted(cum, (total - 1) // 2, side='right')]
+    hi = bins[np.searchsorted(cum, total // 2, side='right')]
+    return ((lo + hi) / 2 + 0.5) * (2 * error)
+
+
+def rollup_cube(cube, keys, agg_func, measure='occupancy_per_hari', sketch=None):
+    """Roll-up satu ukuran dari cube ke level `keys` (sum = total jumlah, mean = total jumlah / total cacah)."""
+    if agg_func == 'median':
+        return sketch_median(cube, sketch, keys).rename(measure)
+    
+    totals = cube.groupby(keys, observed=True)[[f'{measure}_sum', f'{measure}_count']].sum()
+    if agg_func == 'sum':
+        result = totals[f'{measure}_sum']
+    else:
+        result = totals[f'{measure}_sum'] / totals[f'{measure}_count']
+    return result.rename(measure)
+
+
+# Kolom turunan tanggal yang ada di cube dan (lewat clean_booking_data) di baris booking;
+# untuk dataset lama/eksternal tanpa kolom ini dihitung sebagai key sementara
+DERIVED_DATE_KEYS = {
+    'arrival_date_day_of_month': lambda dates: dates.dt.day,
+    'day_of_week': lambda dates: dates.dt.day_name(),
+}
+
+
+def aggregate_occupancy(selection, filtered_cube, keys, agg_func, sketch=None):
+    """Agregasi occupancy_per_hari per `keys`: dari cube bila tersedia, selain itu dari baris booking."""
+    if filtered_cube is not None:
+        return rollup_cube(filtered_cube, keys, agg_func, sketch=sketch)
+    
+    return selection.aggregate(keys, {'occupancy_per_hari': ('occupancy_per_hari', agg_func)})['occupancy_per_hari']
+
+
+def group_keys(frame, keys):
+    """Key groupby untuk baris booking; kolom turunan tanggal (DERIVED_DATE_KEYS) dihitung dari arrival_date."""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    return [
+        DERIVED_DATE_KEYS[key](frame['arrival_date']).rename(key)
+        if key not in frame.columns and key in DERIVED_DATE_KEYS else key
+        for key in keys
+    ]
+
+
+def aggregate_rows(df, mask, keys, aggregations, any_flags=()):
+    """RowSelection.aggregate untuk frame di memori: hanya kolom yang dipakai yang diambil lewat mask."""
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    columns = keys + [col for col, _ in aggregations.values()]
+    if not set(keys) <= set(df.columns):
+        # Key turunan tanggal dihitung group_keys dari arrival_date
+        columns.append('arrival_date')
+    columns = [col for col in dict.fromkeys(columns) if col in df.columns]
+    if any_flags:
+        mask = mask & np.logical_or.reduce([df[flag].to_numpy() == 1 for flag in any_flags])
+    frame = df.loc[mask, columns]
+    aggregations = {name: (col, ROW_AGGREGATES.get(func, func)) for name, (col, func) in aggregations.items()}
+    return frame.groupby(group_keys(frame, keys), observed=True).agg(**aggregations)
+
+
+def join_event_names(names):
+    """Nama event unik dalam satu grup (urutan kemunculan), atau 'Hari Biasa' bila tidak ada."""
+    names = names[names != 'No Event']
+    return ', '.join(names.unique()) if len(names) > 0 else 'Hari Biasa'
+
+
+# Fungsi agregat RowSelection.aggregate di luar nama bawaan pandas (nama string, sama dengan kunci
+# DUCKDB_AGGREGATES, agar spesifikasi agregasi sama untuk kedua backend)
+ROW_AGGREGATES = {'event_names': join_event_names}
+
+
+def daily_from_cube(filtered_cube, agg_func, sketch=None):
+    """Versi cube dari agregasi harian untuk grafik trend (urutan nama event tetap sesuai kemunculan)."""
+    grouped = filtered_cube.groupby('arrival_date')
+    daily = pd.DataFrame({
+        'occupancy_per_hari': rollup_cube(filtered_cube, 'arrival_date', agg_func, sketch=sketch),
+        'is_holiday': grouped['is_holiday'].max(),
+        'is_event_day': grouped['is_event_day'].max(),
+        'total_tamu': grouped['total_tamu_sum'].sum(),
+        'adr': rollup_cube(filtered_cube, 'arrival_date', 'mean', 'adr'),
+    })
+    
+    named = filtered_cube.loc[filtered_cube['Name'] != 'No Event', ['arrival_date', 'Name']]
+    names = named.drop_duplicates().astype({'Name': str}).groupby('arrival_date')['Name'].agg(', '.join)
+    daily['Name'] = names.reindex(daily.index).fillna('Hari Biasa')
+    
+    return daily.reset_index().sort_values('arrival_date')
+
+
+# Kategori baris Event List; hari libur yang juga hari event tetap masuk Hari Libur
+EVENT_CATEGORIES = pd.CategoricalDtype(['🎉 Hari Libur', '🎪 Event'])
+
+
+def build_event_days(cube):
+    """Baris cube untuk hari libur/event (indeks = baris cube), dibangun sekali saat data dimuat.
+    
+    Tab Event List cukup memilih baris tabel kecil ini yang lolos filter, tanpa memindai cube penuh.
+    Granularitasnya sama dengan cube (per hotel), jadi roll-up ke (tanggal, Name) tetap benar untuk filter apa pun.
+    """
+    is_event_row = (cube['is_holiday'].to_numpy() == 1) | (cube['is_event_day'].to_numpy() == 1)
+    return cube[is_event_row]
+
+
+def event_category(is_holiday):
+    """Kolom Kategori secara vektor dari flag is_holiday hasil agregasi."""
+    codes = np.where(np.asarray(is_holiday) == 1, 0, 1)
+    return pd.Categorical.from_codes(codes, dtype=EVENT_CATEGORIES)
+
+
+def events_from_cube(events_cube, agg_func, sketch=None):
+    """Versi cube dari ringkasan per (tanggal, Name) untuk tab Event List."""
+    keys = ['arrival_date', 'Name']
+    grouped = events_cube.groupby(keys, observed=True)
+    summary = pd.DataFrame({
+        'occupancy_per_hari': rollup_cube(events_cube, keys, agg_func, sketch=sketch),
+        'is_holiday': grouped['is_holiday'].max(),
+        'is_event_day': grouped['is_event_day'].max(),
+        'total_tamu': grouped['total_tamu_sum'].sum(),
+        'adr': rollup_cube(events_cube, keys, 'mean', 'adr'),
+    })
+    return summary.reset_index().sort_values('arrival_date', ascending=False)
+
+
+def build_daily_data(selection, filtered_cube, agg_func, sketch=None):
+    """Agregasi harian untuk grafik trend beserta klasifikasi Day_Type untuk hover."""
+    if filtered_cube is not None:
+        daily_data = daily_from_cube(filtered_cube, agg_func, sketch)
+    else:
+        daily_data = selection.aggregate('arrival_date', {
+            'occupancy_per_hari': ('occupancy_per_hari', agg_func), # Menggunakan selected_agg_func yang sudah di-map
+            'is_holiday': ('is_holiday', 'max'),
+            'is_event_day': ('is_event_day', 'max'),
+            'total_tamu': ('total_tamu', 'sum'),
+            'adr': ('adr', 'mean'),
+            'Name': ('Name', 'event_names'),
+        }).reset_index().sort_values('arrival_date')
+
+    # --- PERBAIKAN LOGIKA DAY_TYPE AGAR HOVER AKURAT ---
+    daily_data['Day_Type'] = 'Hari Biasa'
+    
+    # PENTING: Urutan penentuan kategori harus dari yang paling spesifik (Libur & Event) ke yang paling umum (Libur/Event)
+    daily_data.loc[(daily_data['is_holiday'] == 1) & (daily_data['is_event_day'] == 1), 'Day_Type'] = '🥳 Libur & Event'
+    daily_data.loc[(daily_data['is_holiday'] == 1) & (daily_data['is_event_day'] == 0), 'Day_Type'] = '🎉 Hari Libur'
+    daily_data.loc[(daily_data['is_holiday'] == 0) & (daily_data['is_event_day'] == 1), 'Day_Type'] = '🎪 Hari Event'
+    # Hari Biasa sudah default
+    
+    return daily_data
+
+
+def build_monthly_data(selection, filtered_cube, agg_func, sketch=None):
+    """Okupansi per (tahun, bulan) dengan label Tahun-Bulan untuk sumbu X."""
+    monthly_data = aggregate_occupancy(selection, filtered_cube, ['year', 'month'], agg_func, sketch).reset_index()
+    monthly_data['year_month'] = monthly_data['year'].astype(str) + '-' + monthly_data['month'].astype(str).str.zfill(2)
+    return monthly_data
+
+
+def build_season_data(selection, filtered_cube, agg_func, sketch=None):
+    """Okupansi per musim untuk pie chart."""
+    season_data = aggregate_occupancy(selection, filtered_cube, 'season', agg_func, sketch).reset_index()
+    season_data.columns = ['Musim', 'Okupansi']
+    return season_data
+
+
+def build_heatmap_pivot(selection, filtered_cube, agg_func, sketch=None):
+    """Pivot okupansi tanggal (baris) x bulan (kolom) untuk heatmap."""
+    heatmap_data = aggregate_occupancy(selection, filtered_cube, ['month', 'arrival_date_day_of_month'], agg_func, sketch).reset_index()
+    return heatmap_data.pivot(index='arrival_date_day_of_month', columns='month', values='occupancy_per_hari')
+
+
+def build_dow_data(selection, filtered_cube, agg_func, sketch=None):
+    """Okupansi per hari dalam seminggu, urut Senin-Minggu."""
+    dow_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    return aggregate_occupancy(selection, filtered_cube, 'day_of_week', agg_func, sketch).reindex(dow_order).reset_index()
+
+
+SUMMARY_FLAGS = ['is_holiday', 'is_event_day', 'is_canceled']
+SUMMARY_TOTALS = ['n_bookings', 'occupancy_per_hari_sum', 'occupancy_per_hari_count', 'adr_sum', 'adr_count']
+
+# Segmen metric card / bar perbandingan: nama -> (flag, nilai)
+SUMMARY_SEGMENTS = {
+    'normal': ('is_holiday', 0),
+    'holiday': ('is_holiday', 1),
+    'no_event': ('is_event_day', 0),
+    'event': ('is_event_day', 1),
+}
+
+
+def build_summary(selection, filtered_cube, agg_func, sketch=None):
+    """Semua angka ringkasan (metric card, insight, bar perbandingan) dari satu agregasi per kombinasi flag.
+    
+    Hasilnya dict: total_bookings, avg_adr, cancellation_rate, serta occupancy & bookings per segmen.
+    """
+    bins = None
+    if filtered_cube is not None:
+        totals = filtered_cube.groupby(SUMMARY_FLAGS)[SUMMARY_TOTALS].sum()
+        if agg_func == 'median':
+            merged = sketch.join(filtered_cube[SUMMARY_FLAGS], on='cube_row', how='inner')
+            bins = merged.groupby(SUMMARY_FLAGS + ['bin'])['n'].sum()
+    else:
+        totals = selection.aggregate(SUMMARY_FLAGS, {
+            'n_bookings': ('occupancy_per_hari', 'size'),
+            'occupancy_per_hari_sum': ('occupancy_per_hari', 'sum'),
+            'occupancy_per_hari_count': ('occupancy_per_hari', 'count'),
+            'adr_sum': ('adr', 'sum'),
+            'adr_count': ('adr', 'count'),
+        })
+    
+    exact_medians = {}
+    summary = {'occupancy': {}, 'bookings': {}}
+    for segment, (flag, value) in SUMMARY_SEGMENTS.items():
+        part = totals[totals.index.get_level_values(flag) == value]
+        n_bookings = int(part['n_bookings'].sum())
+        summary['bookings'][segment] = n_bookings
+        
+        if n_bookings == 0:
+            occupancy = 0
+        elif agg_func == 'sum':
+            occupancy = part['occupancy_per_hari_sum'].sum()
+        elif agg_func == 'mean':
+            # Booking ada tapi okupansinya kosong semua: count 0, dianggap 0 seperti segmen tanpa booking
+            n_values = part['occupancy_per_hari_count'].sum()
+            occupancy = part['occupancy_per_hari_sum'].sum() / n_values if n_values > 0 else 0
+        elif bins is not None:
+            segment_bins = bins[bins.index.get_level_values(flag) == value]
+            occupancy = histogram_median(segment_bins.groupby(level='bin').sum())
+        else:
+            # Median eksak (audit): dihitung backend per nilai flag (DuckDB: quantile_cont di SQL)
+            if flag not in exact_medians:
+                exact_medians[flag] = selection.aggregate(flag, {'occupancy': ('occupancy_per_hari', 'median')})['occupancy']
+            occupancy = exact_medians[flag].get(value, np.nan)
+        summary['occupancy'][segment] = occupancy
+    
+    # Tiap rasio dijaga dengan pembaginya sendiri: adr boleh kosong di booking yang tetap terhitung
+    total_bookings = int(totals['n_bookings'].sum())
+    n_adr = totals['adr_count'].sum()
+    canceled = totals[totals.index.get_level_values('is_canceled') == 1]['n_bookings'].sum()
+    summary['total_bookings'] = total_bookings
+    summary['avg_adr'] = totals['adr_sum'].sum() / n_adr if n_adr > 0 else 0
+    summary['cancellation_rate'] = canceled / total_bookings * 100 if total_bookings > 0 else 0
+    return summary
+
+
+def build_box_stats(selection, filtered_cube, agg_func, sketch=None):
+    """Statistik box plot okupansi untuk Hari Biasa, Hari Libur, dan Hari Event (butuh nilai per booking)."""
+    return selection.box_stats()
+
+
+def build_events_summary(selection, filtered_cube, agg_func, sketch=None):
+    """Ringkasan per (tanggal, Name) untuk hari libur/event, lengkap dengan kolom Kategori."""
+    if filtered_cube is not None:
+        # Baris cube yang lolos filter (label indeks = posisi di cube), dipakai untuk memilih event_days
+        cube = selection.backend.cube
+        in_filter = np.zeros(len(cube), dtype=bool)
+        in_filter[filtered_cube.index.to_numpy()] = True
+        event_days = selection.backend.event_days
+        events_cube = event_days[in_filter[event_days.index.to_numpy()]]
+        events_summary = events_from_cube(events_cube, agg_func, sketch)
+    else:
+        events_summary = selection.aggregate(['arrival_date', 'Name'], {
+            'occupancy_per_hari': ('occupancy_per_hari', agg_func),
+            'is_holiday': ('is_holiday', 'max'),
+            'is_event_day': ('is_event_day', 'max'),
+            'total_tamu': ('total_tamu', 'sum'),
+            'adr': ('adr', 'mean'),
+        }, any_flags=['is_holiday', 'is_event_day']).reset_index().sort_values('arrival_date', ascending=False)
+    
+    events_summary['Kategori'] = event_category(events_summary['is_holiday'])
+    return events_summary
+
+
+# ====================================================================
+# CACHE HASIL PERSISTEN DI DISK (LINTAS RESTART & REPLIKA)
+# ====================================================================
+# Tier kedua di belakang AggregateCache: tabel turunan dataset (cube, sketch, top-k, sampel) dan agregat
+# disimpan di SQLite (mode WAL, aman dibaca/ditulis banyak proses). Replika yang berbagi file ini, dan
+# proses yang baru restart, langsung memakai hasil yang sudah dihitung proses lain.
+# Nilai disimpan sebagai data saja (frame -> Arrow IPC, sisanya JSON), tidak pernah pickle: isi file yang
+# diubah pihak lain paling buruk menghasilkan data salah, bukan eksekusi kode di replika.
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_PATH = os.environ.get('EDA_RESULT_CACHE_PATH', os.path.splitext(DATA_PATH)[0] + '.results.sqlite')
+RESULT_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+RESULT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Naikkan bila format nilai yang disimpan berubah tanpa perubahan kode builder
+RESULT_CACHE_FORMAT = 3
+# Detik menunggu kunci tulis proses lain sebelum operasi cache dilewati
+RESULT_CACHE_BUSY_TIMEOUT = 10
+
+
+def file_fingerprint(path, block_size=1024 * 1024):
+    """SHA-256 isi file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stored_file_fingerprint(path):
+    """file_fingerprint yang disimpan di cache hasil per (path, ukuran, mtime, inode): file hanya di-hash
+    sekali, bukan di setiap cold start."""
+    stat = os.stat(path)
+    key = ('file_fingerprint', os.path.abspath(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    return persisted_result(key, lambda: file_fingerprint(path), code_independent=True)
+
+
+def directory_fingerprint(path):
+    """SHA-256 dari (path relatif, hash isi) semua file di direktori, terurut."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(f"{os.path.relpath(file_path, path)}\0{stored_file_fingerprint(file_path)}\n".encode())
+    return digest.hexdigest()
+
+
+@st.cache_resource(max_entries=1)
+def dataset_fingerprint(data_version):
+    """Hash isi data untuk `data_version`: replika dengan salinan data yang sama berbagi key cache."""
+    path = data_version_path(data_version)
+    return directory_fingerprint(path) if os.path.isdir(path) else stored_file_fingerprint(path)
+
+
+def _frame_to_arrow(frame):
+    """DataFrame -> (tabel data, tabel label kolom, deskripsi index); tipe kolom (kategori, int8, ...) tetap."""
+    arrays = {}
+    if isinstance(frame.index, pd.RangeIndex):
+        index = {'range': [frame.index.start, frame.index.stop, frame.index.step]}
+    else:
+        index = {'names': [_json_value(name) for name in frame.index.names]}
+        for level in range(frame.index.nlevels):
+            arrays[f'i{level}'] = pa.Array.from_pandas(pd.Series(frame.index.get_level_values(level)))
+    for position in range(frame.shape[1]):
+        arrays[f'c{position}'] = pa.Array.from_pandas(frame.iloc[:, position])
+    labels = pa.table({'label': pa.Array.from_pandas(pd.Series(frame.columns))})
+    index['columns_name'] = _json_value(frame.columns.name)
+    return pa.table(arrays), labels, index
+
+
+def _frame_from_arrow(data, labels, index):
+    data = data.to_pandas()
+    columns = pd.Index(labels.column('label').to_pandas().array, name=index['columns_name'])
+    frame = data[[f'c{position}' for position in range(len(columns))]].set_axis(columns, axis=1)
+    if 'range' in index:
+        return frame.set_axis(pd.RangeIndex(*index['range']), axis=0)
+    levels = [data[f'i{level}'].array for level in range(len(index['names']))]
+    if len(levels) == 1:
+        return frame.set_axis(pd.Index(levels[0], name=index['names'][0]), axis=0)
+    return frame.set_axis(pd.MultiIndex.from_arrays(levels, names=index['names']), axis=0)
+
+
+def encode_result(value):
+    """Nilai hasil (DataFrame, tuple/list/dict berisi skalar & frame) -> bytes tanpa pickle.
+    
+    Format: panjang manifest JSON (8 byte) + manifest, lalu tiap tabel Arrow sebagai stream IPC dengan
+    awalan panjang. Tipe lain (Series, objek sembarang) -> TypeError: nilai itu tidak disimpan.
+    """
+    tables = []
+    
+    def encode(item):
+        if isinstance(item, pd.DataFrame):
+            data, labels, index = _frame_to_arrow(item)
+            tables.extend([data, labels])
+            return {'__frame__': len(tables) - 2, 'index': index, 'attrs': encode(item.attrs)}
+        if isinstance(item, tuple):
+            return {'__tuple__': [encode(v) for v in item]}
+        if isinstance(item, list):
+            return [encode(v) for v in item]
+        if isinstance(item, np.ndarray):
+            return [encode(v) for v in item.tolist()]
+        if isinstance(item, dict):
+            if not all(isinstance(k, str) and not k.startswith('__') for k in item):
+                raise TypeError("key dict harus string")
+            return {k: encode(v) for k, v in item.items()}
+        item = _json_value(item)
+        if item is None or isinstance(item, (str, int, float, bool)):
+            return item
+        raise TypeError(f"tipe {type(item).__name__} tidak bisa disimpan di cache hasil")
+    
+    manifest = json.dumps(encode(value)).encode()
+    chunks = [len(manifest).to_bytes(8, 'little'), manifest]
+    for table in tables:
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            # Satu batch eksplisit, juga untuk tabel kosong: tanpa batch, dictionary (kategori) tidak ikut tertulis
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [column.combine_chunks() for column in table.columns], schema=table.schema
+            ))
+        payload = sink.getvalue().to_pybytes()
+        chunks += [len(payload).to_bytes(8, 'little'), payload]
+    return b''.join(chunks)
+
+
+def decode_result(blob):
+    """Kebalikan encode_result."""
+    view = memoryview(blob)
+    parts, offset = [], 0
+    while offset < len(view):
+        size = int.from_bytes(view[offset:offset + 8], 'little')
+        parts.append(view[offset + 8:offset + 8 + size])
+        offset += 8 + size
+    manifest, tables = json.loads(bytes(parts[0])), [pa.ipc.open_stream(pa.py_buffer(part)).read_all() for part in parts[1:]]
+    
+    def decode(item):
+        if isinstance(item, list):
+            return [decode(v) for v in item]
+        if not isinstance(item, dict):
+            return item
+        if '__frame__' in item:
+            position = item['__frame__']
+            frame = _frame_from_arrow(tables[position], tables[position + 1], item['index'])
+            frame.attrs.update(decode(item['attrs']))
+            return frame
+        if '__tuple__' in item:
+            return tuple(decode(v) for v in item['__tuple__'])
+        return {k: decode(v) for k, v in item.items()}
+    
+    return decode(manifest)
+
+
+class DiskResultCache:
+    """Cache key -> nilai di SQLite dengan TTL dan batas total ukuran (yang paling lama tidak diakses dibuang).
+    
+    Key adalah hash SHA-256 dari (format, sidik kode, key), jadi kode yang berubah tidak membaca hasil lama;
+    `code_independent` untuk nilai yang tidak bergantung kode (mis. hash isi file).
+    Semua galat SQLite (file terkunci terlalu lama, direktori read-only, file rusak) diperlakukan sebagai miss.
+    """
+    
+    def __init__(self, path, code_version, max_bytes=RESULT_CACHE_MAX_BYTES, ttl=RESULT_CACHE_TTL_SECONDS):
+        self.path = path
+        self.code_version = code_version
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Koneksi SQLite tidak boleh dipakai lintas thread: satu per thread
+        self._local = threading.local()
+    
+    def connect(self):
+        """Koneksi SQLite thread ini (dibuka & skema disiapkan saat pertama dipakai)."""
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=RESULT_CACHE_BUSY_TIMEOUT, isolation_level=None)
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute('PRAGMA synchronous=NORMAL')
+            con.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, nbytes INTEGER NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            con.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            self._local.con = con
+        return con
+    
+    def digest(self, key, code_independent=False):
+        code_version = None if code_independent else self.code_version
+        return hashlib.sha256(repr((RESULT_CACHE_FORMAT, code_version, key)).encode()).hexdigest()
+    
+    def get(self, key, code_independent=False):
+        """(True, nilai) bila ada dan belum kedaluwarsa, selain itu (False, None)."""
+        digest = self.digest(key, code_independent)
+        now = time.time()
+        try:
+            con = self.connect()
+            row = con.execute('SELECT value, created FROM results WHERE key = ?', (digest,)).fetchone()
+            if row is None or row[1] < now - self.ttl:
+                return False, None
+            con.execute('UPDATE results SET accessed = ? WHERE key = ?', (now, digest))
+            return True, decode_result(row[0])
+        except Exception:
+            # Termasuk blob rusak atau yang tidak terbaca versi pyarrow ini: hitung ulang saja
+            return False, None
+    
+    def put(self, key, value, code_independent=False):
+        try:
+            blob = encode_result(value)
+        except (TypeError, ValueError, pa.ArrowException):
+            return
+        if len(blob) > self.max_bytes:
+            return
+        
+        now = time.time()
+        try:
+            con = self.connect()
+            con.execute('BEGIN IMMEDIATE')
+            try:
+                con.execute(
+                    'INSERT OR REPLACE INTO results (key, value, nbytes, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                    (self.digest(key, code_independent), blob, len(blob), now, now)
+                )
+                self._evict(con, now)
+                con.execute('COMMIT')
+            except BaseException:
+                con.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            pass
+    
+    def _evict(self, con, now):
+        # Kedaluwarsa dulu, lalu yang paling lama tidak diakses sampai total ukuran di bawah batas
+        con.execute('DELETE FROM results WHERE created < ?', (now - self.ttl,))
+        con.execute(
+            'DELETE FROM results WHERE key IN ('
+            'SELECT key FROM (SELECT key, sum(nbytes) OVER (ORDER BY accessed DESC, key) AS running FROM results) '
+            'WHERE running > ?)',
+            (self.max_bytes,)
+        )
+    
+    def get_or_compute(self, key, compute, code_independent=False):
+        found, value = self.get(key, code_independent)
+        if found:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute()
+        self.put(key, value, code_independent)
+        return value
+    
+    def total_bytes(self):
+        try:
+            return self.connect().execute('SELECT coalesce(sum(nbytes), 0) FROM results').fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+
+@st.cache_resource
+def get_result_cache():
+    """Cache hasil di disk untuk proses ini, atau None bila dimatikan / file cache tidak bisa dibuka."""
+    if not RESULT_CACHE_ENABLED:
+        return None
+    cache = DiskResultCache(RESULT_CACHE_PATH, file_fingerprint(os.path.abspath(__file__)))
+    try:
+        cache.connect()
+    except sqlite3.Error:
+        # Direktori read-only atau file rusak: tetap jalan dengan cache di memori saja
+        return None
+    return cache
+
+
+def persisted_result(key, compute, code_independent=False):
+    """Nilai `key` dari cache hasil di disk, atau hasil `compute()` yang lalu disimpan ke sana."""
+    cache = get_result_cache()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(key, compute, code_independent)
+
+
+# ====================================================================
+# CACHE AGREGAT LINTAS RERUN & SESI (LRU DENGAN BATAS MEMORI)
+# ====================================================================
+AGGREGATE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def estimate_nbytes(value):
+    """Perkiraan ukuran memori hasil agregasi (DataFrame/Series) untuk batas cache."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    return sys.getsizeof(value)
+
+
+class AggregateCache:
+    """Cache LRU thread-safe untuk hasil agregasi, dibatasi total ukuran memori.
+    
+    Nilai yang dikembalikan dipakai bersama oleh semua sesi, jadi pemanggil tidak boleh memutasinya.
+    Miss dengan `persist_key` diteruskan dulu ke `backing` (DiskResultCache) sebelum dihitung.
+    """
+    
+    def __init__(self, max_bytes=AGGREGATE_CACHE_MAX_BYTES, backing=None):
+        self.max_bytes = max_bytes
+        self.backing = backing
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def carry_over(self, old_version, new_version, keep):
+        """Memindahkan entri (name, `old_version`, ...) yang memenuhi `keep` ke versi `new_version`.
+        
+        Entri versi lama lainnya tidak pernah dibaca lagi oleh snapshot baru dan tergusur LRU; rerun yang
+        masih memakai snapshot lama menyimpan hasilnya di key versi lama, jadi tidak mencemari versi baru.
+        Mengembalikan jumlah entri yang dipindahkan.
+        """
+        with self._lock:
+            moved = [key for key in self._entries if key[1] == old_version and keep(key)]
+            for key in moved:
+                self._entries[(key[0], new_version) + key[2:]] = self._entries.pop(key)
+        return len(moved)
+    
+    def get_or_compute(self, key, compute, persist_key=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        
+        # Komputasi (atau baca disk) di luar lock agar sesi lain tidak ikut menunggu
+        if persist_key is not None and self.backing is not None:
+            value = self.backing.get_or_compute(persist_key, compute)
+        else:
+            value = compute()
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            return value
+        
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, nbytes)
+                self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+        return value
+
+
+@st.cache_resource
+def get_aggregate_cache():
+    # Satu instance per proses server, dipakai bersama oleh semua sesi; miss dicari dulu di disk
+    return AggregateCache(backing=get_result_cache())
+
+
+def _normalize_selection(selected, all_values):
+    """Pilihan kosong atau lengkap sama-sama berarti 'tanpa filter'."""
+    selected = {str(v) for v in selected}
+    if not selected or selected >= {str(v) for v in all_values}:
+        return None
+    return tuple(sorted(selected))
+
+
+def filter_signature(dataset_options, filters, agg_func, exact_median):
+    """Key ternormalisasi dari semua pilihan sidebar yang memengaruhi hasil agregasi.
+    
+    Normalisasi selalu terhadap nilai dataset penuh (`dataset_options`), bukan irisan yang sedang dimuat.
+    """
+    date_range = None
+    if len(filters['date_range']) == 2:
+        start, end = (pd.to_datetime(d) for d in filters['date_range'])
+        if start > dataset_options['min_date'] or end < dataset_options['max_date']:
+            date_range = (start.date().isoformat(), end.date().isoformat())
+    
+    return (
+        filters['hotel'],
+        _normalize_selection(filters['years'], dataset_options['year']),
+        date_range,
+        _normalize_selection(filters['months'], dataset_options['month']),
+        _normalize_selection(filters['seasons'], dataset_options['season']),
+        bool(filters['only_holidays']),
+        bool(filters['only_events']),
+        bool(filters['exclude_canceled']),
+        agg_func,
+        bool(exact_median) if agg_func == 'median' else False,
+    )
+
+
+def aggregate_key_overlaps(aggregate_key, start, end):
+    """Apakah rentang tanggal di key cache agregat (name, result_version, *signature) beririsan dengan [start, end]."""
+    date_range = aggregate_key[4]
+    if date_range is None:
+        return True
+    return pd.Timestamp(date_range[0]) <= end and pd.Timestamp(date_range[1]) >= start
+
+
+AGGREGATE_BUILDERS = {
+    'daily_data': build_daily_data,
+    'monthly_data': build_monthly_data,
+    'season_data': build_season_data,
+    'heatmap_pivot': build_heatmap_pivot,
+    'dow_data': build_dow_data,
+    'box_stats': build_box_stats,
+    'summary': build_summary,
+    'events_summary': build_events_summary,
+}
+
+
+def _cached_aggregate(cache, name, aggregate_key, aggregate_args):
+    with perf_stage(f'aggregate:{name}') as stage:
+        result = _get_or_build_aggregate(cache, name, aggregate_key, aggregate_args)
+        stage['rows_out'] = _row_count(result)
+    return result
+
+
+def _get_or_build_aggregate(cache, name, aggregate_key, aggregate_args):
+    build = AGGREGATE_BUILDERS[name]
+    # aggregate_key sudah memuat versi isi data backend (bukan mtime), jadi key disk bisa dipakai replika lain
+    persist_key = (name,) + aggregate_key
+    return cache.get_or_compute((name,) + aggregate_key, lambda: build(*aggregate_args), persist_key)
+
+
+def aggregate_task(name, aggregate_key, aggregate_args):
+    """Callable tanpa argumen untuk agregat `name`, aman dijalankan di thread lain.
+    
+    Cache bersama diambil di thread script (st.cache_resource butuh ScriptRunContext).
+    """
+    return functools.partial(_cached_aggregate, get_aggregate_cache(), name, aggregate_key, aggregate_args)
+
+
+def cached_aggregate(name, aggregate_key, aggregate_args):
+    """Ambil agregat `name` dari cache bersama, atau hitung dan simpan bila belum ada.
+    
+    `aggregate_args` adalah (selection, filtered_cube, agg_func, sketch) untuk builder-nya.
+    """
+    return aggregate_task(name, aggregate_key, aggregate_args)()
+
+
+# ====================================================================
+# MODE PROGRESIF: SAMPEL BERSTRATA DULU, HASIL EKSAK MENYUSUL
+# ====================================================================
+# Agregat yang masih harus memindai baris booking (median eksak) tampil dulu dari sampel berstrata
+# beserta CI 95%, lalu diganti hasil eksak begitu selesai. Agregat dari cube sudah eksak & cepat.
+PROGRESSIVE_MODE = True
+SAMPLE_STRATA = ['hotel', 'month', 'is_holiday', 'is_event_day']
+# Alokasi proporsional: tiap stratum menyumbang ceil(fraksi x ukurannya), minimal satu baris
+SAMPLE_FRACTION = 0.02
+SAMPLE_SEED = 0
+CI_Z = 1.96
+# Di bawah ini bahkan [min, maks] grup belum mencapai 95% (1 - 2 x 0.5^n), jadi CI median dikosongkan
+CI_MIN_SAMPLE_ROWS = 6
+
+
+def build_stratified_sample(df, fraction=SAMPLE_FRACTION, seed=SAMPLE_SEED):
+    """Sampel acak berstrata (hotel, bulan, flag libur/event) dengan kolom `weight` = ukuran stratum / ukuran sampelnya.
+    
+    Alokasinya proporsional, jadi bobot hampir seragam: median, rata-rata, dan proporsi sampel langsung
+    menjadi estimasi; hanya jumlah (cacah booking) yang perlu dikali bobot.
+    """
+    strata = df.groupby(SAMPLE_STRATA, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    sizes = np.bincount(strata, minlength=1)
+    take = np.ceil(sizes * fraction).astype(np.int64)
+    
+    # Peringkat acak di dalam stratum; baris dengan peringkat < take ikut sampel
+    order = np.lexsort((np.random.default_rng(seed).random(len(df)), strata))
+    rank = np.empty(len(df), dtype=np.int64)
+    rank[order] = np.arange(len(df)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    rows = np.flatnonzero(rank < take[strata])
+    
+    columns = [c for c in DASHBOARD_COLUMNS if c in df.columns]
+    sample = df.iloc[rows][columns].reset_index(drop=True)
+    sample['weight'] = (sizes / np.maximum(take, 1))[strata[rows]]
+    return sample
+
+
+class SampleBackend:
+    """Sampel berstrata beserta indeks filternya; cukup untuk jalur baris booking di builder agregat.
+    
+    `build_sample` baru dipanggil saat sampel pertama kali dipakai (pratinjau median eksak di mode
+    progresif), bukan saat data dimuat: proses yang tidak pernah memintanya tidak membayar pemindaian & memorinya.
+    """
+    
+    def __init__(self, build_sample):
+        self._build_sample = build_sample
+        self._tables = None
+        self._lock = threading.Lock()
+    
+    def _get_tables(self):
+        if self._tables is None:
+            # Thread prefetch bisa meminta sampel bersamaan; hanya satu yang membangunnya
+            with self._lock:
+                if self._tables is None:
+                    sample = self._build_sample()
+                    self._tables = sample, build_filter_index(sample)
+                    # Closure pembangun memegang frame sumber; tidak diperlukan lagi
+                    self._build_sample = None
+        return self._tables
+    
+    @property
+    def sample(self):
+        return self._get_tables()[0]
+    
+    @property
+    def filter_index(self):
+        return self._get_tables()[1]
+    
+    def built_nbytes(self):
+        """Memori sampel bila sudah dibangun, selain itu 0 (tanpa memicu build)."""
+        tables = self._tables
+        return 0 if tables is None else estimate_nbytes(tables[0])
+    
+    def select_rows(self, filters):
+        return self.sample[resolve_filter_mask(self.filter_index, filters)]
+    
+    def aggregate(self, selection, keys, aggregations, any_flags=()):
+        if selection.mask is None:
+            selection.mask = resolve_filter_mask(self.filter_index, selection.filters)
+        return aggregate_rows(self.sample, selection.mask, keys, aggregations, any_flags)
+
+
+def median_confidence_interval(frame, keys, value='occupancy_per_hari', z=CI_Z):
+    """CI median per grup dari baris sampel (order statistic, bebas distribusi); kolom ci_low & ci_high."""
+    frame = frame[frame[value].notna()]
+    grouped = frame.groupby(group_keys(frame, keys), observed=True)
+    group_ids = grouped.ngroup().to_numpy()
+    values = frame[value].to_numpy()
+    sorted_values = values[np.lexsort((values, group_ids))]
+    
+    # Peringkat batas n/2 -+ z*sqrt(n)/2 (1-based) di dalam tiap grup yang sudah terurut
+    sizes = np.bincount(group_ids, minlength=grouped.ngroups)
+    starts = np.cumsum(sizes) - sizes
+    half_width = z * np.sqrt(sizes) / 2
+    low_rank = np.clip(np.floor(sizes / 2 - half_width), 1, sizes).astype(np.int64)
+    high_rank = np.clip(np.ceil(sizes / 2 + half_width + 1), 1, sizes).astype(np.int64)
+    too_small = sizes < CI_MIN_SAMPLE_ROWS
+    return pd.DataFrame({
+        'ci_low': np.where(too_small, np.nan, sorted_values[starts + low_rank - 1]),
+        'ci_high': np.where(too_small, np.nan, sorted_values[starts + high_rank - 1]),
+    }, index=grouped.size().index)
+
+
+def mean_confidence_interval(values, z=CI_Z):
+    """CI rata-rata (pendekatan normal) dari nilai sampel; (nan, nan) bila kurang dari dua nilai."""
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
+        return np.nan, np.nan
+    half_width = z * values.std(ddof=1) / np.sqrt(len(values))
+    return values.mean() - half_width, values.mean() + half_width
+
+
+def _approximate_summary(sample_selection, agg_func):
+    summary = build_summary(sample_selection, None, agg_func)
+    sample = sample_selection.frame()
+    weights = sample['weight'].to_numpy()
+    
+    # Cacah booking diskalakan dengan bobot stratum; median/rata-rata/proporsi langsung dari sampel
+    summary['total_bookings'] = int(round(weights.sum()))
+    summary['ci'] = {}
+    for segment, (flag, value) in SUMMARY_SEGMENTS.items():
+        in_segment = sample[flag].to_numpy() == value
+        summary['bookings'][segment] = int(round(weights[in_segment].sum()))
+        segment_ci = median_confidence_interval(sample[in_segment], flag)
+        summary['ci'][segment] = tuple(segment_ci.iloc[0]) if len(segment_ci) else (np.nan, np.nan)
+    
+    summary['ci']['avg_adr'] = mean_confidence_interval(sample['adr'].to_numpy(dtype=float))
+    canceled = sample['is_canceled'].to_numpy(dtype=float) * 100
+    summary['ci']['cancellation_rate'] = mean_confidence_interval(canceled)
+    summary['sample_rows'] = len(sample)
+    return summary
+
+
+def build_approximate_aggregate(name, sample_selection, agg_func):
+    """Agregat `name` dari sampel berstrata; ukuran median dilengkapi CI 95%."""
+    if name == 'summary':
+        return _approximate_summary(sample_selection, agg_func)
+    
+    result = AGGREGATE_BUILDERS[name](sample_selection, None, agg_func)
+    sample = sample_selection.frame()
+    if name == 'daily_data':
+        result = result.join(median_confidence_interval(sample, 'arrival_date'), on='arrival_date')
+    elif name == 'dow_data':
+        result = result.join(median_confidence_interval(sample, 'day_of_week'), on='day_of_week')
+    elif name == 'heatmap_pivot':
+        ci = median_confidence_interval(sample, ['month', 'arrival_date_day_of_month'])
+        result.attrs['ci'] = tuple(
+            ci[col].unstack('month').reindex(index=result.index, columns=result.columns)
+            for col in ('ci_low', 'ci_high')
+        )
+    return result
+
+
+def approximate_aggregate(name, aggregate_key, sample_selection, agg_func):
+    """Versi sampel dari agregat `name`, disimpan di cache bersama di samping versi eksaknya."""
+    return get_aggregate_cache().get_or_compute(
+        (f'{name}~sampel',) + aggregate_key,
+        lambda: build_approximate_aggregate(name, sample_selection, agg_func)
+    )
+
+
+# ====================================================================
+# EXPORT ON-DEMAND: DITULIS PER POTONGAN KE FILE SEMENTARA SAAT DIKLIK
+# ====================================================================
+EXPORT_CHUNK_ROWS = 100_000
+# Di bawah serve.py file export disajikan langsung dari disk lewat route ini (streaming per blok), karena
+# st.download_button selalu memuat seluruh file ke memori server. Tanpa serve.py: fallback download_button.
+EXPORT_ROUTE = os.environ.get('EDA_EXPORT_ROUTE')
+EXPORT_DIRECTORY = os.environ.get('EDA_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'hotel_eda_exports'))
+# File export yang lebih tua dari ini dihapus saat export baru dibuat
+EXPORT_MAX_AGE_SECONDS = 3600
+
+# Label format -> (ekstensi file, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def _iter_chunks(frame, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Potongan baris berurutan; frame kosong tetap menghasilkan satu potongan (untuk header/skema)."""
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def export_frame(frame, export_format, recorder=None):
+    """Menulis `frame` (hasil kecil di memori, mis. daftar event) ke file sementara per potongan.
+    
+    Dipanggil oleh st.download_button hanya saat tombol diklik, sehingga rerun biasa tidak membangun export.
+    Klik terjadi di luar rerun, jadi dengan `recorder` tiap export tercatat sebagai run tersendiri (kind 'export').
+    """
+    frame = original_dtypes(frame)
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    return _timed_export(_iter_chunks(frame), schema, export_format, tempfile.TemporaryFile(), recorder)
+
+
+def export_selection(selection, export_format, output, recorder=None):
+    """Menulis baris terfilter `selection` ke `output` per potongan EXPORT_CHUNK_ROWS.
+    
+    Baris tidak pernah disalin utuh: tiap potongan diambil langsung dari backend (posisi mask terhadap
+    frame bersama, atau batch DuckDB), ditulis, lalu dilepas.
+    """
+    schema, chunks = selection.export_chunks(EXPORT_CHUNK_ROWS)
+    return _timed_export(chunks, schema, export_format, output, recorder)
+
+
+def export_selection_file(selection, export_format, file_name, recorder=None):
+    """export_selection ke file baru di EXPORT_DIRECTORY (disajikan route EXPORT_ROUTE); mengembalikan nama filenya."""
+    os.makedirs(EXPORT_DIRECTORY, exist_ok=True)
+    cutoff = time.time() - EXPORT_MAX_AGE_SECONDS
+    for entry in os.scandir(EXPORT_DIRECTORY):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+    
+    # Route export tidak memeriksa sesi: nama file (token 128 bit) satu-satunya yang mencegah orang lain
+    # menebak export milik sesi lain. Token urlsafe hanya berisi [A-Za-z0-9_-], lolos pola nama serve.py
+    stem, extension = file_name.split('.', 1)
+    file_name = f"{stem}_{secrets.token_urlsafe(16)}.{extension}"
+    path = os.path.join(EXPORT_DIRECTORY, file_name)
+    # Diawali titik: file setengah jadi ditolak pola nama serve.py sampai di-rename
+    tmp_path = os.path.join(EXPORT_DIRECTORY, f".{file_name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as output:
+            export_selection(selection, export_format, output, recorder)
+        os.replace(tmp_path, path)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+    return file_name
+
+
+def _timed_export(chunks, schema, export_format, output, recorder):
+    token = begin_perf_run('export') if recorder is not None else None
+    try:
+        with perf_stage(f'export:{export_format}') as stage:
+            stage['rows_out'] = _write_export(chunks, schema, export_format, output)
+    finally:
+        finish_perf_run(token, recorder)
+    output.seek(0)
+    return output
+
+
+def _write_export(chunks, schema, export_format, output):
+    """Menulis potongan ke `output`; mengembalikan jumlah baris. Puncak memori = satu potongan."""
+    n_rows = 0
+    if export_format == 'Parquet':
+        # Skema eksplisit dari frame penuh: potongan yang kolomnya kosong semua tidak mengubah tipe file
+        with pq.ParquetWriter(output, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                n_rows += len(chunk)
+    else:
+        binary = gzip.GzipFile(fileobj=output, mode='wb') if export_format == 'CSV (gzip)' else output
+        text = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(text, index=False, header=(i == 0))
+            n_rows += len(chunk)
+        text.flush()
+        text.detach()
+        if binary is not output:
+            binary.close()
+    return n_rows
+
+
+# ====================================================================
+# INGEST INKREMENTAL: FILE BOOKING HARIAN BARU TANPA RELOAD PENUH
+# ====================================================================
+# Job malam menaruh file CSV baru (skema sama dengan CSV utama) di direktori ini
+INCREMENTS_DIR = os.path.splitext(DATA_PATH)[0] + '.d'
+
+
+ingest_logger = logging.getLogger('eda.ingest')
+
+
+def _row_identity(frame, columns):
+    """Hash per baris yang tidak bergantung pada tipe hasil downcast (int8 vs int16, kategori vs string)."""
+    values = {}
+    for col in columns:
+        series = frame[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(str)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            series = series.astype('float64')
+        values[col] = series.to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame(values), index=False)
+
+
+def concat_bookings(base, delta):
+    """Menggabungkan dua frame berskema sama; kolom kategori digabung dengan union kategori."""
+    delta = delta.reindex(columns=base.columns)
+    combined = pd.concat([base, delta], ignore_index=True)
+    for col in base.columns:
+        if isinstance(base[col].dtype, pd.CategoricalDtype) or isinstance(delta[col].dtype, pd.CategoricalDtype):
+            combined[col] = union_categoricals(
+                [base[col].astype('category'), delta[col].astype('category')],
+                sort_categories=True
+            )
+    return combined
+
+
+class BookingStore:
+    """Dataset booking satu proses beserta indeks filter, cube, dan sketch-nya.
+    
+    State disimpan sebagai satu snapshot dict yang diganti utuh saat delta masuk, sehingga rerun
+    yang sedang berjalan tetap memakai snapshot lamanya secara konsisten.
+    """
+    
+    def __init__(self, data_version):
+        df = load_data(data_version)
+        # Tabel turunan diambil dari cache hasil di disk bila proses/replika lain sudah membangunnya
+        result_version = dataset_fingerprint(data_version)
+        cube, sketch, topk = persisted_result(('booking_tables', result_version), lambda: build_daily_cube(df))
+        
+        # Zone map dari katalog tersimpan bila masih cocok; bila tidak, katalog baru ditulis untuk proses lain
+        catalog = read_catalog(data_version)
+        zone_maps = catalog_zone_maps(catalog, len(df))
+        filter_index = build_filter_index(df, zone_maps)
+        if zone_maps is None:
+            catalog = build_catalog(filter_index, data_version)
+            write_catalog(catalog)
+        
+        self.data_version = data_version
+        self.snapshot = {
+            'df': df,
+            'filter_index': filter_index,
+            'catalog': catalog,
+            'cube': cube,
+            'cube_index': build_filter_index(cube),
+            'sketch': sketch,
+            'topk': topk,
+            'event_days': build_event_days(cube),
+            'sample': booking_sample(df, result_version),
+            'result_version': result_version,
+        }
+        self.watermark = df['arrival_date'].max()
+        self.ingested_files = set()
+        self._lock = threading.Lock()
+    
+    def _new_files(self):
+        if not os.path.isdir(INCREMENTS_DIR):
+            return []
+        return sorted(
+            name for name in os.listdir(INCREMENTS_DIR)
+            if name.endswith('.csv') and name not in self.ingested_files
+        )
+    
+    def refresh(self):
+        """Ingest file baru di INCREMENTS_DIR.
+        
+        Mengembalikan (result_version lama, result_version baru, tanggal_min, tanggal_maks) delta, atau None.
+        Baris sebelum hari watermark dibuang (dan dicatat di log); baris di hari watermark hanya diterima
+        bila belum ada baris identik sebanyak itu, jadi file yang dikirim ulang tidak menggandakan data
+        sedangkan booking susulan untuk hari terakhir tetap masuk.
+        """
+        if not self._new_files():
+            return None
+        
+        with self._lock:
+            new_files = self._new_files()
+            if not new_files:
+                return None
+            return self.ingest(new_files)
+    
+    def ingest(self, new_files):
+        """Ingest satu batch file delta (nama di INCREMENTS_DIR); hasilnya seperti refresh()."""
+        delta = pd.concat(
+            [pd.read_csv(os.path.join(INCREMENTS_DIR, name)) for name in new_files],
+            ignore_index=True
+        )
+        delta = self._after_watermark(clean_booking_data(delta), new_files)
+        self.ingested_files.update(new_files)
+        if len(delta) == 0:
+            return None
+        
+        old_version = self.snapshot['result_version']
+        self._append(delta, new_files)
+        return old_version, self.snapshot['result_version'], delta['arrival_date'].min(), delta['arrival_date'].max()
+    
+    def _after_watermark(self, delta, source_files):
+        """Baris delta yang belum ada di snapshot: setelah watermark, atau susulan di hari watermark."""
+        df = self.snapshot['df']
+        late = (delta['arrival_date'] < self.watermark).to_numpy()
+        boundary = (delta['arrival_date'] == self.watermark).to_numpy(copy=True)
+        if boundary.any():
+            # Identitas baris = hash semua kolom; baris kembar yang sah dihitung sebagai multiset
+            columns = [col for col in delta.columns if col in df.columns]
+            existing = _row_identity(df[df['arrival_date'] == self.watermark], columns)
+            incoming = _row_identity(delta[boundary], columns)
+            seen = incoming.groupby(incoming).cumcount().to_numpy()
+            already = existing.value_counts().reindex(incoming.to_numpy(), fill_value=0).to_numpy()
+            boundary[np.flatnonzero(boundary)[seen < already]] = False
+        
+        keep = ~late & ((delta['arrival_date'] > self.watermark).to_numpy() | boundary)
+        n_dropped = len(delta) - int(keep.sum())
+        if n_dropped:
+            ingest_logger.warning(
+                "%d baris dari %s dilewati: sudah ada atau arrival_date sebelum watermark %s",
+                n_dropped, ', '.join(source_files), self.watermark.date()
+            )
+        return delta[keep].reset_index(drop=True)
+    
+    def _append(self, delta, source_files):
+        snapshot = self.snapshot
+        delta_cube, delta_sketch, delta_topk = build_daily_cube(delta)
+        delta_sketch['cube_row'] += len(snapshot['cube'])
+        delta_topk['cube_row'] += len(snapshot['cube'])
+        delta_topk['row'] += len(snapshot['df'])
+        df = concat_bookings(snapshot['df'], delta)
+        cube = concat_bookings(snapshot['cube'], delta_cube)
+        filter_index = extend_filter_index(snapshot['filter_index'], delta)
+        # Versi isi = rantai hash batch yang sudah di-ingest, jadi hasil di disk tidak tercampur
+        result_version = hashlib.sha256('\n'.join([snapshot['result_version'], *source_files]).encode()).hexdigest()
+        
+        # Katalog di disk tetap menggambarkan file utama (dipakai backend lain); yang di memori ikut delta
+        self.snapshot = {
+            'df': df,
+            'filter_index': filter_index,
+            'catalog': build_catalog(filter_index, self.data_version),
+            'cube': cube,
+            'cube_index': extend_filter_index(snapshot['cube_index'], delta_cube),
+            'sketch': pd.concat([snapshot['sketch'], delta_sketch], ignore_index=True),
+            'topk': pd.concat([snapshot['topk'], delta_topk], ignore_index=True),
+            'event_days': build_event_days(cube),
+            # Sampel diambil ulang dari seluruh baris (saat pertama dipakai), sama dengan rebuild penuh
+            'sample': booking_sample(df, result_version),
+            'result_version': result_version,
+        }
+        self.watermark = max(self.watermark, delta['arrival_date'].max())
+
+
+def booking_sample(df, result_version):
+    """SampleBackend snapshot BookingStore; sampelnya diambil dari cache hasil di disk bila sudah ada."""
+    return SampleBackend(
+        lambda: persisted_result(('booking_sample', result_version), lambda: build_stratified_sample(df))
+    )
+
+
+@st.cache_resource(max_entries=1)
+def get_booking_store(data_version):
+    # Satu store per versi CSV utama; CSV yang diganti tetap memicu load penuh
+    return BookingStore(data_version)
+
+
+def refresh_booking_store(store):
+    """Ingest delta baru; agregat cache yang rentang tanggalnya tidak beririsan dengan delta ikut ke versi baru."""
+    ingested = store.refresh()
+    if ingested is not None:
+        old_version, new_version, start, end = ingested
+        get_aggregate_cache().carry_over(
+            old_version, new_version, lambda key: not aggregate_key_overlaps(key, start, end)
+        )
+    return store.snapshot
+
+
+# ====================================================================
+# BACKEND QUERY: PANDAS (DI MEMORI) ATAU DUCKDB (OUT-OF-CORE, MULTI-THREAD)
+# ====================================================================
+# 'pandas' = semua baris di memori; 'duckdb' = DuckDB memindai Feather/Parquet langsung dari disk;
+# 'auto' = duckdb bila terpasang. Tanpa paket duckdb, pandas selalu menjadi fallback.
+QUERY_BACKEND = 'pandas'
+
+# DuckDB menumpahkan hash aggregate/sort ke disk di atas batas memori ini
+DUCKDB_MEMORY_LIMIT = '2GB'
+DUCKDB_TEMP_DIRECTORY = os.path.join(tempfile.gettempdir(), 'hotel_eda_duckdb')
+
+# Kolom booking yang dipakai tab detail (Top K hari libur/event)
+DETAIL_COLUMNS = ['arrival_date', 'hotel', 'Name', 'occupancy_per_hari', 'adr', 'total_tamu']
+
+
+def resolve_query_backend():
+    """Nama backend yang benar-benar dipakai proses ini ('pandas' atau 'duckdb')."""
+    if QUERY_BACKEND in ('duckdb', 'auto') and duckdb is not None:
+        return 'duckdb'
+    return 'pandas'
+
+
+class RowSelection:
+    """Baris booking yang lolos filter sidebar pada suatu backend.
+    
+    Baris baru diambil (lalu disimpan) saat ada yang benar-benar butuh nilai per booking,
+    misalnya box plot, median eksak, atau tab detail; grafik lain cukup memakai cube.
+    """
+    
+    def __init__(self, backend, filters, cache_key=None):
+        self.backend = backend
+        self.filters = filters
+        # Key agregat pilihan ini; urutan browser data disimpan di cache agregat dengan key ini
+        self.cache_key = cache_key
+        self.mask = None
+        self.cube_mask = None
+        self._frame = None
+    
+    def materialized_nbytes(self):
+        """Memori privat sesi untuk selection ini: mask dan salinan baris (bila pernah diambil)."""
+        nbytes = sum(0 if mask is None else mask.nbytes for mask in (self.mask, self.cube_mask))
+        return nbytes + (0 if self._frame is None else estimate_nbytes(self._frame))
+    
+    def frame(self):
+        if self._frame is None:
+            self._frame = self.backend.select_rows(self.filters)
+        return self._frame
+    
+    def describe(self):
+        return self.backend.describe(self)
+    
+    def box_stats(self):
+        return self.backend.box_stats(self)
+    
+    def top_rows(self, flag, n):
+        return original_dtypes(self.backend.top_rows(self, flag, n))
+    
+    def page(self, sort_column, ascending, start, n):
+        """`n` baris mulai urutan ke-`start`, diurutkan menurut `sort_column` (None = urutan asli)."""
+        return original_dtypes(self.backend.page(self, sort_column, ascending, start, n))
+    
+    def aggregate(self, keys, aggregations, any_flags=()):
+        """Agregasi bernama per `keys` seperti groupby(...).agg(**aggregations), indeks = keys.
+        
+        Fungsi: 'size', 'sum', 'count', 'mean', 'median', 'max', atau 'event_names'. Bila `any_flags`
+        diisi, hanya baris dengan salah satu flag itu bernilai 1 yang dihitung.
+        """
+        return self.backend.aggregate(self, keys, aggregations, any_flags)
+    
+    def export_chunks(self, chunk_rows):
+        """(skema Arrow, iterator potongan baris) untuk export; minimal satu potongan (bisa kosong).
+        
+        Kolom & tipenya seperti CSV sumber (original_dtypes), bukan tipe ringkas internal.
+        """
+        return self.backend.export_chunks(self, chunk_rows)
+
+
+def box_stats(values, name):
+    """Statistik box plot (kuartil linear + whisker Tukey 1.5 IQR) seperti yang dihitung Plotly dari data mentah."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {'y': []}
+    
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    return {
+        'x': [name],
+        'q1': [q1],
+        'median': [median],
+        'q3': [q3],
+        'lowerfence': [values[values >= q1 - 1.5 * iqr].min()],
+        'upperfence': [values[values <= q3 + 1.5 * iqr].max()],
+        'mean': [values.mean()],
+    }
+
+
+class PandasBackend:
+    """Backend default: satu snapshot di memori (BookingStore atau irisan dataset berpartisi)."""
+    
+    name = 'pandas'
+    
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.columns = list(snapshot['df'].columns)
+        self.cube = snapshot['cube']
+        self.cube_index = snapshot['cube_index']
+        self.sketch = snapshot['sketch']
+        self.event_days = snapshot['event_days']
+        self.sample = snapshot['sample']
+        self.result_version = snapshot['result_version']
+    
+    def shared_nbytes(self):
+        """Memori dataset bersama (sekali per proses, dipakai semua sesi)."""
+        tables = sum(estimate_nbytes(self.snapshot[name]) for name in ('df', 'cube', 'sketch', 'topk', 'event_days'))
+        return tables + self.sample.built_nbytes()
+    
+    def _mask(self, selection):
+        # Mask boolean (1 byte/baris) disimpan di selection; kolom diambil lewat mask seperlunya
+        if selection.mask is None:
+            selection.mask = resolve_filter_mask(self.snapshot['filter_index'], selection.filters)
+        return selection.mask
+    
+    def _column(self, selection, col):
+        return self.snapshot['df'][col].to_numpy()[self._mask(selection)]
+    
+    def select_rows(self, filters):
+        return self.snapshot['df'][resolve_filter_mask(self.snapshot['filter_index'], filters)]
+    
+    def describe(self, selection):
+        mask = self._mask(selection)
+        catalog = self.snapshot.get('catalog')
+        if catalog is not None and mask.all():
+            # Tanpa filter efektif: ringkasan sudah ada di katalog
+            options = catalog['options']
+            return {
+                'n_rows': options['n_rows'],
+                'min_date': options['min_date'],
+                'max_date': options['max_date'],
+                'n_hotels': len(options['hotel']),
+            }
+        
+        # Tanpa menyalin semua kolom: satu kolom tanggal lewat mask, hotel cukup dari bitmap-nya
+        dates = self._column(selection, 'arrival_date')
+        packed = np.packbits(mask)
+        hotel_bitmaps = self.snapshot['filter_index']['bitmaps']['hotel'].values()
+        return {
+            'n_rows': len(dates),
+            'min_date': pd.Timestamp(dates.min()) if len(dates) else pd.NaT,
+            'max_date': pd.Timestamp(dates.max()) if len(dates) else pd.NaT,
+            'n_hotels': sum(bool(np.bitwise_and(bits, packed).any()) for bits in hotel_bitmaps),
+        }
+    
+    def box_stats(self, selection):
+        occupancy = self._column(selection, 'occupancy_per_hari')
+        is_holiday = self._column(selection, 'is_holiday') == 1
+        is_event_day = self._column(selection, 'is_event_day') == 1
+        return {
+            'Hari Biasa': box_stats(occupancy[~is_holiday], 'Hari Biasa'),
+            'Hari Libur': box_stats(occupancy[is_holiday], 'Hari Libur'),
+            'Hari Event': box_stats(occupancy[is_event_day], 'Hari Event'),
+        }
+    
+    def top_rows(self, selection, flag, n):
+        # Dari top-k per baris cube yang dibangun saat load; baris booking tidak disentuh
+        if selection.cube_mask is None:
+            selection.cube_mask = resolve_filter_mask(self.cube_index, selection.filters)
+        return topk_rows(self.cube, selection.cube_mask, self.snapshot['topk'], flag, n)
+    
+    def _browse_order(self, selection, sort_column, ascending):
+        """Posisi baris terfilter dalam urutan browser; yang diurutkan hanya satu kolom, bukan frame terfilter."""
+        positions = np.flatnonzero(self._mask(selection))
+        if sort_column is None:
+            return positions
+        values = self.snapshot['df'][sort_column].take(positions).reset_index(drop=True)
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        return positions[order]
+    
+    def page(self, selection, sort_column, ascending, start, n):
+        compute = functools.partial(self._browse_order, selection, sort_column, ascending)
+        if selection.cache_key is None:
+            order = compute()
+        else:
+            # Urutan dipakai ulang saat pindah halaman; invalidasi ingest mengikuti key agregat
+            order = get_aggregate_cache().get_or_compute(
+                ('browse_order',) + selection.cache_key + (sort_column, ascending), compute
+            )
+        return self.snapshot['df'].iloc[order[start:start + n]]
+    
+    def aggregate(self, selection, keys, aggregations, any_flags=()):
+        return aggregate_rows(self.snapshot['df'], self._mask(selection), keys, aggregations, any_flags)
+    
+    def export_chunks(self, selection, chunk_rows):
+        df = self.snapshot['df']
+        positions = np.flatnonzero(self._mask(selection))
+        chunks = (
+            original_dtypes(df.iloc[positions[start:start + chunk_rows]])
+            for start in range(0, max(len(positions), 1), chunk_rows)
+        )
+        return pa.Schema.from_pandas(original_dtypes(df.iloc[:0]), preserve_index=False), chunks
+
+
+# Kelompok box plot: label -> kondisi SQL (sama dengan mask di PandasBackend.box_stats)
+BOX_GROUPS_SQL = {
+    'Hari Biasa': 'is_holiday = 0',
+    'Hari Libur': 'is_holiday = 1',
+    'Hari Event': 'is_event_day = 1',
+}
+
+# Fungsi RowSelection.aggregate -> ekspresi agregat DuckDB ({col} = kolom yang sudah di-quote)
+DUCKDB_AGGREGATES = {
+    'size': 'count(*)',
+    'sum': 'coalesce(sum({col}), 0)',
+    'count': 'count({col})',
+    'mean': 'avg({col})',
+    # Median linear, sama dengan np.median / groupby median
+    'median': 'quantile_cont({col}, 0.5)',
+    'max': 'max({col})',
+    'event_names': (
+        "coalesce(string_agg(DISTINCT {col}, ', ' ORDER BY {col}) FILTER (WHERE {col} != 'No Event'), 'Hari Biasa')"
+    ),
+}
+
+# Kolom turunan tanggal (DERIVED_DATE_KEYS) untuk dataset yang tidak menyimpannya
+DUCKDB_DERIVED_KEYS = {
+    'arrival_date_day_of_month': 'day(arrival_date)',
+    'day_of_week': 'dayname(arrival_date)',
+}
+
+
+class DuckDBBackend:
+    """Backend out-of-core: DuckDB memindai dataset Arrow di disk dengan pushdown filter & kolom.
+    
+    Hanya hasil kecil yang pindah ke pandas: cube harian + sketch (sekali per versi data),
+    statistik box plot, ringkasan baris, dan baris tab detail. Semua query multi-thread.
+    """
+    
+    name = 'duckdb'
+    
+    def __init__(self, dataset, data_version):
+        self._con = duckdb.connect(config={
+            'memory_limit': DUCKDB_MEMORY_LIMIT,
+            'temp_directory': DUCKDB_TEMP_DIRECTORY,
+        })
+        self._dataset = dataset
+        self.columns = dataset_column_order(dataset)
+        self._all_columns = ', '.join(f'"{c}"' for c in self.columns)
+        self._integer_columns = {f.name for f in dataset.schema if pa.types.is_integer(f.type)}
+        catalog = read_catalog(data_version)
+        self.options = catalog['options'] if catalog is not None else self._options()
+        if catalog is None:
+            write_catalog({'data_version': data_version, 'options': self.options, 'zone_maps': None})
+        self.result_version = f"{self.name}:{dataset_fingerprint(data_version)}"
+        # Cube & sampel dari cache hasil di disk bila proses/replika lain sudah menghitungnya; sampel baru
+        # diambil saat pertama dipakai
+        self.cube, self.sketch = persisted_result(('duckdb_cube', self.result_version), self._build_cube)
+        self.cube_index = build_filter_index(self.cube)
+        self.event_days = build_event_days(self.cube)
+        self.sample = SampleBackend(
+            lambda: persisted_result(('duckdb_sample', self.result_version), self._build_sample)
+        )
+    
+    def shared_nbytes(self):
+        # Baris booking tetap di disk; yang tinggal di memori hanya cube, sketch, tabel hari event & sampel (bila sudah dibangun)
+        tables = sum(estimate_nbytes(value) for value in (self.cube, self.sketch, self.event_days))
+        return tables + self.sample.built_nbytes()
+    
+    def _cursor(self):
+        # Satu cursor per query agar aman dipanggil dari thread prefetch; dataset didaftarkan per cursor
+        cursor = self._con.cursor()
+        cursor.register('bookings', self._dataset)
+        return cursor
+    
+    def _query(self, sql, params=None):
+        return self._cursor().execute(sql, params or []).df()
+    
+    def _options(self):
+        distinct = {
+            col: self._query(f'SELECT DISTINCT "{col}" FROM bookings WHERE "{col}" IS NOT NULL ORDER BY 1')[col].tolist()
+            for col in ['hotel', 'year', 'month', 'season']
+        }
+        totals = self._query('SELECT count(*) AS n_rows, min(arrival_date) AS min_date, max(arrival_date) AS max_date FROM bookings')
+        return {
+            **distinct,
+            'min_date': pd.Timestamp(totals['min_date'].iloc[0]),
+            'max_date': pd.Timestamp(totals['max_date'].iloc[0]),
+            'n_rows': int(totals['n_rows'].iloc[0]),
+        }
+    
+    def _build_cube(self):
+        """Cube & sketch yang sama dengan build_daily_cube, dihitung DuckDB tanpa memuat baris booking."""
+        keys = CUBE_KEYS + CUBE_DATE_ATTRS
+        key_list = ', '.join(f'"{k}"' for k in keys)
+        # groupby pandas membuang baris yang key-nya kosong; samakan
+        not_null = ' AND '.join(f'"{k}" IS NOT NULL' for k in keys)
+        measures = []
+        for measure in CUBE_MEASURES:
+            sum_type = 'BIGINT' if measure in self._integer_columns else 'DOUBLE'
+            measures.append(f'sum("{measure}")::{sum_type} AS "{measure}_sum"')
+            measures.append(f'count("{measure}") AS "{measure}_count"')
+        
+        cursor = self._cursor()
+        cursor.execute(f"""
+            CREATE TEMP TABLE cube AS
+            SELECT {key_list}, count(*) AS n_bookings, {', '.join(measures)},
+                   row_number() OVER (ORDER BY {key_list}) - 1 AS cube_row
+            FROM bookings WHERE {not_null}
+            GROUP BY {key_list}
+        """)
+        cube = cursor.execute('SELECT * EXCLUDE (cube_row) FROM cube ORDER BY cube_row').df()
+        sketch = cursor.execute(f"""
+            SELECT c.cube_row::INTEGER AS cube_row, s.bin, count(*)::INTEGER AS n
+            FROM (
+                SELECT {key_list}, floor(occupancy_per_hari / {2 * MEDIAN_SKETCH_ERROR})::INTEGER AS bin
+                FROM bookings WHERE {not_null} AND occupancy_per_hari IS NOT NULL
+            ) AS s JOIN cube AS c USING ({key_list})
+            GROUP BY ALL ORDER BY 1, 2
+        """).df()
+        
+        for col in FLAG_COLUMNS:
+            cube[col] = cube[col].astype('int8')
+        cube = restore_partition_types(cube, keys)
+        for col in CATEGORY_COLUMNS:
+            cube[col] = cube[col].astype('category')
+        cube['arrival_date_day_of_month'] = cube['arrival_date'].dt.day
+        cube['day_of_week'] = cube['arrival_date'].dt.day_name()
+        return cube, sketch
+    
+    def _build_sample(self):
+        """Sampel berstrata seperti build_stratified_sample, diambil DuckDB dalam satu pemindaian.
+        
+        Urutan acak dalam stratum = hash isi baris dengan SAMPLE_SEED, jadi sampelnya sama di tiap proses
+        dan replika (random() tidak bisa di-seed per query, REPEATABLE hanya deterministik satu thread).
+        """
+        strata = ', '.join(f'"{k}"' for k in SAMPLE_STRATA)
+        columns = ', '.join(f'"{c}"' for c in DASHBOARD_COLUMNS if c in self.columns)
+        frame = self._query(f"""
+            SELECT {columns}, stratum_rows / ceil(stratum_rows * ?) AS weight FROM (
+                SELECT {columns}, count(*) OVER (PARTITION BY {strata}) AS stratum_rows,
+                       row_number() OVER (PARTITION BY {strata} ORDER BY hash({int(SAMPLE_SEED)}, {self._all_columns})) AS stratum_rank
+                FROM bookings
+            ) WHERE stratum_rank <= ceil(stratum_rows * ?)
+        """, [SAMPLE_FRACTION, SAMPLE_FRACTION])
+        for col in FLAG_COLUMNS:
+            frame[col] = frame[col].astype('int8')
+        return restore_partition_types(frame, list(frame.columns))
+    
+    @staticmethod
+    def _where(filters):
+        """Klausa WHERE + parameter dari pilihan sidebar (semantik sama dengan resolve_filter_mask)."""
+        conditions, params = [], []
+        
+        def add_in(col, values):
+            conditions.append(f'"{col}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        
+        if filters['hotel'] != 'Semua Hotel':
+            add_in('hotel', [filters['hotel']])
+        if filters['years']:
+            add_in('year', [int(v) for v in filters['years']])
+        if filters['months']:
+            add_in('month', [int(v) for v in filters['months']])
+        if filters['seasons']:
+            add_in('season', [str(v) for v in filters['seasons']])
+        if filters['only_holidays']:
+            conditions.append('is_holiday = 1')
+        if filters['only_events']:
+            conditions.append('is_event_day = 1')
+        if filters['exclude_canceled']:
+            conditions.append('is_canceled = 0')
+        if len(filters['date_range']) == 2:
+            conditions.append('arrival_date BETWEEN ? AND ?')
+            params.extend(pd.Timestamp(d).to_pydatetime() for d in filters['date_range'])
+        
+        return ' AND '.join(conditions) or 'TRUE', params
+    
+    def select_rows(self, filters):
+        where, params = self._where(filters)
+        return self._restore_types(self._query(f'SELECT {self._all_columns} FROM bookings WHERE {where}', params))
+    
+    @staticmethod
+    def _restore_types(frame):
+        """Tipe kolom hasil query disamakan dengan load_data (flag int8, kolom partisi kategori)."""
+        for col in FLAG_COLUMNS:
+            if col in frame.columns:
+                frame[col] = frame[col].astype('int8')
+        return restore_partition_types(frame, list(frame.columns))
+    
+    def export_chunks(self, selection, chunk_rows):
+        where, params = self._where(selection.filters)
+        columns = ', '.join(f'"{c}"' for c in self.columns if c not in DERIVED_COLUMNS)
+        reader = self._cursor().execute(
+            f'SELECT {columns} FROM bookings WHERE {where}', params
+        ).to_arrow_reader(chunk_rows)
+        
+        # Skema file dari skema hasil query (bukan tebakan dari batch pertama), dengan tipe seperti CSV sumber
+        def chunks():
+            empty = True
+            for batch in reader:
+                empty = False
+                yield original_dtypes(batch.to_pandas())
+            if empty:
+                yield original_dtypes(reader.schema.empty_table().to_pandas())
+        
+        schema = pa.Schema.from_pandas(original_dtypes(reader.schema.empty_table().to_pandas()), preserve_index=False)
+        return schema, chunks()
+    
+    def aggregate(self, selection, keys, aggregations, any_flags=()):
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        where, params = self._where(selection.filters)
+        if any_flags:
+            where += ' AND (' + ' OR '.join(f'"{flag}" = 1' for flag in any_flags) + ')'
+        key_exprs = [
+            DUCKDB_DERIVED_KEYS[key] if key not in self.columns and key in DUCKDB_DERIVED_KEYS else f'"{key}"'
+            for key in keys
+        ]
+        measures = []
+        for name, (col, func) in aggregations.items():
+            expr = DUCKDB_AGGREGATES[func].format(col=f'"{col}"')
+            if func == 'sum':
+                expr += '::BIGINT' if col in self._integer_columns else '::DOUBLE'
+            measures.append(f'{expr} AS "{name}"')
+        # groupby pandas membuang grup yang key-nya kosong; samakan
+        not_null = ' AND '.join(f'{expr} IS NOT NULL' for expr in key_exprs)
+        key_list = ', '.join(f'{expr} AS "{key}"' for expr, key in zip(key_exprs, keys))
+        frame = self._query(f"""
+            SELECT {key_list}, {', '.join(measures)} FROM bookings
+            WHERE {where} AND {not_null}
+            GROUP BY ALL ORDER BY {', '.join(str(i + 1) for i in range(len(keys)))}
+        """, params)
+        return self._restore_types(frame).set_index(keys)
+    
+    def describe(self, selection):
+        where, params = self._where(selection.filters)
+        row = self._query(f"""
+            SELECT count(*) AS n_rows, min(arrival_date) AS min_date, max(arrival_date) AS max_date,
+                   count(DISTINCT hotel) AS n_hotels
+            FROM bookings WHERE {where}
+        """, params).iloc[0]
+        return {
+            'n_rows': int(row['n_rows']),
+            'min_date': pd.Timestamp(row['min_date']),
+            'max_date': pd.Timestamp(row['max_date']),
+            'n_hotels': int(row['n_hotels']),
+        }
+    
+    def box_stats(self, selection):
+        where, params = self._where(selection.filters)
+        groups = ' UNION ALL '.join(
+            f"SELECT '{label}' AS grp, occupancy_per_hari AS v FROM bookings "
+            f"WHERE {where} AND {condition} AND occupancy_per_hari IS NOT NULL"
+            for label, condition in BOX_GROUPS_SQL.items()
+        )
+        # Kuartil linear (quantile_cont) = np.quantile; whisker Tukey 1.5 IQR seperti box_stats()
+        stats = self._query(f"""
+            WITH g AS ({groups}),
+            q AS (SELECT grp, quantile_cont(v, [0.25, 0.5, 0.75]) AS qs, avg(v) AS mean FROM g GROUP BY grp)
+            SELECT grp, qs[1] AS q1, qs[2] AS median, qs[3] AS q3, mean,
+                   min(v) FILTER (WHERE v >= qs[1] - 1.5 * (qs[3] - qs[1])) AS lowerfence,
+                   max(v) FILTER (WHERE v <= qs[3] + 1.5 * (qs[3] - qs[1])) AS upperfence
+            FROM g JOIN q USING (grp)
+            GROUP BY ALL
+        """, params * len(BOX_GROUPS_SQL)).set_index('grp')
+        
+        result = {}
+        for label in BOX_GROUPS_SQL:
+            if label not in stats.index:
+                result[label] = {'y': []}
+                continue
+            row = stats.loc[label]
+            result[label] = {'x': [label]} | {
+                stat: [row[stat]] for stat in ['q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean']
+            }
+        return result
+    
+    def top_rows(self, selection, flag, n):
+        where, params = self._where(selection.filters)
+        columns = ', '.join(f'"{c}"' for c in DETAIL_COLUMNS)
+        return self._query(
+            f'SELECT {columns} FROM bookings WHERE {where} AND "{flag}" = 1 '
+            f'ORDER BY occupancy_per_hari DESC NULLS LAST LIMIT {int(n)}',
+            params
+        )
+    
+    def page(self, selection, sort_column, ascending, start, n):
+        where, params = self._where(selection.filters)
+        order_by = ''
+        if sort_column is not None:
+            if sort_column not in self.columns:
+                raise ValueError(f"Kolom tidak dikenal: {sort_column}")
+            # Semua kolom sebagai pemecah nilai seri agar halaman berurutan tidak tumpang tindih
+            direction = 'ASC' if ascending else 'DESC'
+            order_by = f'ORDER BY "{sort_column}" {direction} NULLS LAST, {self._all_columns}'
+        return self._query(
+            f'SELECT {self._all_columns} FROM bookings WHERE {where} {order_by} LIMIT {int(n)} OFFSET {int(start)}',
+            params
+        )
+
+
+@st.cache_resource(max_entries=1)
+def get_duckdb_backend(data_version):
+    # Sumber: dataset berpartisi bila aktif, selain itu cache Feather (dibangun dari CSV bila perlu)
+    if PARTITIONED_LAYOUT:
+        dataset = open_partitioned_dataset(data_version)
+    else:
+        ensure_columnar_cache()
+        dataset = ds.dataset(COLUMNAR_CACHE_PATH, format='feather')
+    return DuckDBBackend(dataset, data_version)
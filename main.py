@@ -1,14 +1,33 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
+import tempfile
+import threading
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as futures_wait
+
+from eda_core import (
+    CUBE_AGG_FUNCS, DASHBOARD_COLUMNS, DATA_PATH, DERIVED_COLUMNS, EXPORT_FORMATS, EXPORT_ROUTE,
+    MEDIAN_SKETCH_ERROR, PARTITIONED_LAYOUT, PERF_ADMIN_TOKEN, PERF_INSTRUMENTATION, PERF_PANEL_RUNS,
+    PROGRESSIVE_MODE, TOPK_MAX_K,
+    PandasBackend, RowSelection,
+    aggregate_task, approximate_aggregate, begin_perf_run, cached_aggregate,
+    estimate_nbytes, export_frame, export_selection, export_selection_file, filter_signature, finish_perf_run,
+    get_aggregate_cache, get_booking_store, get_data_version, get_duckdb_backend, get_perf_recorder,
+    get_result_cache, lazy_import, load_partition_options, load_partition_slice, perf_stage, process_rss_bytes,
+    refresh_booking_store, resolve_filter_mask, resolve_query_backend, timed_stage,
+)
+
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+
 
 # ====================================================================
 # FUNGSI UTAMA UNTUK MENGATUR TAMPILAN PLOTLY
 # ====================================================================
+@timed_stage('update_plot_layout')
 def update_plot_layout(fig):
     """Mengatur tata letak Plotly agar sesuai dengan tema gelap Streamlit."""
     fig.update_layout(
@@ -43,8 +62,36 @@ def update_plot_layout(fig):
             title_font_color='#FF6FB5' # Warna Label Sumbu Y (Accent Pink)
         ),
     )
+    # Semua grafik lewat sini, jadi sekalian ringkas payload array besarnya
+    return compact_figure_data(fig)
+
+
+# ====================================================================
+# RENDER WEBGL & SERIALISASI FIGUR YANG RINGKAS
+# ====================================================================
+# Di atas jumlah titik ini trace scatter pakai WebGL dan array numeriknya dikirim sebagai float32
+WEBGL_POINT_THRESHOLD = 1000
+
+
+def scatter_class(n_points):
+    """go.Scattergl (WebGL) untuk seri besar, go.Scatter (SVG) untuk seri kecil."""
+    return go.Scattergl if n_points > WEBGL_POINT_THRESHOLD else go.Scatter
+
+
+def compact_figure_data(fig):
+    """Menurunkan array x/y/z float64 yang besar ke float32.
+    
+    Plotly >= 6 mengirim array numpy sebagai typed array base64, jadi float32 memotong
+    payload websocket menjadi setengahnya. Array kecil dibiarkan agar teks hover tetap presisi.
+    """
+    for trace in fig.data:
+        for attr in ('x', 'y', 'z'):
+            values = getattr(trace, attr, None)
+            if isinstance(values, np.ndarray) and values.dtype == np.float64 and values.size > WEBGL_POINT_THRESHOLD:
+                trace[attr] = values.astype(np.float32)
     return fig
 
+
 # Page configuration
 st.set_page_config(
     page_title="Hotel Occupancy Analysis Dashboard",
@@ -250,27 +297,462 @@ div[data-baseweb="select"]:focus-within {
 </style>
 """, unsafe_allow_html=True)
 
-# Load data dengan caching
-@st.cache_data
-def load_data():
-    # PASTIKAN PATH FILE ANDA SUDAH BENAR DI SINI
-    df = pd.read_csv('HOTEL_OKUPANSI_FIX.csv')
-    df['arrival_date'] = pd.to_datetime(df['arrival_date'])
-    
-    # Pastikan kolom event_name ada, kalau tidak buat default
-    if 'Name' in df.columns:
-        df['Name'] = df['Name'].fillna('No Event')
-        df['Name'] = df['Name'].replace('', 'No Event')
-        df['Name'] = df['Name'].str.strip()
-        df.loc[df['Name'] == '', 'Name'] = 'No Event'
-    else:
-        df['Name'] = 'No Event'
-    
-    return df
+# ====================================================================
+# TAB LAZY: HANYA TAB AKTIF YANG DIHITUNG, SISANYA DISIAPKAN DI BACKGROUND
+# ====================================================================
+DETAIL_TAB = "📋 Detailed Data"
+LAZY_TABS = True
+# Rerun pemanasan saat boot (serve.py) memakai ?warmup=1 dan menunggu prefetch tab lain selesai
+WARMUP_QUERY_PARAM = 'warmup'
+
+# Agregat bersama (cache) yang dipakai tiap tab, urut tab1..tab5
+TAB_AGGREGATES = (
+    ('daily_data', 'monthly_data', 'season_data'),
+    ('box_stats',),
+    ('heatmap_pivot', 'dow_data'),
+    (),
+    ('events_summary',),
+)
+
+
+@st.cache_resource
+def get_prefetch_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='aggregate-prefetch')
+
+
+def prefetch_aggregates(names, aggregate_key, aggregate_args):
+    """Mengisi cache agregat untuk tab tersembunyi tanpa menahan rerun saat ini; kembalikan future-nya."""
+    executor = get_prefetch_executor()
+    return [executor.submit(aggregate_task(name, aggregate_key, aggregate_args)) for name in names]
+
+# ====================================================================
+# DOWNSAMPLING LTTB UNTUK GRAFIK TREND HARIAN
+# ====================================================================
+# Kira-kira lebar grafik dalam piksel; lebih dari ini tidak menambah detail yang terlihat
+TREND_MAX_POINTS = 1200
+
+
+def lttb_indices(x, y, n_out):
+    """Indeks titik terpilih dengan Largest-Triangle-Three-Buckets (titik pertama & terakhir selalu ikut)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    y = np.nan_to_num(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # Titik dengan luas segitiga terbesar terhadap titik terpilih sebelumnya dan rata-rata bucket berikutnya
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    selected[-1] = n - 1
+    return selected
+
+
+def downsample_trend(daily_data, max_points=TREND_MAX_POINTS):
+    """Menyederhanakan seri harian ke ~max_points titik; hari libur/event dan puncak global selalu dipertahankan."""
+    if len(daily_data) <= max_points:
+        return daily_data
+    
+    x = daily_data['arrival_date'].to_numpy().astype('datetime64[ns]').astype(np.int64).astype(float)
+    y = daily_data['occupancy_per_hari'].to_numpy(dtype=float)
+    keep = np.zeros(len(daily_data), dtype=bool)
+    keep[lttb_indices(x, y, max_points)] = True
+    keep |= (daily_data['Day_Type'] != 'Hari Biasa').to_numpy()
+    if not np.isnan(y).all():
+        keep[[np.nanargmax(y), np.nanargmin(y)]] = True
+    return daily_data[keep]
+
+
+# ====================================================================
+# FIGUR PER SEKSI: DIBANGUN PARALEL, DITAMPILKAN BEGITU SIAP
+# ====================================================================
+PARALLEL_SECTIONS = True
+SECTION_WORKERS = 4
+PREVIEW_CAPTION = "≈ Nilai sementara dari sampel berstrata (CI 95%); hasil eksak sedang dihitung..."
+
+
+@st.cache_resource
+def get_section_executor():
+    # Dipakai bersama semua sesi; agregasi di sini mengisi cache agregat yang sama
+    return ThreadPoolExecutor(max_workers=SECTION_WORKERS, thread_name_prefix='section-builder')
+
+
+class SectionScheduler:
+    """Menjadwalkan seksi-seksi tab yang saling independen.
+    
+    `add` menaruh placeholder di posisi layout saat ini dan mulai menghitung seksi di thread pool;
+    `render_as_completed` mengisi tiap placeholder di thread script, urut dari yang selesai lebih dulu.
+    Tiap seksi tercatat sebagai tahap `section:<nama>` (hitung + figur) dan `render:<nama>` (serialisasi).
+    `preview` (opsional) langsung menggambar versi sementara di placeholder sampai hasil eksak siap.
+    """
+    
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._pending = {}
+    
+    def add(self, name, compute, render, preview=None):
+        placeholder = st.empty()
+        compute = functools.partial(_timed_call, f'section:{name}', compute)
+        render = functools.partial(_timed_call, f'render:{name}', render)
+        if preview is not None:
+            with placeholder.container():
+                _timed_call(f'preview:{name}', preview)
+                st.caption(PREVIEW_CAPTION)
+        if self.executor is None:
+            with placeholder.container():
+                render(compute())
+            return
+        if preview is None:
+            placeholder.caption("⏳ Menyiapkan grafik...")
+        # Salin konteks agar tahap di thread pool tercatat pada run (rerun) yang sama
+        future = self.executor.submit(contextvars.copy_context().run, compute)
+        self._pending[future] = (placeholder, render)
+    
+    def render_as_completed(self):
+        pending, self._pending = self._pending, {}
+        for future in as_completed(pending):
+            placeholder, render = pending[future]
+            with placeholder.container():
+                render(future.result())
+
+
+def _timed_call(name, func, *args):
+    with perf_stage(name):
+        return func(*args)
+
+
+def render_chart(fig):
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def shared_task(task):
+    """Callable tanpa argumen yang hanya dihitung sekali walau dipanggil beberapa seksi dari thread berbeda."""
+    lock = threading.Lock()
+    result = []
+    
+    def run():
+        with lock:
+            if not result:
+                result.append(task())
+        return result[0]
+    return run
+
+
+def figure_trend(trend_line, trend_window, metric_type):
+    """Garis trend harian + marker Hari Libur, Hari Event, dan Libur & Event."""
+    fig_trend = go.Figure()
+    
+    # Pita CI 95% (hanya pada pratinjau sampel mode progresif)
+    if 'ci_low' in trend_line.columns:
+        for bound, fill in (('ci_high', None), ('ci_low', 'tonexty')):
+            fig_trend.add_trace(scatter_class(len(trend_line))(
+                x=trend_line['arrival_date'],
+                y=trend_line[bound],
+                mode='lines',
+                name='CI 95%',
+                line=dict(width=0),
+                fill=fill,
+                fillcolor='rgba(102, 126, 234, 0.25)',
+                showlegend=fill is not None,
+                hoverinfo='skip'
+            ))
+    
+    # Main line
+    fig_trend.add_trace(scatter_class(len(trend_line))(
+        x=trend_line['arrival_date'],
+        y=trend_line['occupancy_per_hari'],
+        mode='lines',
+        name='Okupansi',
+        line=dict(color='#667eea', width=2),
+        fill='tozeroy',
+        fillcolor='rgba(102, 126, 234, 0.1)',
+        customdata=trend_line[['Name', 'Day_Type', 'is_holiday', 'is_event_day']],
+        hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
+                      'Tipe Hari: <b>%{customdata[1]}</b><br>' + # Menggunakan Day_Type yang sudah diklasifikasi
+                      f'{metric_type} Okupansi: %{{y:.2f}}%<br>' + 
+                      'Event/Libur: %{customdata[0]}<br>' +
+                      '<extra></extra>'
+    ))
+    
+    # Marker Hari Libur Murni (Hanya Libur, bukan Event)
+    holidays_only = trend_window[(trend_window['is_holiday'] == 1) & (trend_window['is_event_day'] == 0)]
+    if len(holidays_only) > 0:
+        fig_trend.add_trace(scatter_class(len(holidays_only))(
+            x=holidays_only['arrival_date'],
+            y=holidays_only['occupancy_per_hari'],
+            mode='markers',
+            name='Hari Libur',
+            marker=dict(color="#ff6b6b", size=5, line=dict(width=1, color='White')),
+            showlegend=True,
+            customdata=holidays_only[['Name', 'Day_Type']],
+            hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
+                          'Tipe Hari: <b>🎉 Hari Libur</b><br>' +
+                          f'{metric_type} Okupansi: %{{y:.2f}}%<br>' +
+                          'Libur: %{customdata[0]}<br>' +
+                          '<extra></extra>'
+        ))
+    
+    # Marker Hari Event Murni (Hanya Event, bukan Libur)
+    events_only = trend_window[(trend_window['is_event_day'] == 1) & (trend_window['is_holiday'] == 0)]
+    if len(events_only) > 0:
+        fig_trend.add_trace(scatter_class(len(events_only))(
+            x=events_only['arrival_date'],
+            y=events_only['occupancy_per_hari'],
+            mode='markers',
+            name='Hari Event',
+            marker=dict(color='#feca57', size=5, line=dict(width=1, color='White')),
+            showlegend=True,
+            customdata=events_only[['Name', 'Day_Type']],
+            hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
+                          'Tipe Hari: <b>🎪 Hari Event</b><br>' +
+                          f'{metric_type} Okupansi: %{{y:.2f}}%<br>' +
+                          'Event: %{customdata[0]}<br>' +
+                          '<extra></extra>'
+        ))
+
+    # Marker Hari Libur & Event (Keduanya)
+    both_days = trend_window[(trend_window['is_holiday'] == 1) & (trend_window['is_event_day'] == 1)]
+    if len(both_days) > 0:
+        fig_trend.add_trace(scatter_class(len(both_days))(
+            x=both_days['arrival_date'],
+            y=both_days['occupancy_per_hari'],
+            mode='markers',
+            name='Libur & Event',
+            marker=dict(color='#9370DB', size=5, line=dict(width=1, color='White')),
+            showlegend=True,
+            customdata=both_days[['Name', 'Day_Type']],
+            hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
+                          'Tipe Hari: <b>🥳 Libur & Event</b><br>' +
+                          f'{metric_type} Okupansi: %{{y:.2f}}%<br>' +
+                          'Detail: %{customdata[0]}<br>' +
+                          '<extra></extra>'
+        ))
+    
+    fig_trend.update_layout(
+        title="Trend Okupansi Harian dengan Highlight Hari Libur & Event",
+        xaxis_title="Tanggal Kedatangan", 
+        yaxis_title=f"{metric_type} Okupansi Harian (%)", 
+        hovermode='closest',
+        height=500,
+        template='plotly_white'
+    )
+    return update_plot_layout(fig_trend)
+
+
+def figure_monthly(monthly_data, metric_type):
+    fig_monthly = px.line(
+        monthly_data,
+        x='year_month',
+        y='occupancy_per_hari',
+        title=f'Trend Okupansi Bulanan ({metric_type})',
+        markers=True,
+        color_discrete_sequence=['#764ba2']
+    )
+    fig_monthly.update_layout(
+        xaxis_title="Tahun-Bulan", 
+        yaxis_title=f"{metric_type} Okupansi (%)", 
+        height=350
+    )
+    return update_plot_layout(fig_monthly)
+
+
+def figure_season(season_data, metric_type):
+    fig_season = px.pie(
+        season_data,
+        names='Musim',
+        values='Okupansi',
+        title=f'{metric_type} Okupansi per Musim',
+        color='Musim',
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        hole=0.4
+    )
+    fig_season.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='#102A44', width=2)))
+    fig_season.update_layout(height=350, margin=dict(t=50, b=0, l=0, r=0))
+    return update_plot_layout(fig_season)
+
+
+def figure_comparison(summary, segments, labels, colors, title, metric_type):
+    """Bar perbandingan okupansi dua segmen ringkasan (mis. normal vs holiday)."""
+    comparison = pd.DataFrame({
+        'Kategori': labels,
+        'Okupansi': [summary['occupancy'][segment] for segment in segments],
+        'Jumlah Hari': [summary['bookings'][segment] for segment in segments]
+    })
+    
+    fig_comparison = go.Figure(data=[
+        go.Bar(
+            x=comparison['Kategori'],
+            y=comparison['Okupansi'],
+            text=comparison['Okupansi'].round(2),
+            textposition='auto',
+            marker=dict(
+                color=colors,
+                line=dict(color='white', width=2)
+            )
+        )
+    ])
+    
+    fig_comparison.update_layout(
+        title=f"{title} ({metric_type})",
+        yaxis_title=f"{metric_type} Okupansi (%)",
+        xaxis_title="Kategori Hari",
+        height=400,
+        showlegend=False
+    )
+    return update_plot_layout(fig_comparison)
+
+
+def figure_box(box_stats):
+    fig_box = go.Figure()
+    
+    # Kuartil & whisker dihitung di server; figur tidak membawa nilai mentah per booking
+    fig_box.add_trace(go.Box(
+        name='Hari Biasa',
+        marker_color='#667eea',
+        **box_stats['Hari Biasa']
+    ))
+    
+    fig_box.add_trace(go.Box(
+        name='Hari Libur',
+        marker_color="#5fa6cc",
+        **box_stats['Hari Libur']
+    ))
+    
+    fig_box.add_trace(go.Box(
+        name='Hari Event',
+        marker_color='#feca57',
+        **box_stats['Hari Event']
+    ))
+    
+    fig_box.update_layout(
+        title="Distribusi Okupansi: Hari Biasa vs Libur vs Event",
+        yaxis_title="Okupansi (%)",
+        height=400
+    )
+    return update_plot_layout(fig_box)
+
+
+def figure_heatmap(heatmap_pivot, metric_type):
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        z=heatmap_pivot.values,
+        x=heatmap_pivot.columns,
+        y=heatmap_pivot.index,
+        colorscale='RdYlGn',
+        text=heatmap_pivot.values.round(2),
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        colorbar=dict(title=f"Okupansi ({metric_type}) (%)")
+    ))
+    
+    # CI 95% per sel ditampilkan di hover (hanya pada pratinjau sampel mode progresif)
+    if 'ci' in heatmap_pivot.attrs:
+        ci_low, ci_high = heatmap_pivot.attrs['ci']
+        fig_heatmap.update_traces(
+            customdata=np.dstack([ci_low.to_numpy(dtype=float), ci_high.to_numpy(dtype=float)]),
+            hovertemplate='Bulan %{x}, tanggal %{y}<br>Okupansi: %{z:.2f}%<br>'
+                          'CI 95%: %{customdata[0]:.2f}–%{customdata[1]:.2f}%<extra></extra>'
+        )
+    
+    fig_heatmap.update_layout(
+        title=f'Heatmap Okupansi ({metric_type}) per Bulan dan Tanggal',
+        xaxis_title='Bulan',
+        yaxis_title='Tanggal (Hari ke-)',
+        height=600
+    )
+    return update_plot_layout(fig_heatmap)
+
+
+def figure_dow(dow_data, metric_type):
+    error_bars = {}
+    if 'ci_low' in dow_data.columns:
+        # Error bar CI 95% (hanya pada pratinjau sampel mode progresif)
+        error_bars = {
+            'error_y': dow_data['ci_high'] - dow_data['occupancy_per_hari'],
+            'error_y_minus': dow_data['occupancy_per_hari'] - dow_data['ci_low'],
+        }
+    fig_dow = px.bar(
+        dow_data,
+        x='day_of_week',
+        y='occupancy_per_hari',
+        title=f'{metric_type} Okupansi per Hari dalam Seminggu',
+        color='occupancy_per_hari',
+        color_continuous_scale='Plasma',
+        **error_bars
+    )
+    fig_dow.update_layout(
+        xaxis_title='Hari dalam Seminggu',
+        yaxis_title=f'{metric_type} Okupansi (%)',
+        height=400
+    )
+    return update_plot_layout(fig_dow)
+
+
+# ====================================================================
+# PAGINASI DI SERVER: HANYA BARIS HALAMAN AKTIF YANG DIKIRIM KE BROWSER
+# ====================================================================
+EVENT_LIST_PAGE_SIZE = 50
+# Browser data tab detail: baris per halaman dan pilihan "tanpa pengurutan" (urutan asli dataset)
+DETAIL_PAGE_SIZE = 100
+BROWSE_UNSORTED = '(urutan asli)'
+
+
+def page_bounds(n_rows, key, page_size):
+    """Widget nomor halaman untuk `n_rows` baris; mengembalikan rentang (start, stop) halaman aktif."""
+    n_pages = max(1, -(-n_rows // page_size))
+    # Filter baru bisa memperkecil jumlah halaman; nomor halaman lama disesuaikan sebelum widget dibuat
+    if st.session_state.get(key, 1) > n_pages:
+        st.session_state[key] = n_pages
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages, step=1, key=key)
+    start = (page - 1) * page_size
+    stop = min(start + page_size, n_rows)
+    st.caption(f"Baris {start + 1:,}–{stop:,} dari {n_rows:,}")
+    return start, stop
+
+
+def paginate(frame, key, page_size):
+    """Widget nomor halaman + potongan `frame` untuk halaman itu."""
+    start, stop = page_bounds(len(frame), key, page_size)
+    return frame.iloc[start:stop]
+
+
+def format_megabytes(nbytes):
+    return '-' if nbytes is None else f"{nbytes / 1024 ** 2:,.1f} MB"
+
+
 # Load data
 
+# Setiap rerun dicatat (durasi total + tahap) di recorder per proses; lihat panel admin di sidebar
+perf_recorder = get_perf_recorder()
+perf_token = begin_perf_run('rerun')
+
 try:
-    df = load_data()
+    with perf_stage('open_dataset') as stage:
+        data_version = get_data_version()
+        backend = None
+        if resolve_query_backend() == 'duckdb':
+            # Baris booking tetap di disk; filter & agregasi berat dijalankan DuckDB
+            backend = get_duckdb_backend(data_version)
+            dataset_options = backend.options
+        elif PARTITIONED_LAYOUT:
+            # Baris booking baru dibaca setelah pilihan sidebar diketahui (lihat load_partition_slice)
+            dataset_options = load_partition_options(data_version)
+        else:
+            snapshot = refresh_booking_store(get_booking_store(data_version))
+            dataset_options = snapshot['catalog']['options']
+        stage['rows_out'] = dataset_options['n_rows']
 
     
     # Sidebar
@@ -279,12 +761,12 @@ try:
     
     # Filter Hotel
     st.sidebar.subheader("🏢 Filter Hotel")
-    hotel_options = ['Semua Hotel'] + list(df['hotel'].unique())
+    hotel_options = ['Semua Hotel'] + list(dataset_options['hotel'])
     selected_hotel = st.sidebar.selectbox("Pilih Hotel", hotel_options)
     
     # Filter Tahun
     st.sidebar.subheader("📅 Filter Waktu")
-    year_options = sorted(df['year'].unique())
+    year_options = sorted(dataset_options['year'])
     selected_years = st.sidebar.multiselect(
         "Pilih Tahun",
         options=year_options,
@@ -293,8 +775,8 @@ try:
     
     # Date Range
     st.sidebar.subheader("🗓️ Rentang Tanggal")
-    min_date = df['arrival_date'].min()
-    max_date = df['arrival_date'].max()
+    min_date = dataset_options['min_date']
+    max_date = dataset_options['max_date']
     date_range = st.sidebar.date_input(
         "Pilih Rentang",
         value=(min_date, max_date),
@@ -304,7 +786,7 @@ try:
     
     # Filter Bulan
     st.sidebar.subheader("🗓️ Filter Bulan")
-    month_options = sorted(df['month'].unique())
+    month_options = sorted(dataset_options['month'])
     selected_months = st.sidebar.multiselect(
         "Pilih Bulan",
         options=month_options,
@@ -313,7 +795,7 @@ try:
     
     # Filter Season
     st.sidebar.subheader("🌤️ Filter Musim")
-    season_options = df['season'].unique()
+    season_options = dataset_options['season']
     selected_seasons = st.sidebar.multiselect(
         "Pilih Musim",
         options=season_options,
@@ -346,6 +828,15 @@ try:
         "Total": "sum"
     }
     selected_agg_func = metric_map.get(metric_type, "mean")
+    
+    # Median default-nya dari sketch kuantil; versi eksak tetap tersedia untuk audit
+    exact_median = False
+    if selected_agg_func == "median":
+        exact_median = st.sidebar.checkbox(
+            "🔍 Median Eksak (audit)",
+            False,
+            help=f"Tanpa centang, median grafik dihitung dari sketch kuantil (galat maks ±{MEDIAN_SKETCH_ERROR} poin)."
+        )
     # --------------------------------------------
     
     # Reset Button
@@ -353,573 +844,453 @@ try:
     if st.sidebar.button("🔄 Reset Semua Filter"):
         st.rerun()
     
-    # Apply filters
-    filtered_df = df.copy()
-    
-    if selected_hotel != 'Semua Hotel':
-        filtered_df = filtered_df[filtered_df['hotel'] == selected_hotel]
-    
-    if selected_years:
-        filtered_df = filtered_df[filtered_df['year'].isin(selected_years)]
+    # Apply filters: satu mask gabungan dari indeks bitmap, satu kali salin
+    filters = {
+        'hotel': selected_hotel,
+        'years': selected_years,
+        'date_range': date_range,
+        'months': selected_months,
+        'seasons': selected_seasons,
+        'only_holidays': show_only_holidays,
+        'only_events': show_only_events,
+        'exclude_canceled': exclude_canceled,
+    }
     
-    if len(date_range) == 2:
-        start_date = pd.to_datetime(date_range[0])
-        end_date = pd.to_datetime(date_range[1])
-        filtered_df = filtered_df[
-            (filtered_df['arrival_date'] >= start_date) &
-            (filtered_df['arrival_date'] <= end_date)
-        ]
+    signature = filter_signature(dataset_options, filters, selected_agg_func, exact_median)
     
-    if selected_months:
-        filtered_df = filtered_df[filtered_df['month'].isin(selected_months)]
+    if backend is None:
+        if PARTITIONED_LAYOUT:
+            # Pushdown hotel/tahun/rentang tanggal/bulan: hanya partisi yang cocok yang dibaca, dan kolom
+            # di luar DASHBOARD_COLUMNS hanya saat tab detail (browser data/export) yang aktif
+            read_all_columns = not LAZY_TABS or st.session_state.get('active_tab') == DETAIL_TAB
+            with perf_stage('load_partition_slice', rows_in=dataset_options['n_rows']) as stage:
+                snapshot = load_partition_slice(
+                    data_version, signature[:4], None if read_all_columns else tuple(DASHBOARD_COLUMNS)
+                )
+                stage['rows_out'] = len(snapshot['df'])
+        backend = PandasBackend(snapshot)
     
-    if selected_seasons:
-        filtered_df = filtered_df[filtered_df['season'].isin(selected_seasons)]
+    # Key cache agregat: versi isi snapshot backend + pilihan sidebar yang sudah dinormalisasi. Snapshot
+    # baru (delta ter-ingest) berarti key baru, jadi hasil dari snapshot lama tidak pernah tersaji lagi.
+    aggregate_key = (backend.result_version,) + signature
     
-    if show_only_holidays:
-        filtered_df = filtered_df[filtered_df['is_holiday'] == 1]
+    # Baris booking terfilter baru diambil dari backend saat ada yang membutuhkannya
+    selection = RowSelection(backend, filters, aggregate_key)
     
-    if show_only_events:
-        filtered_df = filtered_df[filtered_df['is_event_day'] == 1]
+    # Grafik di-roll-up dari cube harian yang difilter dengan pilihan yang sama
+    filtered_cube = None
+    median_sketch = None
+    if selected_agg_func in CUBE_AGG_FUNCS or not exact_median:
+        with perf_stage('filter_cube', rows_in=len(backend.cube)) as stage:
+            filtered_cube = backend.cube[resolve_filter_mask(backend.cube_index, filters)]
+            stage['rows_out'] = len(filtered_cube)
+        median_sketch = backend.sketch
     
-    if exclude_canceled:
-        filtered_df = filtered_df[filtered_df['is_canceled'] == 0]
+    aggregate_args = (selection, filtered_cube, selected_agg_func, median_sketch)
     
     # Info Dataset di Sidebar
     st.sidebar.markdown("---")
     
-    if len(filtered_df) == 0:
+    with perf_stage('filter', rows_in=dataset_options['n_rows']) as stage:
+        selection_info = selection.describe()
+        stage['rows_out'] = selection_info['n_rows']
+    if selection_info['n_rows'] == 0:
         st.sidebar.warning("Tidak ada data yang tersedia untuk filter ini.")
         st.title("❌ Tidak Ada Data")
         st.error("Tidak ada data yang cocok dengan kriteria filter yang dipilih.")
         st.stop()
         
     st.sidebar.info(f"""
-    📊 **Info Dataset**
-    - Total Bookings: **{len(filtered_df):,}**
-    - Periode: **{filtered_df['arrival_date'].min().strftime('%d %b %Y')}** - **{filtered_df['arrival_date'].max().strftime('%d %b %Y')}**
-    - Hotels: **{filtered_df['hotel'].nunique()}**
-    """)
+📊 **Info Dataset**
+- Total Bookings: **{selection_info['n_rows']:,}**
+- Periode: **{selection_info['min_date'].strftime('%d %b %Y')}** - **{selection_info['max_date'].strftime('%d %b %Y')}**
+- Hotels: **{selection_info['n_hotels']}**
+""")
     
     # Main Dashboard
     st.title("🏨 Dashboard Analisis Pengaruh Hari Libur & Event")
     st.markdown("---")
     
     # Summary Metrics
-    total_df_len = len(df)
-    
-    # Okupansi untuk Hari Biasa vs Libur
-    df_normal = filtered_df[filtered_df['is_holiday'] == 0]['occupancy_per_hari']
-    df_holiday = filtered_df[filtered_df['is_holiday'] == 1]['occupancy_per_hari']
+    total_df_len = dataset_options['n_rows']
     
-    occupancy_normal = df_normal.agg(selected_agg_func) if len(df_normal) > 0 else 0
-    occupancy_holiday = df_holiday.agg(selected_agg_func) if len(df_holiday) > 0 else 0
+    # Seksi (metric card & grafik): agregat + figur dibangun paralel, tiap placeholder terisi begitu seksinya siap
+    sections = SectionScheduler(get_section_executor() if PARALLEL_SECTIONS else None)
     
-    # Okupansi untuk Hari Event vs Non-Event
-    df_no_event = filtered_df[filtered_df['is_event_day'] == 0]['occupancy_per_hari']
-    df_event = filtered_df[filtered_df['is_event_day'] == 1]['occupancy_per_hari']
+    # Mode progresif hanya bila agregat masih harus memindai baris booking (tanpa cube: median eksak)
+    sample_selection = None
+    if PROGRESSIVE_MODE and filtered_cube is None:
+        sample_selection = RowSelection(backend.sample, filters)
     
-    occupancy_no_event = df_no_event.agg(selected_agg_func) if len(df_no_event) > 0 else 0
-    occupancy_event = df_event.agg(selected_agg_func) if len(df_event) > 0 else 0
+    def preview(name, render):
+        """Pratinjau seksi dari agregat sampel berstrata, atau None bila mode progresif tidak aktif."""
+        if sample_selection is None:
+            return None
+        return lambda: render(approximate_aggregate(name, aggregate_key, sample_selection, selected_agg_func))
     
-    # ADR dan Cancellation Rate
-    total_bookings = len(filtered_df)
-    avg_adr = filtered_df['adr'].mean() if total_bookings > 0 else 0
-    initial_filtered_df = df[df.index.isin(filtered_df.index)]
-    cancellation_rate = (initial_filtered_df['is_canceled'].sum() / len(initial_filtered_df)) * 100 if len(initial_filtered_df) > 0 else 0
-    
-    col1, col2, col3, col4 = st.columns(4)
+    def render_summary(summary):
+        # CI 95% hanya ada pada ringkasan dari sampel (pratinjau mode progresif)
+        ci = summary.get('ci')
+        
+        def interval_help(key, value_format):
+            if ci is None:
+                return None
+            if np.isnan(ci[key]).any():
+                return f"Perkiraan dari {summary['sample_rows']:,} baris sampel (terlalu sedikit untuk CI 95%)"
+            low, high = (value_format.format(bound) for bound in ci[key])
+            return f"Perkiraan dari {summary['sample_rows']:,} baris sampel. CI 95%: {low} – {high}"
+        
+        # Okupansi untuk Hari Biasa vs Libur
+        occupancy_normal = summary['occupancy']['normal']
+        occupancy_holiday = summary['occupancy']['holiday']
+        
+        # Okupansi untuk Hari Event vs Non-Event
+        occupancy_no_event = summary['occupancy']['no_event']
+        occupancy_event = summary['occupancy']['event']
+        
+        # ADR dan Cancellation Rate (dihitung dari baris yang lolos filter)
+        total_bookings = summary['total_bookings']
+        avg_adr = summary['avg_adr']
+        cancellation_rate = summary['cancellation_rate']
+        
+        col1, col2, col3, col4 = st.columns(4)
 
-    with col1:
-        st.metric(
-            label="📊 Total Bookings",
-            value=f"{total_bookings:,}",
-            delta=f"{(total_bookings/total_df_len*100):.1f}% dari total" if total_df_len > 0 else "0.0% dari total"
-        )
-    
-    with col2:
+        with col1:
+            st.metric(
+                label="📊 Total Bookings",
+                value=f"{total_bookings:,}",
+                delta=f"{(total_bookings/total_df_len*100):.1f}% dari total" if total_df_len > 0 else "0.0% dari total",
+                help=None if ci is None else f"Perkiraan dari {summary['sample_rows']:,} baris sampel (cacah x bobot stratum)"
+            )
+        
+        with col2:
+            diff_holiday = ((occupancy_holiday - occupancy_normal) / occupancy_normal * 100) if occupancy_normal > 0 else 0
+            st.metric(
+                label="🎉 Okupansi Hari Libur",
+                value=f"{occupancy_holiday:.2f}%",
+                delta=f"{diff_holiday:+.1f}% vs normal",
+                help=interval_help('holiday', '{:.2f}%')
+            )
+        
+        with col3:
+            diff_event = ((occupancy_event - occupancy_no_event) / occupancy_no_event * 100) if occupancy_no_event > 0 else 0
+            st.metric(
+                label="🎪 Okupansi Hari Event",
+                value=f"{occupancy_event:.2f}%",
+                delta=f"{diff_event:+.1f}% vs non-event",
+                help=interval_help('event', '{:.2f}%')
+            )
+        
+        with col4:
+            st.metric(
+                label="💰 Rata-rata ADR",
+                value=f"${avg_adr:.2f}",
+                delta=f"Cancel: {cancellation_rate:.1f}%",
+                help=interval_help('avg_adr', '${:.2f}')
+            )
+        
+        st.markdown("---")
+
+        # INSIGHTS (DITAMPILKAN DI BAWAH METRIC CARD SESUAI PERMINTAAN AWAL)
         diff_holiday = ((occupancy_holiday - occupancy_normal) / occupancy_normal * 100) if occupancy_normal > 0 else 0
-        st.metric(
-            label="🎉 Okupansi Hari Libur",
-            value=f"{occupancy_holiday:.2f}%",
-            delta=f"{diff_holiday:+.1f}% vs normal"
-        )
-    
-    with col3:
         diff_event = ((occupancy_event - occupancy_no_event) / occupancy_no_event * 100) if occupancy_no_event > 0 else 0
-        st.metric(
-            label="🎪 Okupansi Hari Event",
-            value=f"{occupancy_event:.2f}%",
-            delta=f"{diff_event:+.1f}% vs non-event"
-        )
-    
-    with col4:
-        st.metric(
-            label="💰 Rata-rata ADR",
-            value=f"${avg_adr:.2f}",
-            delta=f"Cancel: {cancellation_rate:.1f}%"
-        )
-    
-    st.markdown("---")
 
-    # INSIGHTS (DITAMPILKAN DI BAWAH METRIC CARD SESUAI PERMINTAAN AWAL)
-    diff_holiday = ((occupancy_holiday - occupancy_normal) / occupancy_normal * 100) if occupancy_normal > 0 else 0
-    diff_event = ((occupancy_event - occupancy_no_event) / occupancy_no_event * 100) if occupancy_no_event > 0 else 0
-
-    # Pastikan Expander selalu terlihat (expanded=True)
-    with st.expander("✨ Klik untuk Ringkasan dan Insight Utama", expanded=True):
-        st.markdown("#### **Kesimpulan Cepat dari Data Terfilter**")
-
-        # Insight 1: Pengaruh Hari Libur
-        holiday_msg = ""
-        if diff_holiday > 5:
-            holiday_msg = f"Okupansi di **Hari Libur** adalah **{occupancy_holiday:.2f}%**, yang berarti **{diff_holiday:+.1f}% lebih tinggi** dari hari biasa ({occupancy_normal:.2f}%). **Prioritaskan promosi saat liburan.**"
-            holiday_emoji = "🚀"
-        elif diff_holiday > 0:
-            holiday_msg = f"Okupansi di **Hari Libur** ({occupancy_holiday:.2f}%) sedikit **lebih tinggi** ({diff_holiday:+.1f}%) dibandingkan hari biasa ({occupancy_normal:.2f}%)."
-            holiday_emoji = "⬆️"
-        elif diff_holiday < 0:
-            holiday_msg = f"Okupansi di **Hari Libur** ({occupancy_holiday:.2f}%) sedikit **lebih rendah** ({diff_holiday:+.1f}%) dibandingkan hari biasa ({occupancy_normal:.2f}%). **Perlu tinjauan strategi liburan.**"
-            holiday_emoji = "📉"
-        else:
-            holiday_msg = "Okupansi Hari Libur dan Hari Biasa menunjukkan nilai yang relatif sama."
-            holiday_emoji = "⚖️"
-
-        # Insight 2: Pengaruh Event
-        event_msg = ""
-        if diff_event > 5:
-            event_msg = f"Hari **Event** menunjukkan Okupansi rata-rata **{occupancy_event:.2f}%**, **{diff_event:+.1f}% lebih tinggi** dari hari tanpa event ({occupancy_no_event:.2f}%). **Event sangat efektif meningkatkan hunian.**"
-            event_emoji = "🎉"
-        elif diff_event > 0:
-            event_msg = f"Okupansi di **Hari Event** ({occupancy_event:.2f}%) sedikit **lebih tinggi** ({diff_event:+.1f}%) dibandingkan hari non-event ({occupancy_no_event:.2f}%)."
-            event_emoji = "⬆️"
-        elif diff_event < 0:
-            event_msg = f"Hari **Event** ({occupancy_event:.2f}%) menunjukkan sedikit **penurunan** Okupansi ({diff_event:+.1f}%) dibandingkan hari tanpa event ({occupancy_no_event:.2f}%). **Perlu analisis event mana yang tidak optimal.**"
-            event_emoji = "⚠️"
-        else:
-            event_msg = "Okupansi Hari Event dan Hari Non-Event menunjukkan nilai yang relatif sama."
-            event_emoji = "⚖️"
+        # Pastikan Expander selalu terlihat (expanded=True)
+        with st.expander("✨ Klik untuk Ringkasan dan Insight Utama", expanded=True):
+            st.markdown("#### **Kesimpulan Cepat dari Data Terfilter**")
+
+            # Insight 1: Pengaruh Hari Libur
+            holiday_msg = ""
+            if diff_holiday > 5:
+                holiday_msg = f"Okupansi di **Hari Libur** adalah **{occupancy_holiday:.2f}%**, yang berarti **{diff_holiday:+.1f}% lebih tinggi** dari hari biasa ({occupancy_normal:.2f}%). **Prioritaskan promosi saat liburan.**"
+                holiday_emoji = "🚀"
+            elif diff_holiday > 0:
+                holiday_msg = f"Okupansi di **Hari Libur** ({occupancy_holiday:.2f}%) sedikit **lebih tinggi** ({diff_holiday:+.1f}%) dibandingkan hari biasa ({occupancy_normal:.2f}%)."
+                holiday_emoji = "⬆️"
+            elif diff_holiday < 0:
+                holiday_msg = f"Okupansi di **Hari Libur** ({occupancy_holiday:.2f}%) sedikit **lebih rendah** ({diff_holiday:+.1f}%) dibandingkan hari biasa ({occupancy_normal:.2f}%). **Perlu tinjauan strategi liburan.**"
+                holiday_emoji = "📉"
+            else:
+                holiday_msg = "Okupansi Hari Libur dan Hari Biasa menunjukkan nilai yang relatif sama."
+                holiday_emoji = "⚖️"
+
+            # Insight 2: Pengaruh Event
+            event_msg = ""
+            if diff_event > 5:
+                event_msg = f"Hari **Event** menunjukkan Okupansi rata-rata **{occupancy_event:.2f}%**, **{diff_event:+.1f}% lebih tinggi** dari hari tanpa event ({occupancy_no_event:.2f}%). **Event sangat efektif meningkatkan hunian.**"
+                event_emoji = "🎉"
+            elif diff_event > 0:
+                event_msg = f"Okupansi di **Hari Event** ({occupancy_event:.2f}%) sedikit **lebih tinggi** ({diff_event:+.1f}%) dibandingkan hari non-event ({occupancy_no_event:.2f}%)."
+                event_emoji = "⬆️"
+            elif diff_event < 0:
+                event_msg = f"Hari **Event** ({occupancy_event:.2f}%) menunjukkan sedikit **penurunan** Okupansi ({diff_event:+.1f}%) dibandingkan hari tanpa event ({occupancy_no_event:.2f}%). **Perlu analisis event mana yang tidak optimal.**"
+                event_emoji = "⚠️"
+            else:
+                event_msg = "Okupansi Hari Event dan Hari Non-Event menunjukkan nilai yang relatif sama."
+                event_emoji = "⚖️"
         
-        # Insight 3: Cancelation Rate
-        cancel_msg = f"Dengan tingkat pembatalan **{cancellation_rate:.1f}%**, manajemen perlu meninjau kembali kebijakan booking dan deposit untuk mengurangi kerugian."
-        cancel_emoji = "🛑"
+            # Insight 3: Cancelation Rate
+            cancel_msg = f"Dengan tingkat pembatalan **{cancellation_rate:.1f}%**, manajemen perlu meninjau kembali kebijakan booking dan deposit untuk mengurangi kerugian."
+            cancel_emoji = "🛑"
         
-        st.markdown(f"""
+            st.markdown(f"""
         - {holiday_emoji} **Okupansi Liburan**: {holiday_msg}
         - {event_emoji} **Okupansi Event**: {event_msg}
         """)
         
+    # Semua angka ringkasan dari satu agregasi per kombinasi (is_holiday, is_event_day, is_canceled),
+    # dihitung sekali lalu dipakai metric card & bar perbandingan
+    summary_task = shared_task(aggregate_task('summary', aggregate_key, aggregate_args))
+    sections.add('summary', summary_task, render_summary, preview('summary', render_summary))
+    
     st.markdown("---")
     # ====================================================================
     
-    # Tabs
+    # Tabs: dalam mode lazy hanya tab aktif yang dihitung (tab lain .open == False)
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📈 Trend Analysis", 
         "📊 Comparison", 
         "🗓️ Calendar View", 
-        "📋 Detailed Data",
+        DETAIL_TAB,
         "🎪 Event List"
-    ])
+    ], key='active_tab', on_change='rerun' if LAZY_TABS else 'ignore')
     
-    with tab1:
-        st.subheader("📈 Trend Okupansi dari Waktu ke Waktu")
-        
-        # Time series dengan highlight - tambahkan info event
-        daily_data = filtered_df.groupby('arrival_date').agg({
-            'occupancy_per_hari': selected_agg_func, # Menggunakan selected_agg_func yang sudah di-map
-            'is_holiday': 'max',
-            'is_event_day': 'max',
-            'total_tamu': 'sum',
-            'adr': 'mean',
-            'Name': lambda x: ', '.join(x[x != 'No Event'].unique()) if len(x[x != 'No Event']) > 0 else 'Hari Biasa' 
-        }).reset_index().sort_values('arrival_date')
-
-        # --- PERBAIKAN LOGIKA DAY_TYPE AGAR HOVER AKURAT ---
-        daily_data['Day_Type'] = 'Hari Biasa'
-        
-        # PENTING: Urutan penentuan kategori harus dari yang paling spesifik (Libur & Event) ke yang paling umum (Libur/Event)
-        daily_data.loc[(daily_data['is_holiday'] == 1) & (daily_data['is_event_day'] == 1), 'Day_Type'] = '🥳 Libur & Event'
-        daily_data.loc[(daily_data['is_holiday'] == 1) & (daily_data['is_event_day'] == 0), 'Day_Type'] = '🎉 Hari Libur'
-        daily_data.loc[(daily_data['is_holiday'] == 0) & (daily_data['is_event_day'] == 1), 'Day_Type'] = '🎪 Hari Event'
-        # Hari Biasa sudah default
-        
-        fig_trend = go.Figure()
-        
-        # Main line
-        fig_trend.add_trace(go.Scatter(
-            x=daily_data['arrival_date'],
-            y=daily_data['occupancy_per_hari'],
-            mode='lines',
-            name='Okupansi',
-            line=dict(color='#667eea', width=2),
-            fill='tozeroy',
-            fillcolor='rgba(102, 126, 234, 0.1)',
-            customdata=daily_data[['Name', 'Day_Type', 'is_holiday', 'is_event_day']],
-            hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
-                          'Tipe Hari: <b>%{customdata[1]}</b><br>' + # Menggunakan Day_Type yang sudah diklasifikasi
-                          f'{metric_type} Okupansi: %{{y:.2f}}%<br>' + 
-                          'Event/Libur: %{customdata[0]}<br>' +
-                          '<extra></extra>'
-        ))
+    def render_trend(daily_data):
+        # Seri panjang disederhanakan (LTTB); persempit rentang zoom untuk resolusi penuh
+        trend_window = daily_data
+        trend_line = daily_data
+        if len(daily_data) > TREND_MAX_POINTS:
+            first_day = daily_data['arrival_date'].iloc[0].date()
+            last_day = daily_data['arrival_date'].iloc[-1].date()
+            zoom_start, zoom_end = st.slider(
+                "🔎 Zoom Rentang Trend",
+                min_value=first_day,
+                max_value=last_day,
+                value=(first_day, last_day),
+                format="DD MMM YYYY"
+            )
+            trend_window = daily_data[
+                (daily_data['arrival_date'] >= pd.Timestamp(zoom_start)) &
+                (daily_data['arrival_date'] <= pd.Timestamp(zoom_end))
+            ]
+            trend_line = downsample_trend(trend_window, TREND_MAX_POINTS)
+            dropped_points = len(trend_window) - len(trend_line)
+            if dropped_points > 0:
+                st.caption(
+                    f"ℹ️ Garis trend menampilkan {len(trend_line):,} dari {len(trend_window):,} titik "
+                    f"({dropped_points:,} titik disederhanakan dengan LTTB; puncak dan marker libur/event tetap utuh). "
+                    "Persempit rentang zoom untuk resolusi penuh."
+                )
         
-        # Marker Hari Libur Murni (Hanya Libur, bukan Event)
-        holidays_only = daily_data[(daily_data['is_holiday'] == 1) & (daily_data['is_event_day'] == 0)]
-        if len(holidays_only) > 0:
-            fig_trend.add_trace(go.Scatter(
-                x=holidays_only['arrival_date'],
-                y=holidays_only['occupancy_per_hari'],
-                mode='markers',
-                name='Hari Libur',
-                marker=dict(color="#ff6b6b", size=5, line=dict(width=1, color='White')),
-                showlegend=True,
-                customdata=holidays_only[['Name', 'Day_Type']],
-                hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
-                              'Tipe Hari: <b>🎉 Hari Libur</b><br>' +
-                              f'{metric_type} Okupansi: %{{y:.2f}}%<br>' +
-                              'Libur: %{customdata[0]}<br>' +
-                              '<extra></extra>'
-            ))
+        render_chart(figure_trend(trend_line, trend_window, metric_type))
+    
+    def aggregate_figure(name, figure):
+        aggregate = aggregate_task(name, aggregate_key, aggregate_args)
+        return lambda: figure(aggregate())
+    
+    with tab1:
+        if tab1.open is not False:
+            st.subheader("📈 Trend Okupansi dari Waktu ke Waktu")
         
-        # Marker Hari Event Murni (Hanya Event, bukan Libur)
-        events_only = daily_data[(daily_data['is_event_day'] == 1) & (daily_data['is_holiday'] == 0)]
-        if len(events_only) > 0:
-            fig_trend.add_trace(go.Scatter(
-                x=events_only['arrival_date'],
-                y=events_only['occupancy_per_hari'],
-                mode='markers',
-                name='Hari Event',
-                marker=dict(color='#feca57', size=5, line=dict(width=1, color='White')),
-                showlegend=True,
-                customdata=events_only[['Name', 'Day_Type']],
-                hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
-                              'Tipe Hari: <b>🎪 Hari Event</b><br>' +
-                              f'{metric_type} Okupansi: %{{y:.2f}}%<br>' +
-                              'Event: %{customdata[0]}<br>' +
-                              '<extra></extra>'
-            ))
-
-        # Marker Hari Libur & Event (Keduanya)
-        both_days = daily_data[(daily_data['is_holiday'] == 1) & (daily_data['is_event_day'] == 1)]
-        if len(both_days) > 0:
-            fig_trend.add_trace(go.Scatter(
-                x=both_days['arrival_date'],
-                y=both_days['occupancy_per_hari'],
-                mode='markers',
-                name='Libur & Event',
-                marker=dict(color='#9370DB', size=5, line=dict(width=1, color='White')),
-                showlegend=True,
-                customdata=both_days[['Name', 'Day_Type']],
-                hovertemplate='<b>%{x|%d %b %Y}</b><br>' +
-                              'Tipe Hari: <b>🥳 Libur & Event</b><br>' +
-                              f'{metric_type} Okupansi: %{{y:.2f}}%<br>' +
-                              'Detail: %{customdata[0]}<br>' +
-                              '<extra></extra>'
+            # Time series dengan highlight - tambahkan info event (zoom slider butuh thread script)
+            sections.add('trend', aggregate_task('daily_data', aggregate_key, aggregate_args), render_trend, preview(
+                'daily_data', lambda data: render_chart(figure_trend(downsample_trend(data), data, metric_type))
             ))
         
-        fig_trend.update_layout(
-            title="Trend Okupansi Harian dengan Highlight Hari Libur & Event",
-            xaxis_title="Tanggal Kedatangan", 
-            yaxis_title=f"{metric_type} Okupansi Harian (%)", 
-            hovermode='closest',
-            height=500,
-            template='plotly_white'
-        )
-        fig_trend = update_plot_layout(fig_trend)
-        
-        st.plotly_chart(fig_trend, use_container_width=True)
-        
-        # Monthly trend
-        col1, col2 = st.columns(2)
+            # Monthly trend
+            col1, col2 = st.columns(2)
         
-        with col1:
-            monthly_data = filtered_df.groupby(['year', 'month'])['occupancy_per_hari'].agg(selected_agg_func).reset_index()
-            monthly_data['year_month'] = monthly_data['year'].astype(str) + '-' + monthly_data['month'].astype(str).str.zfill(2)
-            
-            fig_monthly = px.line(
-                monthly_data,
-                x='year_month',
-                y='occupancy_per_hari',
-                title=f'Trend Okupansi Bulanan ({metric_type})',
-                markers=True,
-                color_discrete_sequence=['#764ba2']
-            )
-            fig_monthly.update_layout(
-                xaxis_title="Tahun-Bulan", 
-                yaxis_title=f"{metric_type} Okupansi (%)", 
-                height=350
-            )
-            fig_monthly = update_plot_layout(fig_monthly)
-            st.plotly_chart(fig_monthly, use_container_width=True)
+            with col1:
+                sections.add('monthly', aggregate_figure('monthly_data', lambda data: figure_monthly(data, metric_type)), render_chart)
         
-        with col2:
-            season_data = filtered_df.groupby('season')['occupancy_per_hari'].agg(selected_agg_func).reset_index()
-            season_data.columns = ['Musim', 'Okupansi']
-
-            fig_season = px.pie(
-                season_data,
-                names='Musim',
-                values='Okupansi',
-                title=f'{metric_type} Okupansi per Musim',
-                color='Musim',
-                color_discrete_sequence=px.colors.qualitative.Pastel,
-                hole=0.4
-            )
-            fig_season.update_traces(textposition='inside', textinfo='percent+label', marker=dict(line=dict(color='#102A44', width=2)))
-            fig_season.update_layout(height=350, margin=dict(t=50, b=0, l=0, r=0))
-            fig_season = update_plot_layout(fig_season)
-            st.plotly_chart(fig_season, use_container_width=True)
+            with col2:
+                sections.add('season', aggregate_figure('season_data', lambda data: figure_season(data, metric_type)), render_chart)
     
     with tab2:
-        st.subheader("📊 Perbandingan Okupansi")
+        if tab2.open is not False:
+            st.subheader("📊 Perbandingan Okupansi")
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            comparison_holiday = pd.DataFrame({
-                'Kategori': ['Hari Biasa', 'Hari Libur'],
-                'Okupansi': [occupancy_normal, occupancy_holiday],
-                'Jumlah Hari': [
-                    len(filtered_df[filtered_df['is_holiday'] == 0]),
-                    len(filtered_df[filtered_df['is_holiday'] == 1])
-                ]
-            })
-            
-            fig_holiday = go.Figure(data=[
-                go.Bar(
-                    x=comparison_holiday['Kategori'],
-                    y=comparison_holiday['Okupansi'],
-                    text=comparison_holiday['Okupansi'].round(2),
-                    textposition='auto',
-                    marker=dict(
-                        color=['#667eea', '#ff6b6b'],
-                        line=dict(color='white', width=2)
-                    )
-                )
-            ])
-            
-            fig_holiday.update_layout(
-                title=f"Perbandingan: Hari Libur vs Hari Biasa ({metric_type})",
-                yaxis_title=f"{metric_type} Okupansi (%)",
-                xaxis_title="Kategori Hari",
-                height=400,
-                showlegend=False
-            )
-            fig_holiday = update_plot_layout(fig_holiday)
-            
-            st.plotly_chart(fig_holiday, use_container_width=True)
+            col1, col2 = st.columns(2)
         
-        with col2:
-            comparison_event = pd.DataFrame({
-                'Kategori': ['Non-Event', 'Hari Event'],
-                'Okupansi': [occupancy_no_event, occupancy_event],
-                'Jumlah Hari': [
-                    len(filtered_df[filtered_df['is_event_day'] == 0]),
-                    len(filtered_df[filtered_df['is_event_day'] == 1])
-                ]
-            })
-            
-            fig_event = go.Figure(data=[
-                go.Bar(
-                    x=comparison_event['Kategori'],
-                    y=comparison_event['Okupansi'],
-                    text=comparison_event['Okupansi'].round(2),
-                    textposition='auto',
-                    marker=dict(
-                        color=['#764ba2', '#feca57'],
-                        line=dict(color='white', width=2)
-                    )
-                )
-            ])
-            
-            fig_event.update_layout(
-                title=f"Perbandingan: Hari Event vs Non-Event ({metric_type})",
-                yaxis_title=f"{metric_type} Okupansi (%)",
-                xaxis_title="Kategori Hari",
-                height=400,
-                showlegend=False
-            )
-            fig_event = update_plot_layout(fig_event)
-            
-            st.plotly_chart(fig_event, use_container_width=True)
-        
-        st.subheader("📦 Distribusi Okupansi")
-        
-        fig_box = go.Figure()
-        
-        fig_box.add_trace(go.Box(
-            y=filtered_df[filtered_df['is_holiday'] == 0]['occupancy_per_hari'],
-            name='Hari Biasa',
-            marker_color='#667eea'
-        ))
-        
-        fig_box.add_trace(go.Box(
-            y=filtered_df[filtered_df['is_holiday'] == 1]['occupancy_per_hari'],
-            name='Hari Libur',
-            marker_color="#5fa6cc"
-        ))
+            with col1:
+                sections.add('holiday_comparison', lambda: figure_comparison(
+                    summary_task(), ('normal', 'holiday'), ['Hari Biasa', 'Hari Libur'],
+                    ['#667eea', '#ff6b6b'], "Perbandingan: Hari Libur vs Hari Biasa", metric_type
+                ), render_chart)
         
-        fig_box.add_trace(go.Box(
-            y=filtered_df[filtered_df['is_event_day'] == 1]['occupancy_per_hari'],
-            name='Hari Event',
-            marker_color='#feca57'
-        ))
+            with col2:
+                sections.add('event_comparison', lambda: figure_comparison(
+                    summary_task(), ('no_event', 'event'), ['Non-Event', 'Hari Event'],
+                    ['#764ba2', '#feca57'], "Perbandingan: Hari Event vs Non-Event", metric_type
+                ), render_chart)
         
-        fig_box.update_layout(
-            title="Distribusi Okupansi: Hari Biasa vs Libur vs Event",
-            yaxis_title="Okupansi (%)",
-            height=400
-        )
-        fig_box = update_plot_layout(fig_box)
+            st.subheader("📦 Distribusi Okupansi")
         
-        st.plotly_chart(fig_box, use_container_width=True)
+            sections.add('box', aggregate_figure('box_stats', figure_box), render_chart)
     
     with tab3:
-        st.subheader("🗓️ Heatmap Okupansi")
-        
-        if 'arrival_date_day_of_month' not in filtered_df.columns:
-            filtered_df['arrival_date_day_of_month'] = filtered_df['arrival_date'].dt.day
-            
-        heatmap_data = filtered_df.groupby(['month', 'arrival_date_day_of_month'])['occupancy_per_hari'].agg(selected_agg_func).reset_index()
-        heatmap_pivot = heatmap_data.pivot(index='arrival_date_day_of_month', columns='month', values='occupancy_per_hari')
-        
-        fig_heatmap = go.Figure(data=go.Heatmap(
-            z=heatmap_pivot.values,
-            x=heatmap_pivot.columns,
-            y=heatmap_pivot.index,
-            colorscale='RdYlGn',
-            text=heatmap_pivot.values.round(2),
-            texttemplate='%{text}',
-            textfont={"size": 10},
-            colorbar=dict(title=f"Okupansi ({metric_type}) (%)")
-        ))
+        if tab3.open is not False:
+            st.subheader("🗓️ Heatmap Okupansi")
         
-        fig_heatmap.update_layout(
-            title=f'Heatmap Okupansi ({metric_type}) per Bulan dan Tanggal',
-            xaxis_title='Bulan',
-            yaxis_title='Tanggal (Hari ke-)',
-            height=600
-        )
-        fig_heatmap = update_plot_layout(fig_heatmap)
+            heatmap_figure = lambda data: figure_heatmap(data, metric_type)
+            sections.add('heatmap', aggregate_figure('heatmap_pivot', heatmap_figure), render_chart, preview(
+                'heatmap_pivot', lambda data: render_chart(heatmap_figure(data))
+            ))
+            dow_figure = lambda data: figure_dow(data, metric_type)
+            sections.add('day_of_week', aggregate_figure('dow_data', dow_figure), render_chart, preview(
+                'dow_data', lambda data: render_chart(dow_figure(data))
+            ))
+    
+    sections.render_as_completed()
+    
+    with tab4:
+        if tab4.open is not False:
+            st.subheader("📋 Data Detail")
         
-        st.plotly_chart(fig_heatmap, use_container_width=True)
+            top_k = st.number_input("Jumlah Baris Top K", min_value=1, max_value=TOPK_MAX_K, value=10, key='top_k')
         
-        filtered_df['day_of_week'] = filtered_df['arrival_date'].dt.day_name()
-        dow_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        dow_data = filtered_df.groupby('day_of_week')['occupancy_per_hari'].agg(selected_agg_func).reindex(dow_order).reset_index()
+            col1, col2 = st.columns(2)
         
-        fig_dow = px.bar(
-            dow_data,
-            x='day_of_week',
-            y='occupancy_per_hari',
-            title=f'{metric_type} Okupansi per Hari dalam Seminggu',
-            color='occupancy_per_hari',
-            color_continuous_scale='Plasma'
-        )
-        fig_dow.update_layout(
-            xaxis_title='Hari dalam Seminggu',
-            yaxis_title=f'{metric_type} Okupansi (%)',
-            height=400
-        )
-        fig_dow = update_plot_layout(fig_dow)
-        st.plotly_chart(fig_dow, use_container_width=True)
-    
-    with tab4:
-        st.subheader("📋 Data Detail")
+            with col1:
+                st.markdown(f"#### 🏆 Top {top_k} Hari Libur dengan Okupansi {metric_type} Tertinggi")
+                top_holidays = selection.top_rows('is_holiday', top_k)
+                st.dataframe(top_holidays, use_container_width=True)
         
-        col1, col2 = st.columns(2)
+            with col2:
+                st.markdown(f"#### 🎪 Top {top_k} Hari Event dengan Okupansi {metric_type} Tertinggi")
+                top_events = selection.top_rows('is_event_day', top_k)
+                st.dataframe(top_events, use_container_width=True)
         
-        with col1:
-            st.markdown(f"#### 🏆 Top 10 Hari Libur dengan Okupansi {metric_type} Tertinggi")
-            top_holidays = filtered_df[filtered_df['is_holiday'] == 1].nlargest(10, 'occupancy_per_hari')[
-                ['arrival_date', 'hotel', 'Name', 'occupancy_per_hari', 'adr', 'total_tamu']
-            ]
-            st.dataframe(top_holidays, use_container_width=True)
+                st.markdown("---")
+                st.markdown("#### 📥 Download Data Terfilter")
         
-        with col2:
-            st.markdown(f"#### 🎪 Top 10 Hari Event dengan Okupansi {metric_type} Tertinggi")
-            top_events = filtered_df[filtered_df['is_event_day'] == 1].nlargest(10, 'occupancy_per_hari')[
-                ['arrival_date', 'hotel', 'Name', 'occupancy_per_hari', 'adr', 'total_tamu']
-            ]
-            st.dataframe(top_events, use_container_width=True)
+                # File baru dibuat saat tombol diklik, ditulis per potongan baris
+                export_format = st.selectbox("Format File", list(EXPORT_FORMATS), key='export_format')
+                export_extension, export_mime = EXPORT_FORMATS[export_format]
+                export_name = f"hotel_data_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_extension}"
+                if EXPORT_ROUTE:
+                    # File di disk, diunduh lewat route streaming serve.py; berlaku untuk filter & format saat dibuat
+                    export_key = (aggregate_key, export_format)
+                    if st.button(f"Siapkan {export_format}"):
+                        with st.spinner("Menulis file export..."):
+                            st.session_state['export_file'] = (
+                                export_key, export_selection_file(selection, export_format, export_name, perf_recorder)
+                            )
+                    prepared = st.session_state.get('export_file')
+                    if prepared is not None and prepared[0] == export_key:
+                        st.link_button(f"Download {export_format}", f"{EXPORT_ROUTE}/{prepared[1]}")
+                else:
+                    st.download_button(
+                        label=f"Download {export_format}",
+                        data=lambda: export_selection(selection, export_format, tempfile.TemporaryFile(), perf_recorder),
+                        file_name=export_name,
+                        mime=export_mime,
+                    )
         
+            # Browser data: urutan dihitung di server, hanya baris halaman aktif yang dikirim ke browser
             st.markdown("---")
-            st.markdown("#### 📥 Download Data Terfilter")
-        
-            csv = filtered_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"hotel_data_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
+            st.markdown("#### 👀 Jelajahi Data Terfilter")
+            browse_columns = [col for col in backend.columns if col not in DERIVED_COLUMNS]
+            sort_column = st.selectbox("Urutkan Berdasarkan", [BROWSE_UNSORTED] + browse_columns, key='browse_sort')
+            ascending = st.radio("Arah Urutan", ["Naik", "Turun"], horizontal=True, key='browse_direction') == "Naik"
+            start, stop = page_bounds(selection_info['n_rows'], 'browse_page', DETAIL_PAGE_SIZE)
+            st.dataframe(
+                selection.page(None if sort_column == BROWSE_UNSORTED else sort_column, ascending, start, stop - start),
+                use_container_width=True
             )
-        
-            st.markdown("#### 👀 Preview Data (100 baris pertama)")
-            st.dataframe(filtered_df.head(100), use_container_width=True)
     
     # TAB 5 - EVENT LIST
     with tab5:
-        st.subheader("🎪 Daftar Event & Hari Libur")
-        
-        events_df = filtered_df[
-            (filtered_df['is_holiday'] == 1) | 
-            (filtered_df['is_event_day'] == 1)
-        ].copy()
-        
-        if len(events_df) > 0:
-            events_summary = events_df.groupby(['arrival_date', 'Name']).agg({
-                'occupancy_per_hari': selected_agg_func,
-                'is_holiday': 'max',
-                'is_event_day': 'max',
-                'total_tamu': 'sum',
-                'adr': 'mean'
-            }).reset_index().sort_values('arrival_date', ascending=False)
-            
-            events_summary['Kategori'] = events_summary.apply(
-                lambda row: '🎉 Hari Libur' if row['is_holiday'] == 1 else '🎪 Event', 
-                axis=1
-            )
-            
-            events_summary_display = events_summary[[
-                'arrival_date', 'Name', 'Kategori', 
-                'occupancy_per_hari', 'total_tamu', 'adr'
-            ]].copy()
-            
-            events_summary_display.columns = [
-                'Tanggal', 'Nama Event', 'Kategori', 
-                f'Okupansi ({metric_type}) (%)', 'Total Tamu', 'ADR ($)'
-            ]
-            
-            events_summary_display[f'Okupansi ({metric_type}) (%)'] = events_summary_display[f'Okupansi ({metric_type}) (%)'].round(2)
-            events_summary_display['ADR ($)'] = events_summary_display['ADR ($)'].round(2)
+        if tab5.open is not False:
+            st.subheader("🎪 Daftar Event & Hari Libur")
+        
+            events_summary = cached_aggregate('events_summary', aggregate_key, aggregate_args)
+        
+            if len(events_summary) > 0:
+                # Satu frame tampilan langsung dari kolom agregat (pembulatan vektor, tanpa salinan berantai)
+                events_summary_display = pd.DataFrame({
+                    'Tanggal': events_summary['arrival_date'].to_numpy(),
+                    'Nama Event': events_summary['Name'].to_numpy(),
+                    'Kategori': events_summary['Kategori'].to_numpy(),
+                    f'Okupansi ({metric_type}) (%)': events_summary['occupancy_per_hari'].to_numpy().round(2),
+                    'Total Tamu': events_summary['total_tamu'].to_numpy(),
+                    'ADR ($)': events_summary['adr'].to_numpy().round(2),
+                }, index=events_summary.index)
             
-            st.dataframe(
-                events_summary_display,
-                use_container_width=True,
-                height=600
-            )
+                st.dataframe(
+                    paginate(events_summary_display, 'event_list_page', EVENT_LIST_PAGE_SIZE),
+                    use_container_width=True,
+                    height=600
+                )
             
-            st.markdown("---")
-            csv_events = events_summary_display.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Download Daftar Event (CSV)",
-                data=csv_events,
-                file_name=f"event_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-            )
+                st.markdown("---")
+                st.download_button(
+                    label="📥 Download Daftar Event (CSV)",
+                    data=lambda: export_frame(events_summary_display, 'CSV', perf_recorder),
+                    file_name=f"event_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                )
             
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Event", len(events_summary))
-            with col2:
-                st.metric("Hari Libur", len(events_summary[events_summary['is_holiday'] == 1]))
-            with col3:
-                st.metric("Hari Event Khusus", len(events_summary[events_summary['is_event_day'] == 1]))
-        else:
-            st.info("Tidak ada event atau hari libur dalam data yang difilter.")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total Event", len(events_summary))
+                with col2:
+                    st.metric("Hari Libur", int((events_summary['is_holiday'] == 1).sum()))
+                with col3:
+                    st.metric("Hari Event Khusus", int((events_summary['is_event_day'] == 1).sum()))
+            else:
+                st.info("Tidak ada event atau hari libur dalam data yang difilter.")
+
+    # Setelah tab aktif tampil, agregat tab lain disiapkan di background untuk perpindahan tab berikutnya
+    if LAZY_TABS:
+        hidden_aggregates = [
+            name
+            for tab, names in zip((tab1, tab2, tab3, tab4, tab5), TAB_AGGREGATES)
+            if tab.open is False
+            for name in names
+        ]
+        prefetched = prefetch_aggregates(hidden_aggregates, aggregate_key, aggregate_args)
+        if st.query_params.get(WARMUP_QUERY_PARAM):
+            futures_wait(prefetched)
+    
+    # Memori: dataset bersama (sekali per proses) vs yang dipegang sesi ini saja
+    with st.sidebar.expander("💾 Memori"):
+        result_cache = get_result_cache()
+        session_nbytes = selection.materialized_nbytes()
+        if filtered_cube is not None:
+            session_nbytes += estimate_nbytes(filtered_cube)
+        st.markdown(f"""
+    - Dataset bersama ({backend.name}): **{format_megabytes(backend.shared_nbytes())}**
+    - Sesi ini: **{format_megabytes(session_nbytes)}**
+    - Cache agregat: **{format_megabytes(get_aggregate_cache().current_bytes)}**
+    - Cache hasil di disk: **{format_megabytes(result_cache.total_bytes() if result_cache else 0)}**
+    - RSS proses: **{format_megabytes(process_rss_bytes())}**
+    """)
+    
+    # Panel performa (admin): run yang sudah selesai di proses ini, p50/p95 per tahap, dan export metrik
+    if PERF_INSTRUMENTATION and PERF_ADMIN_TOKEN and st.query_params.get('admin') == PERF_ADMIN_TOKEN:
+        with st.sidebar.expander("⏱️ Performa (admin)"):
+            recent_runs = perf_recorder.recent('rerun')[-PERF_PANEL_RUNS:]
+            if recent_runs:
+                rerun_ms = np.array([run.seconds for run in recent_runs]) * 1000
+                st.markdown(f"""
+            - Rerun tercatat: **{len(recent_runs)}**
+            - p50: **{np.quantile(rerun_ms, 0.5):,.0f} ms** · p95: **{np.quantile(rerun_ms, 0.95):,.0f} ms**
+            """)
+                st.dataframe(pd.DataFrame([{
+                    'Waktu': datetime.fromtimestamp(run.started_at).strftime('%H:%M:%S'),
+                    'Total (ms)': round(run.seconds * 1000, 1),
+                    'Tahap terlama': max(run.stages, key=lambda stage: stage['seconds'])['name'] if run.stages else '-',
+                } for run in reversed(recent_runs)]), use_container_width=True, hide_index=True)
+            st.dataframe(perf_recorder.stage_table(), use_container_width=True)
+            st.download_button("📥 Metrik Prometheus", perf_recorder.prometheus_text(), "eda_metrics.prom", "text/plain")
+            st.download_button("📥 Log JSON", perf_recorder.json_lines(), "eda_perf.jsonl", "application/json")
 
 except FileNotFoundError:
     st.error("❌ File tidak ditemukan! Pastikan path file CSV sudah benar.")
-    st.info("Path yang dicari: 'HOTEL_OKUPANSI_FIX.csv'")
+    st.info(f"Path yang dicari: '{DATA_PATH}'")
 except Exception as e:
     st.error(f"❌ Terjadi error: {str(e)}")
-    st.info("Silakan cek kembali data dan format kolom CSV Anda.")
\ No newline at end of file
+    st.info("Silakan cek kembali data dan format kolom CSV Anda.")
+finally:
+    finish_perf_run(perf_token, perf_recorder)
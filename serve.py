@@ -0,0 +1,119 @@
+"""Entry point produksi: dashboard main.py dengan warm-up di dalam proses saat boot.
+
+    streamlit run serve.py            # atau: uvicorn serve:app --host 0.0.0.0 --port 8501
+
+Saat boot, satu sesi tanpa browser menjalankan main.py dengan filter default di proses ini: import berat,
+data (BookingStore: frame, indeks bitmap, cube) dan agregat filter default semua tab masuk cache sebelum
+pengunjung pertama datang. /_stcore/health sudah 200 begitu server hidup, jadi arahkan readiness
+probe / health check load balancer ke /ready, yang baru 200 setelah warm-up selesai.
+
+File export tab detail ditulis main.py ke EDA_EXPORT_DIR dan diunduh lewat /export/<nama>, yang
+mengalirkannya dari disk per blok alih-alih lewat buffer memori st.download_button.
+"""
+import asyncio
+import contextlib
+import os
+import re
+import tempfile
+import time
+
+import streamlit as st
+from streamlit.logger import get_logger
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.runtime import Runtime
+from starlette.responses import FileResponse, PlainTextResponse
+from starlette.routing import Route
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+# EDA_WARMUP=0 mematikan warm-up (mis. untuk development); /ready lalu langsung siap
+WARMUP_ENABLED = os.environ.get('EDA_WARMUP', '1') != '0'
+# Lewat dari batas ini /ready tetap dinyatakan siap; sesi warm-up dibiarkan selesai di background
+WARMUP_TIMEOUT = float(os.environ.get('EDA_WARMUP_TIMEOUT', 600))
+# Lihat WARMUP_QUERY_PARAM di main.py: rerun ini menunggu prefetch agregat tab lain
+WARMUP_QUERY = 'warmup=1'
+
+# Dibaca eda_core.py lewat environment (diimpor main.py di proses yang sama, setelah modul ini)
+EXPORT_ROUTE = '/export'
+EXPORT_DIRECTORY = os.environ.setdefault('EDA_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'hotel_eda_exports'))
+os.environ['EDA_EXPORT_ROUTE'] = EXPORT_ROUTE
+# Hanya nama file polos (tanpa separator path) yang disajikan; file sementara export diawali titik, jadi ditolak
+EXPORT_NAME_PATTERN = re.compile(r'[\w-]+\.[\w.]+')
+
+logger = get_logger('eda.warmup')
+warmup_done = asyncio.Event()
+
+
+class WarmupClient:
+    """SessionClient tanpa browser: pesan ke klien dibuang, hanya akhir script yang ditandai."""
+    
+    def __init__(self, loop):
+        self.finished = asyncio.Event()
+        self.status = None
+        self._loop = loop
+    
+    @property
+    def client_context(self):
+        return None
+    
+    def write_forward_msg(self, msg):
+        if msg.WhichOneof('type') == 'script_finished' and self.status is None:
+            self.status = msg.script_finished
+            self._loop.call_soon_threadsafe(self.finished.set)
+
+
+async def run_warmup_session():
+    """Satu rerun main.py dengan filter default di runtime proses ini, lalu tandai server siap."""
+    runtime = Runtime.instance()
+    client = WarmupClient(asyncio.get_running_loop())
+    start = time.perf_counter()
+    session_id = runtime.connect_session(client=client, user_info={})
+    
+    async def finish():
+        await client.finished.wait()
+        runtime.close_session(session_id)
+        logger.info("Warm-up selesai dalam %.1f s", time.perf_counter() - start)
+    
+    msg = BackMsg()
+    msg.rerun_script.CopyFrom(ClientState(query_string=WARMUP_QUERY))
+    runtime.handle_backmsg(session_id, msg)
+    try:
+        await asyncio.wait_for(asyncio.shield(finish()), WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up melewati %.0f s; server dinyatakan siap tanpa menunggu", WARMUP_TIMEOUT)
+    finally:
+        warmup_done.set()
+
+
+async def ready(request):
+    """Readiness probe: 503 selama warm-up berjalan, 200 setelahnya."""
+    if warmup_done.is_set():
+        return PlainTextResponse('ok')
+    return PlainTextResponse('warming up', status_code=503)
+
+
+async def download_export(request):
+    """File export yang sudah disiapkan main.py, dialirkan dari disk."""
+    name = request.path_params['name']
+    path = os.path.join(EXPORT_DIRECTORY, name)
+    if not EXPORT_NAME_PATTERN.fullmatch(name) or not os.path.isfile(path):
+        return PlainTextResponse('not found', status_code=404)
+    return FileResponse(path, filename=name)
+
+
+@contextlib.asynccontextmanager
+async def warmup_lifespan(app):
+    # Runtime Streamlit sudah jalan di sini; warm-up berjalan sebagai task agar startup tidak tertahan
+    if WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(run_warmup_session())
+    else:
+        warmup_done.set()
+    yield
+    if WARMUP_ENABLED:
+        warmup_task.cancel()
+
+
+app = st.App(MAIN_SCRIPT, lifespan=warmup_lifespan, routes=[
+    Route('/ready', ready),
+    Route(EXPORT_ROUTE + '/{name}', download_export),
+])
@@ -0,0 +1,37 @@
+"""Data booking sintetis dengan skema CSV utama untuk test."""
+import numpy as np
+import pandas as pd
+
+SEASONS = {12: 'Winter', 1: 'Winter', 2: 'Winter', 3: 'Spring', 4: 'Spring', 5: 'Spring',
+           6: 'Summer', 7: 'Summer', 8: 'Summer', 9: 'Autumn', 10: 'Autumn', 11: 'Autumn'}
+
+
+def bookings(start, days, rows_per_day, seed, event_names=('Expo', 'Festival')):
+    """Booking sintetis dengan skema CSV utama, berurutan per tanggal kedatangan."""
+    rng = np.random.default_rng(seed)
+    dates = np.repeat(pd.date_range(start, periods=days, freq='D'), rows_per_day)
+    n = len(dates)
+    is_event_day = rng.integers(0, 2, n)
+    return pd.DataFrame({
+        'hotel': rng.choice(['City Hotel', 'Resort Hotel'], n),
+        'arrival_date': dates.strftime('%Y-%m-%d'),
+        'year': dates.year,
+        'month': dates.month,
+        'season': [SEASONS[m] for m in dates.month],
+        'is_holiday': rng.integers(0, 2, n),
+        'is_event_day': is_event_day,
+        'is_canceled': rng.integers(0, 2, n),
+        # Hari biasa tanpa Name (kosong di CSV -> 'No Event')
+        'Name': np.where(is_event_day == 1, rng.choice(list(event_names), n), None),
+        'occupancy_per_hari': rng.uniform(0, 100, n).round(4),
+        'adr': rng.uniform(50, 300, n).round(2),
+        'total_tamu': rng.integers(1, 5, n),
+    })
+
+
+def all_rows():
+    """Pilihan sidebar tanpa filter apa pun (semua baris lolos)."""
+    return {
+        'hotel': 'Semua Hotel', 'years': [], 'date_range': (), 'months': [], 'seasons': [],
+        'only_holidays': False, 'only_events': False, 'exclude_canceled': False,
+    }
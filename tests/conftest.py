@@ -0,0 +1,5 @@
+import os
+import sys
+
+# eda_core ada di root repo (bukan paket yang dipasang), jadi root ditambahkan ke path import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
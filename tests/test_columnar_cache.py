@@ -0,0 +1,74 @@
+"""Cache kolumnar (Feather & dataset berpartisi): file dengan COLUMNAR_FORMAT lain dibangun ulang dari CSV."""
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pytest
+
+import eda_core
+from booking_data import bookings
+from eda_core import (
+    COLUMNAR_FORMAT_KEY, build_columnar_cache, build_partitioned_dataset, is_columnar_cache_fresh,
+    is_partitioned_dataset_fresh, load_data, original_dtypes,
+)
+
+
+@pytest.fixture
+def csv(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    frame = bookings('2017-01-01', 10, 20, seed=1)
+    # Kolom float yang muat di float32 (disimpan ringkas) dan yang tidak (tetap float64)
+    frame['deposit_ratio'] = [0.25, 0.5, 0.75, 1.0] * (len(frame) // 4)
+    frame['discount'] = [0.1, 0.2] * (len(frame) // 2)
+    frame.to_csv(eda_core.DATA_PATH, index=False)
+    return pd.read_csv(eda_core.DATA_PATH)
+
+
+def touch_after_csv(path):
+    mtime = os.path.getmtime(eda_core.DATA_PATH) + 10
+    os.utime(path, (mtime, mtime))
+
+
+def test_cache_rows_restore_to_csv_values(csv):
+    build_columnar_cache()
+    assert is_columnar_cache_fresh()
+
+    df = original_dtypes(load_data('v'))
+    assert df['deposit_ratio'].dtype == 'float64' and df['discount'].dtype == 'float64'
+    pd.testing.assert_series_equal(df['deposit_ratio'], csv['deposit_ratio'])
+    pd.testing.assert_series_equal(df['discount'], csv['discount'])
+
+
+def test_cache_without_current_format_is_rebuilt(csv):
+    # Cache gaya lama: float32 yang dibulatkan, tanpa versi format di metadata skema
+    stale = eda_core.clean_booking_data(pd.read_csv(eda_core.DATA_PATH))
+    stale['discount'] = stale['discount'].astype('float32')
+    feather.write_feather(stale, eda_core.COLUMNAR_CACHE_PATH, compression='uncompressed')
+    touch_after_csv(eda_core.COLUMNAR_CACHE_PATH)
+    assert not is_columnar_cache_fresh()
+
+    df = original_dtypes(load_data('v'))
+    assert is_columnar_cache_fresh()
+    pd.testing.assert_series_equal(df['discount'], csv['discount'])
+
+    with pa.memory_map(eda_core.COLUMNAR_CACHE_PATH) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata
+    assert metadata[COLUMNAR_FORMAT_KEY] == str(eda_core.COLUMNAR_FORMAT).encode()
+
+
+def test_format_bump_invalidates_caches(csv, monkeypatch):
+    build_columnar_cache()
+    build_partitioned_dataset()
+    assert is_columnar_cache_fresh() and is_partitioned_dataset_fresh()
+
+    monkeypatch.setattr(eda_core, 'COLUMNAR_FORMAT', eda_core.COLUMNAR_FORMAT + 1)
+    assert not is_columnar_cache_fresh() and not is_partitioned_dataset_fresh()
+
+
+def test_unreadable_cache_is_stale(csv):
+    with open(eda_core.COLUMNAR_CACHE_PATH, 'wb') as f:
+        f.write(b'bukan feather' * 100)
+    touch_after_csv(eda_core.COLUMNAR_CACHE_PATH)
+
+    assert not is_columnar_cache_fresh()
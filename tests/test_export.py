@@ -0,0 +1,55 @@
+"""File export untuk route /export serve.py: nama tak tertebak, file setengah jadi tidak bisa diunduh."""
+import importlib
+import os
+
+import pytest
+
+import eda_core
+from eda_core import export_selection_file
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(eda_core, 'EXPORT_DIRECTORY', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def name_pattern(monkeypatch):
+    # serve.py menulis variabel export ke environment saat diimpor; monkeypatch mengembalikannya
+    monkeypatch.setenv('EDA_EXPORT_DIR', 'tidak-dipakai')
+    monkeypatch.setenv('EDA_EXPORT_ROUTE', 'tidak-dipakai')
+    return importlib.import_module('serve').EXPORT_NAME_PATTERN
+
+
+def test_export_names_are_servable_and_unique(export_dir, name_pattern, monkeypatch):
+    in_progress = []
+
+    def fake_export(selection, export_format, output, recorder):
+        in_progress.extend(os.listdir(export_dir))
+        output.write(b'isi')
+
+    monkeypatch.setattr(eda_core, 'export_selection', fake_export)
+    names = {export_selection_file(None, 'CSV', 'hotel_data.csv.gz') for _ in range(20)}
+
+    assert len(names) == 20
+    for name in names:
+        assert name.startswith('hotel_data_') and name.endswith('.csv.gz')
+        assert name_pattern.fullmatch(name)
+        assert (export_dir / name).read_bytes() == b'isi'
+    # Selama ditulis, file sementara ada di direktori yang sama tapi tidak cocok dengan pola route
+    tmp_names = [name for name in in_progress if name.endswith('.tmp')]
+    assert len(tmp_names) == 20 and not any(name_pattern.fullmatch(name) for name in tmp_names)
+    assert sorted(os.listdir(export_dir)) == sorted(names)
+
+
+def test_failed_export_leaves_no_file(export_dir, monkeypatch):
+    def failing_export(selection, export_format, output, recorder):
+        output.write(b'sebagian')
+        raise RuntimeError('gagal')
+
+    monkeypatch.setattr(eda_core, 'export_selection', failing_export)
+    with pytest.raises(RuntimeError):
+        export_selection_file(None, 'CSV', 'hotel_data.csv')
+
+    assert os.listdir(export_dir) == []
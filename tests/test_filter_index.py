@@ -0,0 +1,206 @@
+"""Indeks filter bitmap (build_filter_index/resolve_filter_mask) dibandingkan dengan filter df[...] versi awal."""
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from booking_data import all_rows, bookings
+from eda_core import (
+    ZONE_MAP_CHUNK_ROWS, build_filter_index, build_zone_maps, clean_booking_data, extend_filter_index,
+    filter_conditions, resolve_filter_mask, zone_map_chunks,
+)
+
+
+def baseline_mask(df, filters):
+    """Filter sidebar seperti versi awal dashboard: df[...] berantai, lalu posisi baris yang tersisa."""
+    filtered_df = df.copy()
+
+    if filters['hotel'] != 'Semua Hotel':
+        filtered_df = filtered_df[filtered_df['hotel'] == filters['hotel']]
+
+    if filters['years']:
+        filtered_df = filtered_df[filtered_df['year'].isin(filters['years'])]
+
+    if len(filters['date_range']) == 2:
+        start_date = pd.to_datetime(filters['date_range'][0])
+        end_date = pd.to_datetime(filters['date_range'][1])
+        filtered_df = filtered_df[
+            (filtered_df['arrival_date'] >= start_date) &
+            (filtered_df['arrival_date'] <= end_date)
+        ]
+
+    if filters['months']:
+        filtered_df = filtered_df[filtered_df['month'].isin(filters['months'])]
+
+    if filters['seasons']:
+        filtered_df = filtered_df[filtered_df['season'].isin(filters['seasons'])]
+
+    if filters['only_holidays']:
+        filtered_df = filtered_df[filtered_df['is_holiday'] == 1]
+
+    if filters['only_events']:
+        filtered_df = filtered_df[filtered_df['is_event_day'] == 1]
+
+    if filters['exclude_canceled']:
+        filtered_df = filtered_df[filtered_df['is_canceled'] == 0]
+
+    return df.index.isin(filtered_df.index)
+
+
+@pytest.fixture(scope='module', params=['sorted', 'shuffled'])
+def df(request):
+    # Lebih dari dua blok zone map (8192 baris) dan bukan kelipatan 8; versi acak membuat tiap blok
+    # memuat semua tanggal, versi terurut membuat zone map benar-benar melewati blok
+    frame = clean_booking_data(bookings('2016-06-01', 1229, 20, seed=7))
+    if request.param == 'shuffled':
+        frame = frame.sample(frac=1, random_state=0).reset_index(drop=True)
+    return frame
+
+
+@pytest.fixture(scope='module')
+def index(df):
+    return build_filter_index(df)
+
+
+def date(text):
+    return datetime.date.fromisoformat(text)
+
+
+def selection_cases(df):
+    years = sorted(int(y) for y in df['year'].unique())
+    months = sorted(int(m) for m in df['month'].unique())
+    seasons = sorted(df['season'].unique())
+    first, last = df['arrival_date'].min().date(), df['arrival_date'].max().date()
+    return [
+        all_rows(),
+        # Pilihan kosong = tanpa filter; pilihan lengkap = semua baris
+        dict(all_rows(), years=[], months=[], seasons=[]),
+        dict(all_rows(), years=years, months=months, seasons=seasons),
+        dict(all_rows(), years=years[:1]),
+        dict(all_rows(), years=[1999]),
+        dict(all_rows(), months=[2, 12], seasons=['Winter']),
+        dict(all_rows(), months=[2], seasons=['Summer']),
+        dict(all_rows(), hotel='City Hotel'),
+        dict(all_rows(), hotel='Hotel Lain'),
+        dict(all_rows(), only_holidays=True, only_events=True, exclude_canceled=True),
+        # Rentang tanggal: seluruh dataset, lebih lebar, satu hari, di luar data, belum lengkap
+        dict(all_rows(), date_range=(first, last)),
+        dict(all_rows(), date_range=(first - datetime.timedelta(days=30), last + datetime.timedelta(days=30))),
+        dict(all_rows(), date_range=(first, first)),
+        dict(all_rows(), date_range=(last, last)),
+        dict(all_rows(), date_range=(date('2016-12-31'), date('2017-01-01'))),
+        dict(all_rows(), date_range=(date('2010-01-01'), date('2010-12-31'))),
+        dict(all_rows(), date_range=(first,)),
+        dict(all_rows(), hotel='Resort Hotel', date_range=(first, last), years=years, exclude_canceled=True),
+    ]
+
+
+def test_selections_match_baseline_filter(df, index):
+    for filters in selection_cases(df):
+        np.testing.assert_array_equal(resolve_filter_mask(index, filters), baseline_mask(df, filters), err_msg=str(filters))
+
+
+def test_random_selections_match_baseline_filter(df, index):
+    rng = np.random.default_rng(11)
+    years = sorted(int(y) for y in df['year'].unique())
+    months = sorted(int(m) for m in df['month'].unique())
+    seasons = sorted(df['season'].unique())
+    days = pd.date_range(df['arrival_date'].min(), df['arrival_date'].max(), freq='D')
+
+    def subset(values):
+        return [v for v in values if rng.random() < 0.5]
+
+    for _ in range(200):
+        start, end = sorted(rng.choice(days, 2))
+        filters = {
+            'hotel': rng.choice(['Semua Hotel', 'City Hotel', 'Resort Hotel']),
+            'years': subset(years),
+            'date_range': (pd.Timestamp(start).date(), pd.Timestamp(end).date()) if rng.random() < 0.5 else (),
+            'months': subset(months),
+            'seasons': subset(seasons),
+            'only_holidays': rng.random() < 0.3,
+            'only_events': rng.random() < 0.3,
+            'exclude_canceled': rng.random() < 0.5,
+        }
+        np.testing.assert_array_equal(resolve_filter_mask(index, filters), baseline_mask(df, filters), err_msg=str(filters))
+
+
+def test_no_filter_selects_every_row(df, index):
+    mask = resolve_filter_mask(index, all_rows())
+
+    assert mask.dtype == bool and len(mask) == len(df) and mask.all()
+
+
+def dated_rows(n_rows, rows_per_day, seed=3):
+    """Frame terurut tanggal, tepat `rows_per_day` baris per hari: baris i jatuh di hari ke-(i // rows_per_day)."""
+    days = -(-n_rows // rows_per_day)
+    return clean_booking_data(bookings('2015-01-01', days, rows_per_day, seed=seed).iloc[:n_rows].copy())
+
+
+def day_range(df, first_row, last_row, **selection):
+    dates = df['arrival_date']
+    return dict(all_rows(), date_range=(dates[first_row].date(), dates[last_row].date()), **selection)
+
+
+def kept_blocks(index, filters):
+    conditions, date_bounds = filter_conditions(filters)
+    return zone_map_chunks(index['zone_maps'], conditions, date_bounds).tolist()
+
+
+def test_date_ranges_at_zone_map_block_boundaries():
+    block = ZONE_MAP_CHUNK_ROWS
+    # 8 baris per hari: batas blok (kelipatan 8) selalu tepat di batas hari; blok terakhir tidak penuh
+    df = dated_rows(3 * block + 5, 8)
+    index = build_filter_index(df)
+    last = len(df) - 1
+
+    cases = {
+        'akhir blok 0': (day_range(df, block - 8, block - 1), [True, False, False, False]),
+        'awal blok 1': (day_range(df, block, block + 7), [False, True, False, False]),
+        'melintasi batas': (day_range(df, block - 8, block + 7), [True, True, False, False]),
+        'tepat blok 1': (day_range(df, block, 2 * block - 1), [False, True, False, False]),
+        'blok terakhir': (day_range(df, 3 * block, last), [False, False, False, True]),
+        'hari terakhir': (day_range(df, last, last), [False, False, False, True]),
+        'seluruh data': (day_range(df, 0, last), [True, True, True, True]),
+        'dengan bitmap': (day_range(df, block - 8, 2 * block + 7, hotel='City Hotel', exclude_canceled=True),
+                          [True, True, True, False]),
+    }
+    for name, (filters, blocks) in cases.items():
+        assert kept_blocks(index, filters) == blocks, name
+        np.testing.assert_array_equal(resolve_filter_mask(index, filters), baseline_mask(df, filters), err_msg=name)
+
+
+def test_day_boundaries_inside_bytes():
+    # 3 baris per hari: batas hari jatuh di tengah byte bitmap dan di tengah blok
+    block = ZONE_MAP_CHUNK_ROWS
+    df = dated_rows(2 * block + 13, 3)
+    index = build_filter_index(df)
+    for first_row, last_row in [(block - 1, block), (block - 2, block - 2), (block + 1, 2 * block + 12), (5, 9)]:
+        for selection in ({}, {'hotel': 'Resort Hotel'}, {'only_events': True}):
+            filters = day_range(df, first_row, last_row, **selection)
+            np.testing.assert_array_equal(
+                resolve_filter_mask(index, filters), baseline_mask(df, filters), err_msg=str(filters)
+            )
+
+
+@pytest.mark.parametrize('chunk_rows', [8, 16, 1024])
+def test_small_zone_map_blocks_match_baseline_filter(df, chunk_rows):
+    index = build_filter_index(df)
+    index['zone_maps'] = build_zone_maps(index, chunk_rows)
+    for filters in selection_cases(df):
+        np.testing.assert_array_equal(resolve_filter_mask(index, filters), baseline_mask(df, filters), err_msg=str(filters))
+
+
+def test_extended_index_across_block_boundary():
+    block = ZONE_MAP_CHUNK_ROWS
+    # Baris delta mengisi sisa blok 0 dan meluber ke blok 1, dengan nilai kategori baru
+    base = dated_rows(block - 3, 8)
+    delta = clean_booking_data(bookings('2017-10-01', 3, 5, seed=9, event_names=('Konser',)))
+    combined = pd.concat([base, delta], ignore_index=True)
+    extended = extend_filter_index(build_filter_index(base), delta)
+
+    for filters in selection_cases(combined) + [day_range(combined, block - 4, block + 1)]:
+        np.testing.assert_array_equal(
+            resolve_filter_mask(extended, filters), baseline_mask(combined, filters), err_msg=str(filters)
+        )
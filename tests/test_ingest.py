@@ -0,0 +1,201 @@
+"""Ingest delta (BookingStore.ingest/refresh) dibandingkan dengan rebuild penuh dari CSV gabungan."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import eda_core
+from booking_data import all_rows, bookings
+from eda_core import (
+    AggregateCache, BookingStore, PandasBackend, get_data_version, refresh_booking_store, resolve_filter_mask,
+    rollup_cube, topk_rows,
+)
+
+FILTERS = [
+    all_rows(),
+    dict(all_rows(), hotel='City Hotel'),
+    dict(all_rows(), only_holidays=True, exclude_canceled=True),
+    dict(all_rows(), date_range=('2017-01-25', '2017-02-05')),
+    dict(all_rows(), months=[2], only_events=True),
+]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Tanpa cache hasil di disk: tabel turunan selalu dibangun dari data test ini
+    monkeypatch.setattr(eda_core, 'get_result_cache', lambda: None)
+    os.mkdir(eda_core.INCREMENTS_DIR)
+    return tmp_path
+
+
+def write_delta(frame, name):
+    frame.to_csv(os.path.join(eda_core.INCREMENTS_DIR, name), index=False)
+
+
+def full_rebuild(directory, frames):
+    """BookingStore dari satu CSV berisi semua baris, di direktori kerja terpisah."""
+    os.makedirs(directory)
+    os.chdir(directory)
+    pd.concat(frames, ignore_index=True).to_csv(eda_core.DATA_PATH, index=False)
+    return BookingStore(get_data_version()).snapshot
+
+
+def assert_same_tables(ingested, full):
+    assert len(ingested['df']) == len(full['df'])
+    for filters in FILTERS:
+        mask = resolve_filter_mask(ingested['filter_index'], filters)
+        expected = resolve_filter_mask(full['filter_index'], filters)
+        np.testing.assert_array_equal(mask, expected)
+
+        cube_mask = resolve_filter_mask(ingested['cube_index'], filters)
+        full_cube_mask = resolve_filter_mask(full['cube_index'], filters)
+        for keys in (['arrival_date'], ['hotel', 'month'], ['is_holiday', 'Name']):
+            for agg_func in ('mean', 'sum'):
+                pd.testing.assert_series_equal(
+                    rollup_cube(ingested['cube'][cube_mask], keys, agg_func).sort_index(),
+                    rollup_cube(full['cube'][full_cube_mask], keys, agg_func).sort_index(),
+                    check_categorical=False, check_index_type=False,
+                )
+            pd.testing.assert_series_equal(
+                rollup_cube(ingested['cube'][cube_mask], keys, 'median', sketch=ingested['sketch']).sort_index(),
+                rollup_cube(full['cube'][full_cube_mask], keys, 'median', sketch=full['sketch']).sort_index(),
+                check_categorical=False, check_index_type=False,
+            )
+
+        for flag in ('is_holiday', 'is_event_day'):
+            pd.testing.assert_frame_equal(
+                topk_rows(ingested['cube'], cube_mask, ingested['topk'], flag, 20),
+                topk_rows(full['cube'], full_cube_mask, full['topk'], flag, 20),
+                check_categorical=False,
+            )
+
+
+def test_ingest_matches_full_rebuild(workdir):
+    base = bookings('2017-01-01', 31, 40, seed=1)
+    base.to_csv(eda_core.DATA_PATH, index=False)
+    store = BookingStore(get_data_version())
+
+    # Dua batch, batch kedua membawa Name baru (kategori baru di cube & bitmap)
+    first = bookings('2017-02-01', 10, 40, seed=2)
+    second = bookings('2017-02-11', 10, 40, seed=3, event_names=('Expo', 'Konser'))
+    write_delta(first, 'day1.csv')
+    old_version = store.snapshot['result_version']
+    assert store.refresh()[:2] == (old_version, store.snapshot['result_version'])
+    write_delta(second, 'day2.csv')
+    store.refresh()
+
+    assert_same_tables(store.snapshot, full_rebuild(workdir / 'full', [base, first, second]))
+
+
+def test_sample_built_on_first_use_and_matches_full_rebuild(workdir):
+    base = bookings('2017-01-01', 31, 40, seed=1)
+    base.to_csv(eda_core.DATA_PATH, index=False)
+    store = BookingStore(get_data_version())
+    backend = PandasBackend(store.snapshot)
+    backend.shared_nbytes()
+    assert store.snapshot['sample'].built_nbytes() == 0
+
+    delta = bookings('2017-02-01', 10, 40, seed=2)
+    write_delta(delta, 'day1.csv')
+    store.refresh()
+    sample = store.snapshot['sample']
+    assert sample.built_nbytes() == 0
+
+    full = full_rebuild(workdir / 'full', [base, delta])
+    pd.testing.assert_frame_equal(sample.sample, full['sample'].sample)
+    assert sample.built_nbytes() > 0
+    np.testing.assert_array_equal(
+        resolve_filter_mask(sample.filter_index, FILTERS[2]), resolve_filter_mask(full['sample'].filter_index, FILTERS[2])
+    )
+
+
+def test_resent_watermark_rows_skipped_and_real_duplicates_kept(workdir):
+    base = bookings('2017-01-01', 31, 40, seed=1)
+    base.to_csv(eda_core.DATA_PATH, index=False)
+    store = BookingStore(get_data_version())
+
+    watermark_day = base[base['arrival_date'] == '2017-01-31']
+    duplicate = watermark_day.iloc[[0]]
+    resend = pd.concat([
+        # Baris sebelum hari watermark dan baris hari watermark yang dikirim ulang: dibuang
+        base[base['arrival_date'] == '2017-01-30'],
+        watermark_day,
+        # Satu salinan lagi dari booking yang sudah ada: booking kembar yang sah, ikut masuk
+        duplicate,
+    ], ignore_index=True)
+    new_days = bookings('2017-02-01', 5, 40, seed=4)
+    write_delta(pd.concat([resend, new_days], ignore_index=True), 'day1.csv')
+
+    ingested = store.refresh()
+    assert ingested is not None
+    assert len(store.snapshot['df']) == len(base) + 1 + len(new_days)
+
+    assert_same_tables(store.snapshot, full_rebuild(workdir / 'full', [base, duplicate, new_days]))
+
+
+def test_resent_file_is_not_ingested_twice(workdir):
+    base = bookings('2017-01-01', 31, 40, seed=1)
+    base.to_csv(eda_core.DATA_PATH, index=False)
+    store = BookingStore(get_data_version())
+    delta = bookings('2017-02-01', 5, 40, seed=2)
+    write_delta(delta, 'day1.csv')
+    store.refresh()
+    snapshot = store.snapshot
+
+    # Nama file sama tidak dibaca lagi; isi sama dengan nama lain tidak menambah baris
+    assert store.refresh() is None
+    write_delta(delta, 'day1_resend.csv')
+    assert store.refresh() is None
+    assert store.snapshot is snapshot
+
+
+def test_refresh_carries_over_aggregates_outside_delta_range(workdir, monkeypatch):
+    base = bookings('2017-01-01', 31, 40, seed=1)
+    base.to_csv(eda_core.DATA_PATH, index=False)
+    store = BookingStore(get_data_version())
+    cache = AggregateCache()
+    monkeypatch.setattr(eda_core, 'get_aggregate_cache', lambda: cache)
+
+    old_version = store.snapshot['result_version']
+
+    def key(version, date_range):
+        return ('summary', version, 'Semua Hotel', None, date_range, None, None, False, False, False, 'mean', False)
+
+    before_delta = key(old_version, ('2017-01-01', '2017-01-15'))
+    overlapping = key(old_version, ('2017-01-20', '2017-02-02'))
+    whole_range = key(old_version, None)
+    other_version = key('lain', ('2017-01-01', '2017-01-15'))
+    for cache_key in (before_delta, overlapping, whole_range, other_version):
+        cache.get_or_compute(cache_key, lambda: cache_key[4])
+
+    write_delta(bookings('2017-02-01', 5, 40, seed=2), 'day1.csv')
+    refresh_booking_store(store)
+    new_version = store.snapshot['result_version']
+    assert new_version != old_version
+
+    # Hanya rentang yang tidak beririsan dengan delta (1-5 Feb) yang pindah ke versi baru
+    entries = cache._entries
+    assert key(new_version, ('2017-01-01', '2017-01-15')) in entries
+    assert before_delta not in entries
+    assert overlapping in entries and key(new_version, ('2017-01-20', '2017-02-02')) not in entries
+    assert whole_range in entries and key(new_version, None) not in entries
+    assert other_version in entries
+
+    hits = cache.hits
+    assert cache.get_or_compute(key(new_version, ('2017-01-01', '2017-01-15')), lambda: None) == ('2017-01-01', '2017-01-15')
+    assert cache.hits == hits + 1
+
+
+def test_carry_over_moves_only_matching_entries():
+    cache = AggregateCache()
+    cache.get_or_compute(('daily_data', 'v1', 'a'), lambda: 1)
+    cache.get_or_compute(('daily_data', 'v1', 'b'), lambda: 2)
+    cache.get_or_compute(('daily_data', 'v0', 'a'), lambda: 3)
+
+    moved = cache.carry_over('v1', 'v2', lambda key: key[2] == 'a')
+
+    assert moved == 1
+    assert set(cache._entries) == {('daily_data', 'v2', 'a'), ('daily_data', 'v1', 'b'), ('daily_data', 'v0', 'a')}
+    assert cache.get_or_compute(('daily_data', 'v2', 'a'), lambda: None) == 1
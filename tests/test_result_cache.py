@@ -0,0 +1,228 @@
+"""Codec cache hasil (encode_result/decode_result) dan DiskResultCache: round-trip, eviksi, galat = miss."""
+import math
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import eda_core
+from booking_data import all_rows, bookings
+from eda_core import (
+    AGGREGATE_BUILDERS, BookingStore, DiskResultCache, PandasBackend, RowSelection, decode_result, encode_result,
+    get_data_version, resolve_filter_mask,
+)
+
+
+@pytest.fixture(scope='module')
+def backend(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path_factory.mktemp('data'))
+        monkeypatch.setattr(eda_core, 'get_result_cache', lambda: None)
+        bookings('2016-12-01', 90, 20, seed=1).to_csv(eda_core.DATA_PATH, index=False)
+        return PandasBackend(BookingStore(get_data_version()).snapshot)
+
+
+def round_trip(value):
+    return decode_result(encode_result(value))
+
+
+def assert_same_result(decoded, value):
+    """Frame identik (tipe kolom & index ikut); struktur lain sama persis, skalar numpy menjadi skalar Python."""
+    if isinstance(value, pd.DataFrame):
+        pd.testing.assert_frame_equal(decoded, value)
+        assert decoded.attrs == value.attrs
+    elif isinstance(value, dict):
+        assert type(decoded) is dict and list(decoded) == list(value)
+        for key in value:
+            assert_same_result(decoded[key], value[key])
+    elif isinstance(value, (tuple, list)):
+        assert type(decoded) is type(value) and len(decoded) == len(value)
+        for item, expected in zip(decoded, value):
+            assert_same_result(item, expected)
+    else:
+        assert type(decoded) in (int, float, str, bool, type(None))
+        assert decoded == value or (math.isnan(decoded) and math.isnan(value))
+
+
+@pytest.mark.parametrize('filters', [all_rows(), dict(all_rows(), hotel='Hotel Lain')], ids=['all', 'empty'])
+@pytest.mark.parametrize('agg_func', ['mean', 'median', 'sum'])
+@pytest.mark.parametrize('use_cube', [True, False], ids=['cube', 'rows'])
+@pytest.mark.parametrize('name', list(AGGREGATE_BUILDERS))
+def test_aggregate_round_trip(backend, name, agg_func, use_cube, filters):
+    filtered_cube = backend.cube[resolve_filter_mask(backend.cube_index, filters)] if use_cube else None
+    sketch = backend.sketch if use_cube else None
+    value = AGGREGATE_BUILDERS[name](RowSelection(backend, filters), filtered_cube, agg_func, sketch)
+
+    assert_same_result(round_trip(value), value)
+
+
+def test_heatmap_pivot_keeps_categorical_columns(backend):
+    pivot = AGGREGATE_BUILDERS['heatmap_pivot'](RowSelection(backend, all_rows()), backend.cube, 'mean', None)
+    decoded = round_trip(pivot)
+
+    assert isinstance(pivot.columns, pd.CategoricalIndex)
+    assert isinstance(decoded.columns, pd.CategoricalIndex)
+    assert list(decoded.columns.categories) == list(pivot.columns.categories)
+    assert decoded.columns.name == 'month' and decoded.index.name == 'arrival_date_day_of_month'
+
+
+def test_frame_index_and_attrs_round_trip():
+    frame = pd.DataFrame(
+        {'a': np.int8([1, 2]), 'b': pd.Categorical(['x', 'y']), 'c': pd.to_datetime(['2017-01-01', None])},
+        index=pd.MultiIndex.from_tuples([('p', 1), ('q', 2)], names=['k1', 'k2']),
+    )
+    frame.attrs['sumber'] = ('cube', 3)
+
+    assert_same_result(round_trip(frame), frame)
+    assert_same_result(round_trip(frame.iloc[:0]), frame.iloc[:0])
+
+
+def test_tuples_and_lists_stay_distinct():
+    value = {'a': (1, [2, (3, 'x')]), 'b': [(), []], 'c': None}
+    decoded = round_trip(value)
+
+    assert decoded == value
+    assert type(decoded['a']) is tuple and type(decoded['a'][1]) is list and type(decoded['a'][1][1]) is tuple
+    assert type(decoded['b'][0]) is tuple and type(decoded['b'][1]) is list
+
+
+def test_numpy_scalars_and_arrays_become_python_values():
+    value = {
+        'float': np.float64(1.5), 'float32': np.float32(0.5), 'int': np.int64(3), 'int8': np.int8(-2),
+        'bool': np.bool_(True), 'nan': np.float64('nan'), 'array': np.array([1.0, 2.0]),
+    }
+    decoded = round_trip(value)
+
+    assert decoded['float'] == 1.5 and type(decoded['float']) is float
+    assert decoded['float32'] == 0.5 and type(decoded['float32']) is float
+    assert decoded['int'] == 3 and type(decoded['int']) is int
+    assert decoded['int8'] == -2 and type(decoded['int8']) is int
+    assert decoded['bool'] is True
+    assert math.isnan(decoded['nan'])
+    assert decoded['array'] == [1.0, 2.0]
+
+
+@pytest.mark.parametrize('value', [
+    pd.Series([1, 2]),
+    {1: 'kunci bukan string'},
+    {'__frame__': 0},
+    {'ok': [object()]},
+], ids=['series', 'int-key', 'reserved-key', 'object'])
+def test_unsupported_values_raise_type_error(value):
+    with pytest.raises(TypeError):
+        encode_result(value)
+
+
+def test_unsupported_value_is_not_cached(tmp_path):
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), 'kode')
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pd.Series([1, 2])
+
+    cache.get_or_compute('series', compute)
+    assert cache.get('series') == (False, None)
+    cache.get_or_compute('series', compute)
+    assert len(calls) == 2
+    assert cache.total_bytes() == 0
+
+
+def test_hit_after_put_and_key_includes_code_version(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    cache = DiskResultCache(path, 'kode-1')
+    cache.put(('summary', 'v1'), {'n': 1})
+
+    assert cache.get(('summary', 'v1')) == (True, {'n': 1})
+    assert DiskResultCache(path, 'kode-2').get(('summary', 'v1')) == (False, None)
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(eda_core.time, 'time', clock)
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), 'kode', ttl=100)
+    cache.put('lama', 'a')
+    assert cache.get('lama') == (True, 'a')
+
+    clock.now += 200
+    assert cache.get('lama') == (False, None)
+    # Entri kedaluwarsa dibuang saat penulisan berikutnya
+    cache.put('baru', 'b')
+    keys = cache.connect().execute('SELECT count(*) FROM results').fetchone()[0]
+    assert keys == 1 and cache.get('baru') == (True, 'b')
+
+
+def test_size_eviction_drops_least_recently_accessed(tmp_path, monkeypatch):
+    monkeypatch.setattr(eda_core.time, 'time', Clock())
+    blob_size = len(encode_result('x' * 1000))
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), 'kode', max_bytes=2 * blob_size + blob_size // 2)
+
+    cache.put('a', 'x' * 1000)
+    cache.put('b', 'x' * 1000)
+    # 'a' baru saja dibaca, jadi 'b' yang paling lama tidak diakses saat 'c' masuk
+    assert cache.get('a')[0]
+    cache.put('c', 'x' * 1000)
+
+    assert cache.get('a')[0] and cache.get('c')[0]
+    assert cache.get('b') == (False, None)
+    assert cache.total_bytes() <= cache.max_bytes
+
+    # Nilai yang sendirian sudah melebihi batas tidak disimpan sama sekali
+    cache.put('besar', 'x' * 10_000)
+    assert cache.get('besar') == (False, None)
+
+
+def test_sqlite_errors_are_misses(tmp_path):
+    # Path berupa direktori: koneksi gagal dibuka
+    unusable = DiskResultCache(str(tmp_path), 'kode')
+    # File yang bukan database SQLite
+    not_a_database = tmp_path / 'rusak.sqlite'
+    not_a_database.write_bytes(b'bukan sqlite' * 100)
+    corrupt = DiskResultCache(str(not_a_database), 'kode')
+
+    for cache in (unusable, corrupt):
+        calls = []
+        cache.put('k', 1)
+        assert cache.get('k') == (False, None)
+        assert cache.get_or_compute('k', lambda: calls.append(1) or 'nilai') == 'nilai'
+        assert cache.get_or_compute('k', lambda: calls.append(1) or 'nilai') == 'nilai'
+        assert len(calls) == 2 and cache.total_bytes() == 0
+
+
+def test_unreadable_blob_is_a_miss(tmp_path):
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), 'kode')
+    cache.put('k', {'n': 1})
+    cache.connect().execute('UPDATE results SET value = ?', (b'\x00' * 16,))
+
+    assert cache.get('k') == (False, None)
+    assert cache.get_or_compute('k', lambda: {'n': 2}) == {'n': 2}
+    assert cache.get('k') == (True, {'n': 2})
+
+
+def test_locked_database_is_a_miss(tmp_path, monkeypatch):
+    path = str(tmp_path / 'results.sqlite')
+    cache = DiskResultCache(path, 'kode')
+    cache.put('k', 1)
+    monkeypatch.setattr(eda_core, 'RESULT_CACHE_BUSY_TIMEOUT', 0)
+    blocked = DiskResultCache(path, 'kode')
+
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute('BEGIN EXCLUSIVE')
+    try:
+        blocked.put('lain', 2)
+        assert blocked.get('lain') == (False, None)
+    finally:
+        writer.execute('ROLLBACK')
+        writer.close()
+    assert os.path.exists(path) and cache.get('lain') == (False, None)
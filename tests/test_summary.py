@@ -0,0 +1,44 @@
+"""build_summary: rasio dengan pembagi nol (kolom kosong semua) menjadi 0, bukan NaN/peringatan 0/0."""
+import numpy as np
+import pytest
+
+import eda_core
+from booking_data import all_rows, bookings
+from eda_core import BookingStore, PandasBackend, RowSelection, build_summary, get_data_version, resolve_filter_mask
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(eda_core, 'get_result_cache', lambda: None)
+    frame = bookings('2017-01-01', 30, 20, seed=1)
+    # adr kosong di semua baris, okupansi kosong di semua hari libur
+    frame['adr'] = np.nan
+    frame.loc[frame['is_holiday'] == 1, 'occupancy_per_hari'] = np.nan
+    frame.to_csv(eda_core.DATA_PATH, index=False)
+    return PandasBackend(BookingStore(get_data_version()).snapshot)
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+@pytest.mark.parametrize('use_cube', [True, False], ids=['cube', 'rows'])
+def test_empty_columns_give_zero_ratios(backend, use_cube):
+    filters = all_rows()
+    filtered_cube = backend.cube[resolve_filter_mask(backend.cube_index, filters)] if use_cube else None
+    summary = build_summary(RowSelection(backend, filters), filtered_cube, 'mean', backend.sketch)
+
+    assert summary['total_bookings'] == 600 and summary['bookings']['holiday'] > 0
+    assert summary['avg_adr'] == 0
+    assert summary['occupancy']['holiday'] == 0
+    assert 0 < summary['occupancy']['normal'] < 100
+    assert 0 < summary['cancellation_rate'] < 100
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_no_bookings_give_zero_ratios(backend):
+    filters = dict(all_rows(), hotel='Hotel Lain')
+    filtered_cube = backend.cube[resolve_filter_mask(backend.cube_index, filters)]
+    summary = build_summary(RowSelection(backend, filters), filtered_cube, 'mean', backend.sketch)
+
+    assert summary['total_bookings'] == 0
+    assert summary['avg_adr'] == 0 and summary['cancellation_rate'] == 0
+    assert set(summary['occupancy'].values()) == {0}
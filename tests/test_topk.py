@@ -0,0 +1,46 @@
+"""Top-k & sketch per baris cube (build_daily_cube) untuk baris yang key cube-nya kosong."""
+import numpy as np
+import pandas as pd
+
+from eda_core import build_daily_cube, topk_rows
+
+
+def bookings():
+    dates = pd.to_datetime(['2017-01-01', '2017-01-01', '2017-01-02', '2017-01-02'])
+    return pd.DataFrame({
+        'hotel': ['City Hotel', 'City Hotel', 'Resort Hotel', 'Resort Hotel'],
+        'arrival_date': dates,
+        'is_canceled': np.int8([0, 0, 0, 0]),
+        'is_holiday': np.int8([1, 1, 1, 1]),
+        'is_event_day': np.int8([0, 0, 0, 0]),
+        # Baris terakhir tanpa Name: tidak masuk cube (ngroup() = -1)
+        'Name': ['New Year', 'New Year', 'Holiday', None],
+        'year': [2017] * 4,
+        'month': [1] * 4,
+        'season': ['Winter'] * 4,
+        'occupancy_per_hari': [40.0, 50.0, 60.0, 99.0],
+        'adr': [100.0, 110.0, 120.0, 130.0],
+        'total_tamu': [2, 2, 3, 4],
+    })
+
+
+def test_topk_skips_rows_without_cube_key():
+    df = bookings()
+    cube, sketch, topk = build_daily_cube(df)
+    
+    assert len(cube) == 2
+    assert (topk['cube_row'] >= 0).all()
+    assert 3 not in topk['row'].tolist()
+    # Baris tanpa key tidak boleh menumpang ke baris cube terakhir
+    last_row = len(cube) - 1
+    assert topk.loc[topk['cube_row'] == last_row, 'occupancy_per_hari'].tolist() == [60.0]
+    
+    top = topk_rows(cube, np.ones(len(cube), dtype=bool), topk, 'is_holiday', 10)
+    assert top['occupancy_per_hari'].tolist() == [60.0, 50.0, 40.0]
+
+
+def test_sketch_skips_rows_without_cube_key():
+    cube, sketch, _ = build_daily_cube(bookings())
+    
+    assert (sketch['cube_row'] >= 0).all()
+    assert sketch['n'].sum() == 3